@@ -1,15 +1,24 @@
 import os
 import time
+import signal
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from ai_trading_engine import AITradingEngine
 from portfolio_tracker import PortfolioTracker
 from telegram_notifier import TelegramNotifier
 from email_reporter import EmailReporter
-import alpaca_trade_api as tradeapi
-import yfinance as yf
-import pandas as pd
+from simulated_broker import create_broker
+from broker_snapshot import BrokerSnapshot
+from quote_service import QuoteService
+from scheduler import Scheduler, TradingCalendar, BAR_CLOSE, MARKET_CLOSE, WEEKLY_CLOSE, MARKET_TZ
+from streaming import StreamIngestor, create_source
+from notification_dispatcher import NotificationDispatcher
+from symbol_metadata import SymbolMetadata, liquidity_tier
+from risk_engine import RiskEngine
+from pretrade_gate import PreTradeGate
 from twilio.rest import Client
 import pytz
 
@@ -26,19 +35,33 @@ class AITradingBot:
         
         # Initialize trading components
         self.ai_engine = AITradingEngine(self.gemini_api_key)
-        self.alpaca_api = tradeapi.REST(self.alpaca_api_key, self.alpaca_secret_key, 'https://paper-api.alpaca.markets')
-        self.portfolio = PortfolioTracker(self.alpaca_api)
+        # Account and positions are read once per cycle and shared with the tracker
+        self.alpaca_api = BrokerSnapshot(create_broker(api_key=self.alpaca_api_key, secret_key=self.alpaca_secret_key,
+                                                       store=self.ai_engine.market_data.store))
+        self.symbols = SymbolMetadata()  # Sector, industry, size and liquidity for every known symbol
+        self.risk_engine = RiskEngine(self.ai_engine.market_data)  # Rolling covariance over this cycle's bars
+        self.portfolio = PortfolioTracker(self.alpaca_api, self.symbols, self.risk_engine)
+        self.quotes = QuoteService(self.ai_engine.market_data, self.ai_engine.fundamentals)  # Order pricing
+        self.trade_lock = threading.Lock()  # Scheduled cycles and stream triggers place orders one at a time
+        self.order_lock = threading.Lock()  # Gate check, submit and record happen as one step
         self.telegram = TelegramNotifier()
         self.email_reporter = EmailReporter()
+        self.twilio_client = None  # Created on first WhatsApp message and reused
         
         # Trading configuration
         self.min_confidence = float(os.getenv("MIN_CONFIDENCE", 0.5))  # Lowered from 0.7 to 0.5
         self.max_daily_trades = int(os.getenv("MAX_DAILY_TRADES", 15))  # Increased from 10 to 15
         self.risk_tolerance = os.getenv("RISK_TOLERANCE", "aggressive")  # Changed from moderate to aggressive
         self.max_position_size = float(os.getenv("MAX_POSITION_SIZE", 0.15))  # Increased from 0.1 to 0.15
+        self.recovery_min_confidence = float(os.getenv("RECOVERY_MIN_CONFIDENCE", 0.4))  # Lower threshold for recovery buys
+        # Every order passes exposure, notional, rate, duplicate and daily trade limits first
+        self.gate = PreTradeGate(self.symbols, max_daily_trades=self.max_daily_trades)
+        self.analysis_concurrency = int(os.getenv("ANALYSIS_CONCURRENCY", 4))  # Symbols analysed in parallel
+        self.ai_batch_size = int(os.getenv("AI_BATCH_SIZE", 1))  # >1 packs several stocks into one AI request
         
         # Current stocks to monitor (existing system)
         self.stocks_to_monitor = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "CRM", "PLD", "AVGO"]
+        self.risk_engine.track(self.stocks_to_monitor)
         
         # New stock discovery configuration
         self.discovery_enabled = True
@@ -46,11 +69,26 @@ class AITradingBot:
         self.price_max = 3000.0  # Maximum stock price
         self.max_new_positions = 3  # Maximum new stocks to add
         self.discovery_interval = 2  # Check for new stocks every 2 cycles
+        self.min_dollar_volume = float(os.getenv("MIN_DOLLAR_VOLUME", 20_000_000))  # Avg daily $ volume for discovery
+        self.discovery_sectors = [sector.strip() for sector in os.getenv("DISCOVERY_SECTORS", "").split(",") if sector.strip()]
         
         # Stock discovery tracking
         self.discovered_stocks = []
         self.discovery_cycle_count = 0
         self.weekly_trades = []
+        self.cycle_trades = 0  # Trades executed in the current cycle
+        
+        # Streaming bars (STREAM_SOURCE=alpaca|replay) trigger analysis between scheduled cycles
+        self.stream_source = create_source(api_key=self.alpaca_api_key, secret_key=self.alpaca_secret_key)
+        self.stream = None
+        
+        # Trade notifications are delivered in the background so they never delay orders
+        channels = {}
+        if os.getenv("TWILIO_ACCOUNT_SID") and os.getenv("TWILIO_AUTH_TOKEN") and os.getenv("TO_WHATSAPP_NUMBER"):
+            channels['whatsapp'] = self.send_whatsapp_message
+        if self.telegram.chat_id:
+            channels['telegram'] = self.send_telegram_message
+        self.notifier = NotificationDispatcher(channels)
         
         # Setup logging
         logging.basicConfig(level=logging.INFO)
@@ -58,6 +96,9 @@ class AITradingBot:
         
         print("🤖 AI Trading Bot initialized successfully")
         print(f"📈 Monitoring: {', '.join(self.stocks_to_monitor)}")
+        print(f"🧠 Decision backend: {self.ai_engine.backend.name}")
+        print(f"🏦 Broker: {self.alpaca_api.name}")
+        print(f"📡 Streaming: {self.stream_source.name if self.stream_source else 'Off'}")
         print(f"🔍 Stock Discovery: {'Enabled' if self.discovery_enabled else 'Disabled'}")
         print(f"💰 Price Range: ${self.price_min:,.0f} - ${self.price_max:,.0f}")
         print(f"📱 Telegram Chat ID: {os.getenv('TELEGRAM_CHAT_ID', 'Not Set')}")
@@ -76,11 +117,12 @@ class AITradingBot:
                 print("⚠️ Missing Twilio credentials - skipping WhatsApp notification")
                 return False
             
-            # Create Twilio client
-            client = Client(twilio_account_sid, twilio_auth_token)
+            # Create Twilio client once; it keeps its HTTP session between messages
+            if self.twilio_client is None:
+                self.twilio_client = Client(twilio_account_sid, twilio_auth_token)
             
             # Send message
-            client.messages.create(
+            self.twilio_client.messages.create(
                 body=message, 
                 from_=from_whatsapp,
                 to=to_whatsapp
@@ -103,37 +145,45 @@ class AITradingBot:
             return False
 
     def send_trade_notifications(self, trade_data):
-        """Send trade notifications to all platforms"""
-        # WhatsApp notification
-        whatsapp_msg = f"🚀 TRADE EXECUTED!\n\n📈 Stock: {trade_data['symbol']}\n🎯 Action: {trade_data['action']}\n📊 Quantity: {trade_data['quantity']} shares\n💰 Price: ${trade_data['price']:.2f}\n💵 Total: ${trade_data['total']:.2f}\n⏰ Time: {datetime.fromisoformat(trade_data['timestamp']).strftime('%H:%M:%S')}\n\n🤖 AI Confidence: {trade_data.get('ai_confidence', 'N/A')}"
-        
-        whatsapp_success = self.send_whatsapp_message(whatsapp_msg)
-        if not whatsapp_success:
-            print("   ⚠️ WhatsApp notification skipped due to missing credentials")
-        
-        # Telegram notification
-        telegram_msg = f"🚀 TRADE EXECUTED!\n\n📈 Stock: {trade_data['symbol']}\n🎯 Action: {trade_data['action']}\n📊 Quantity: {trade_data['quantity']} shares\n💰 Price: ${trade_data['price']:.2f}\n💵 Total: ${trade_data['total']:.2f}\n⏰ Time: {datetime.fromisoformat(trade_data['timestamp']).strftime('%H:%M:%S')}\n\n🤖 AI Confidence: {trade_data.get('ai_confidence', 'N/A')}"
-        
-        telegram_success = self.send_telegram_message(telegram_msg)
-        if not telegram_success:
-            print("   ⚠️ Telegram notification skipped due to missing credentials")
+        """Queue trade notifications for all platforms; delivery happens in the background"""
+        message = f"🚀 TRADE EXECUTED!\n\n📈 Stock: {trade_data['symbol']}\n🎯 Action: {trade_data['action']}\n📊 Quantity: {trade_data['quantity']} shares\n💰 Price: ${trade_data['price']:.2f}\n💵 Total: ${trade_data['total']:.2f}\n⏰ Time: {datetime.fromisoformat(trade_data['timestamp']).strftime('%H:%M:%S')}\n\n🤖 AI Confidence: {trade_data.get('ai_confidence', 'N/A')}"
         
         # Log notification status
-        if whatsapp_success or telegram_success:
-            print(f"   ✅ Trade notifications sent successfully")
+        if self.notifier.notify(message):
+            print(f"   📨 Trade notifications queued")
         else:
             print(f"   ⚠️ No notifications sent - check credentials")
 
+    def _submit_order(self, symbol, qty, side, price):
+        """Place a market order if the pre-trade gate allows it; returns the order or None"""
+        with self.order_lock:
+            allowed, reason = self.gate.check(symbol, side, qty, price)
+            if not allowed:
+                print(f"      🛑 Order blocked: {side.upper()} {qty} {symbol} - {reason}")
+                self.logger.warning("Pre-trade gate rejected %s %s %s @ %.2f: %s", side, qty, symbol, price, reason)
+                return None
+            
+            order = self.alpaca_api.submit_order(
+                symbol=symbol,
+                qty=qty,
+                side=side,
+                type='market',
+                time_in_force='day',
+                expected_price=price
+            )
+            self.gate.record(symbol, side, qty, price)
+            return order
+    
     def execute_ai_trade(self, symbol, action, decision):
         """Execute AI trading decision"""
         try:
-            # Get current stock price
-            stock = yf.Ticker(symbol)
-            current_price = stock.info.get('currentPrice', 0)
+            # Get current stock price (cached bar or last trade when fresh enough)
+            quote = self.quotes.get_quote(symbol)
             
-            if current_price == 0:
+            if not quote:
                 print(f"   ❌ Could not get current price for {symbol}")
                 return False
+            current_price = quote['price']
             
             # Calculate position size based on risk management
             account = self.alpaca_api.get_account()
@@ -152,19 +202,16 @@ class AITradingBot:
             
             print(f"   📊 Executing {action.upper()} for {symbol}")
             print(f"      Shares: {position_size}")
-            print(f"      Price: ${current_price:.2f}")
+            print(f"      Price: ${current_price:.2f} ({quote['source']}, {quote['age']:.0f}s old)")
             print(f"      Total: ${position_size * current_price:.2f}")
             
             # Place the order
-            order = self.alpaca_api.submit_order(
-                symbol=symbol,
-                qty=position_size,
-                side=action.lower(),
-                type='market',
-                time_in_force='day'
-            )
+            order = self._submit_order(symbol, position_size, action.lower(), current_price)
+            if order is None:
+                return False
             
             print(f"      ✅ Order placed: {order.id}")
+            self.quotes.record_trade(symbol, getattr(order, 'filled_avg_price', None))
             
             # Create trade data
             trade_data = {
@@ -201,76 +248,72 @@ class AITradingBot:
         print(f"\n🔍 STOCK DISCOVERY CYCLE - Cycle {self.discovery_cycle_count}")
         print("=" * 60)
         
-        # Define sectors to explore for new opportunities
-        sectors = {
-            'Technology': ['NVDA', 'AMD', 'SNOW', 'PLTR', 'CRWD', 'ZS', 'NET', 'OKTA'],
-            'Healthcare': ['MRNA', 'BNTX', 'REGN', 'VRTX', 'ALNY', 'IONS', 'SGEN'],
-            'Finance': ['JPM', 'BAC', 'WFC', 'GS', 'MS', 'BLK', 'SCHW', 'V', 'MA'],
-            'Consumer': ['NKE', 'SBUX', 'HD', 'LOW', 'TGT', 'COST', 'TJX'],
-            'Industrial': ['CAT', 'DE', 'BA', 'LMT', 'RTX', 'GE', 'MMM'],
-            'Energy': ['XOM', 'CVX', 'COP', 'EOG', 'SLB', 'HAL']
-        }
+        # Sectors to explore for new opportunities (all indexed sectors unless configured)
+        sectors = self.discovery_sectors or self.symbols.sectors()
         
         discovered_opportunities = []
         
-        for sector, stocks in sectors.items():
-            print(f"\n🏭 Analyzing {sector} sector...")
-            
-            for symbol in stocks:
-                try:
-                    # Check if stock is already in portfolio or monitoring
-                    if symbol in self.stocks_to_monitor or symbol in [pos.symbol for pos in self.alpaca_api.list_positions()]:
-                        continue
-                    
-                    # Get current stock info
-                    stock = yf.Ticker(symbol)
-                    info = stock.info
-                    
-                    # Check price range
-                    current_price = info.get('currentPrice', 0)
-                    if not (self.price_min <= current_price <= self.price_max):
-                        continue
-                    
-                    print(f"   🔍 Analyzing {symbol} at ${current_price:.2f}")
-                    
-                    # Get technical indicators
-                    indicators = self.ai_engine.get_technical_indicators(symbol)
-                    if not indicators:
-                        continue
-                    
-                    # Get market context
-                    context = self.ai_engine.get_market_context(symbol)
-                    
-                    # Get AI decision
-                    decision = self.ai_engine.get_ai_decision(symbol, indicators)
+        # Stage 1: fetch positions once and drop anything already held or monitored
+        held_symbols = {pos.symbol for pos in self.alpaca_api.list_positions()}
+        candidate_sectors = {symbol: sector for sector in sectors for symbol in self.symbols.symbols_in_sector(sector)
+                             if symbol not in self.stocks_to_monitor and symbol not in held_symbols}
+        
+        # Stage 2: one batched quote lookup, then a vectorized price band and liquidity screen;
+        # liquidity is judged on today's quote, never a stored tier, so illiquid names get another look
+        quotes = self.ai_engine.market_data.get_daily_quotes(list(candidate_sectors))
+        passed = quotes[quotes['price'].between(self.price_min, self.price_max) &
+                        (quotes['dollar_volume'] >= self.min_dollar_volume)]
+        print(f"   🧮 Prescreen: {len(passed)}/{len(candidate_sectors)} candidates in price band and liquid")
+        for symbol, dollar_volume in quotes['dollar_volume'].items():
+            self.symbols.update(symbol, liquidity_tier=liquidity_tier(dollar_volume))
+        
+        # Stage 3: indicators (one vectorized pass) and AI only for survivors
+        candidate_indicators = self.ai_engine.get_technical_indicators_panel(list(passed.index))
+        
+        for symbol, quote in passed.iterrows():
+            sector = candidate_sectors[symbol]
+            try:
+                current_price = quote['price']
+                print(f"   🔍 Analyzing {symbol} ({sector}) at ${current_price:.2f}")
+                
+                # Get technical indicators
+                indicators = candidate_indicators.get(symbol)
+                if not indicators:
+                    continue
+                
+                # Get market context
+                context = self.ai_engine.get_market_context(symbol)
+                
+                # Get AI decision
+                decision = self.ai_engine.get_ai_decision(symbol, indicators=indicators)
+                
+                if decision and decision.get('action') == 'buy':
+                    confidence = decision.get('confidence', 0)
                     
-                    if decision and decision.get('action') == 'buy':
-                        confidence = decision.get('confidence', 0)
+                    if confidence >= self.min_confidence:
+                        opportunity = {
+                            'symbol': symbol,
+                            'sector': sector,
+                            'current_price': current_price,
+                            'confidence': confidence,
+                            'reasoning': decision.get('reasoning', ''),
+                            'indicators': indicators,
+                            'context': context
+                        }
                         
-                        if confidence >= self.min_confidence:
-                            opportunity = {
-                                'symbol': symbol,
-                                'sector': sector,
-                                'current_price': current_price,
-                                'confidence': confidence,
-                                'reasoning': decision.get('reasoning', ''),
-                                'indicators': indicators,
-                                'context': context
-                            }
-                            
-                            discovered_opportunities.append(opportunity)
-                            print(f"      ✅ {symbol}: BUY signal (Confidence: {confidence:.2f})")
-                        else:
-                            print(f"      ⚠️ {symbol}: Low confidence ({confidence:.2f})")
+                        discovered_opportunities.append(opportunity)
+                        print(f"      ✅ {symbol}: BUY signal (Confidence: {confidence:.2f})")
                     else:
-                        print(f"      ❌ {symbol}: No buy signal")
-                    
-                    # Rate limiting
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    print(f"      ❌ Error analyzing {symbol}: {e}")
-                    continue
+                        print(f"      ⚠️ {symbol}: Low confidence ({confidence:.2f})")
+                else:
+                    print(f"      ❌ {symbol}: No buy signal")
+                
+                # Rate limiting
+                time.sleep(2)
+                
+            except Exception as e:
+                print(f"      ❌ Error analyzing {symbol}: {e}")
+                continue
         
         # Sort opportunities by confidence
         discovered_opportunities.sort(key=lambda x: x['confidence'], reverse=True)
@@ -320,13 +363,9 @@ class AITradingBot:
                 print(f"      Total: ${position_size * current_price:.2f}")
                 
                 # Place the order
-                order = self.alpaca_api.submit_order(
-                    symbol=symbol,
-                    qty=position_size,
-                    side='buy',
-                    type='market',
-                    time_in_force='day'
-                )
+                order = self._submit_order(symbol, position_size, 'buy', current_price)
+                if order is None:
+                    continue
                 
                 print(f"      ✅ Order placed: {order.id}")
                 
@@ -377,6 +416,9 @@ class AITradingBot:
             
             print(f"   📊 Analyzing {len(positions)} existing positions...")
             
+            # Held symbols not already fetched this cycle arrive in one request
+            self.ai_engine.prefetch_market_data([pos.symbol for pos in positions])
+            
             for position in positions:
                 symbol = position.symbol
                 qty = int(float(position.qty))
@@ -396,14 +438,14 @@ class AITradingBot:
                     # Get AI analysis for recovery
                     indicators = self.ai_engine.get_technical_indicators(symbol)
                     if indicators:
-                        decision = self.ai_engine.get_ai_decision(symbol, indicators)
+                        decision = self.ai_engine.get_ai_decision(symbol, indicators=indicators)
                         
                         if decision and decision.get('action') == 'buy':
                             confidence = decision.get('confidence', 0)
                             print(f"      🤖 AI suggests BUY for recovery (Confidence: {confidence:.2f})")
                             
                             # Execute recovery trade if confidence is good
-                            if confidence >= 0.4:  # Lower threshold for recovery
+                            if confidence >= self.recovery_min_confidence:
                                 print(f"      🚀 Executing recovery trade...")
                                 if self.execute_ai_trade(symbol, 'buy', decision):
                                     print(f"      ✅ Recovery trade executed for {symbol}")
@@ -418,65 +460,220 @@ class AITradingBot:
         except Exception as e:
             print(f"   ❌ Error in portfolio recovery analysis: {e}")
     
-    def run_ai_analysis_cycle(self):
-        """Run one complete AI analysis cycle"""
+    def analyze_symbol(self, symbol):
+        """Fetch indicators and get an AI decision for one symbol (thread-safe)"""
+        print(f"\n🔍 Analyzing {symbol}...")
+        
+        # Get technical indicators
+        indicators = self.ai_engine.get_technical_indicators(symbol)
+        if not indicators:
+            print(f"   ❌ No indicators available for {symbol}")
+            return None
+        
+        # Get AI decision
+        return self.ai_engine.get_ai_decision(symbol, indicators=indicators)
+    
+    def analyze_symbols_batched(self, symbols, pool):
+        """Compute indicators concurrently, then get AI decisions in multi-stock batches"""
+        indicators_by_symbol = {}
+        for symbol, indicators in zip(symbols, pool.map(self.ai_engine.get_technical_indicators, symbols)):
+            if indicators:
+                indicators_by_symbol[symbol] = indicators
+            else:
+                print(f"   ❌ No indicators available for {symbol}")
+        
+        return self.ai_engine.get_ai_decisions_batch(list(indicators_by_symbol), indicators_by_symbol=indicators_by_symbol,
+                                                     batch_size=self.ai_batch_size)
+    
+    def begin_cycle(self):
+        """Start a cycle: fresh broker snapshot, bars and analysis memo"""
         print(f"\n🧠 AI ANALYSIS CYCLE STARTED - {datetime.now().strftime('%H:%M:%S')}")
         print("=" * 60)
+        self.alpaca_api.begin_cycle()
+        # Gate limits are checked against this snapshot, with no broker call per order
+        self.gate.sync(self.alpaca_api.get_account(), self.alpaca_api.list_positions())
+        # Indicators, context and decisions are computed once per symbol per cycle
+        self.ai_engine.begin_cycle()
+        self.cycle_trades = 0
+    
+    def end_cycle(self):
+        """Print cycle stats and release the broker snapshot"""
+        gate_stats = self.gate.stats()
+        print(f"\n✔ AI Analysis Cycle Complete - Cycle trades: {self.cycle_trades}, "
+              f"daily trades: {gate_stats['daily_trades']}/{self.max_daily_trades}")
+        if gate_stats['rejections']:
+            print(f"   🛑 Pre-trade rejections: " +
+                  ", ".join(f"{kind} {count}" for kind, count in sorted(gate_stats['rejections'].items())))
+        cache_stats = self.ai_engine.fundamentals.stats()
+        print(f"   📦 Fundamentals cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        decision_stats = self.ai_engine.decision_cache.stats()
+        print(f"   ♻️ Decision cache: {decision_stats['llm_calls_saved']} AI calls saved "
+              f"({decision_stats['hit_rate'] * 100:.0f}% hit rate)")
+        parse_stats = self.ai_engine.decision_parser.stats()
+        print(f"   🧾 AI replies: {parse_stats['parsed']} parsed, {parse_stats['repaired']} repaired, "
+              f"{parse_stats['failed']} failed ({parse_stats['failure_rate'] * 100:.1f}% failure rate)")
+        memo_stats = self.ai_engine.cycle_memo.stats()
+        print(f"   🧠 Analysis memo: {memo_stats['hits']} repeated analyses avoided")
+        broker_stats = self.alpaca_api.stats()
+        print(f"   🏦 Broker snapshot: {broker_stats['fetches']} fetches, {broker_stats['hits']} reads served locally")
+        for channel, notify_stats in self.notifier.stats().items():
+            print(f"   📨 {channel}: {notify_stats['sent']} sent, {notify_stats['coalesced']} merged into digests, "
+                  f"{notify_stats['failed']} failed, {notify_stats['dropped']} dropped")
+        self.alpaca_api.end_cycle()
         
-        daily_trades = 0
+        # Learn sectors, size and liquidity from fundamentals fetched this cycle
+        updated = self.symbols.refresh_from_fundamentals(self.ai_engine.fundamentals)
+        if updated:
+            print(f"   🗂️ Symbol metadata: {updated} symbols updated")
+    
+    def run_ai_analysis_cycle(self):
+        """Run one complete AI analysis cycle"""
+        self.begin_cycle()
+        try:
+            self.analyze_monitored_stocks()
+            
+            # Stock discovery cycle (every few cycles)
+            self.discovery_cycle_count += 1
+            if self.discovery_cycle_count % self.discovery_interval == 0:
+                self.run_discovery()
+            
+            # Portfolio recovery analysis (every cycle)
+            self.analyze_portfolio_recovery()
+        finally:
+            self.end_cycle()
+        return self.cycle_trades
+    
+    def analyze_monitored_stocks(self):
+        """Analyse the monitored stocks and execute confident decisions"""
+        trades = 0
         
-        # Analyze current stocks (existing functionality)
-        for symbol in self.stocks_to_monitor:
-            try:
-                print(f"\n🔍 Analyzing {symbol}...")
-                
-                # Get technical indicators
-                indicators = self.ai_engine.get_technical_indicators(symbol)
-                if not indicators:
-                    print(f"   ❌ No indicators available for {symbol}")
-                    continue
-                
-                # Get AI decision
-                decision = self.ai_engine.get_ai_decision(symbol, indicators)
-                
-                if decision and daily_trades < self.max_daily_trades:
-                    action = decision.get('action', 'hold')
-                    confidence = decision.get('confidence', 0)
-                    
-                    print(f"   🤖 AI Decision: {action.upper()} (Confidence: {confidence:.2f})")
+        # Batched data-fetch stage: one download for the whole monitored universe
+        self.ai_engine.prefetch_market_data(self.stocks_to_monitor)
+        
+        # Analysis stage: data, indicators and AI calls for different symbols
+        # overlap, with at most analysis_concurrency symbols in flight
+        with ThreadPoolExecutor(max_workers=self.analysis_concurrency) as pool:
+            if self.ai_batch_size > 1:
+                # Batch mode: indicators in parallel, then one AI request per batch
+                batch_decisions = self.analyze_symbols_batched(self.stocks_to_monitor, pool)
+                results = [(symbol, batch_decisions.get(symbol)) for symbol in self.stocks_to_monitor]
+            else:
+                results = [(symbol, pool.submit(self.analyze_symbol, symbol)) for symbol in self.stocks_to_monitor]
+            
+            # Execution stage stays serialized and in monitoring order; the
+            # pre-trade gate applies the daily trade cap
+            for symbol, result in results:
+                try:
+                    decision = result.result() if isinstance(result, Future) else result
                     
-                    if confidence >= self.min_confidence and action in ['buy', 'sell']:
-                        if self.execute_ai_trade(symbol, action, decision):
-                            daily_trades += 1
-                            print(f"   ✅ Trade executed for {symbol}")
+                    if decision:
+                        action = decision.get('action', 'hold')
+                        confidence = decision.get('confidence', 0)
+                        
+                        print(f"   🤖 AI Decision for {symbol}: {action.upper()} (Confidence: {confidence:.2f})")
+                        
+                        if confidence >= self.min_confidence and action in ['buy', 'sell']:
+                            with self.trade_lock:
+                                executed = self.execute_ai_trade(symbol, action, decision)
+                            if executed:
+                                trades += 1
+                                print(f"   ✅ Trade executed for {symbol}")
+                            else:
+                                print(f"   ❌ Trade failed for {symbol}")
                         else:
-                            print(f"   ❌ Trade failed for {symbol}")
+                            print(f"   ⚠️ Insufficient confidence or hold decision")
                     else:
-                        print(f"   ⚠️ Insufficient confidence or hold decision")
-                else:
-                    print(f"   ⏸️ No action taken for {symbol}")
-                
-                # Rate limiting between stocks
-                time.sleep(5)
-                
-            except Exception as e:
-                print(f"   ❌ Error analyzing {symbol}: {e}")
-                continue
+                        print(f"   ⏸️ No action taken for {symbol}")
+                    
+                except Exception as e:
+                    print(f"   ❌ Error analyzing {symbol}: {e}")
+                    continue
+        
+        self.cycle_trades = trades
+        return trades
+    
+    def run_discovery(self):
+        """Discover new stocks and trade the best opportunities"""
+        print(f"\n🔍 STOCK DISCOVERY CYCLE (Every {self.discovery_interval} cycles)")
+        opportunities = self.discover_new_stocks()
+        if opportunities:
+            self.execute_discovery_trades(opportunities)
+    
+    def send_daily_report(self):
+        """Portfolio snapshot plus the day's trades to Telegram at the market close"""
+        report = self.portfolio.generate_portfolio_report(session=datetime.now(MARKET_TZ).date())
+        if not report:
+            print("⚠️ No portfolio report available - skipping daily summary")
+            return
+        metrics = report['metrics']
+        today = datetime.now().date().isoformat()
+        trades_today = [t for t in self.weekly_trades if t['timestamp'].startswith(today)]
+        self.telegram.send_daily_summary(dict(metrics, total_return=metrics['total_return_pct']), trades_today)
+    
+    def send_weekly_report(self):
+        """Weekly email report after the last session of the week"""
+        # Shares the daily report's snapshot for the same close
+        report = self.portfolio.generate_portfolio_report(session=datetime.now(MARKET_TZ).date())
+        if not report:
+            print("⚠️ No portfolio report available - skipping weekly report")
+            return
+        metrics = report['metrics']
+        if self.email_reporter.send_weekly_report(dict(metrics, total_return=metrics['total_return_pct']),
+                                                  self.weekly_trades, metrics):
+            self.weekly_trades = []
+    
+    def create_scheduler(self):
+        """Jobs fired on bar closes from the trading calendar, each with its own cadence"""
+        scheduler = Scheduler(TradingCalendar(self.alpaca_api), interval='1h',
+                              before_jobs=self.begin_cycle, after_jobs=self.end_cycle)
+        scheduler.add_job('analysis', self.analyze_monitored_stocks, BAR_CLOSE, priority=0)
+        scheduler.add_job('recovery', self.analyze_portfolio_recovery, BAR_CLOSE, priority=1)
+        scheduler.add_job('discovery', self.run_discovery, BAR_CLOSE, every=self.discovery_interval, priority=2)
+        # Reports only read the portfolio, so they run outside the trading cycle hooks
+        scheduler.add_job('daily_report', self.send_daily_report, MARKET_CLOSE, priority=3, cycle=False)
+        scheduler.add_job('weekly_report', self.send_weekly_report, WEEKLY_CLOSE, priority=4, cycle=False)
+        return scheduler
+    
+    def start_streaming(self):
+        """Feed streamed bars to the ingestor on a background thread"""
+        if self.stream_source is None:
+            return
+        self.stream = StreamIngestor(self.on_stream_trigger, store=self.ai_engine.market_data.store)
+        self.stream_source.subscribe(self.stocks_to_monitor)
+        self.stream_source.subscribe_trade_updates(self.on_trade_update)
         
-        # Stock discovery cycle (every few cycles)
-        self.discovery_cycle_count += 1
-        if self.discovery_cycle_count % self.discovery_interval == 0:
-            print(f"\n🔍 STOCK DISCOVERY CYCLE (Every {self.discovery_interval} cycles)")
-            opportunities = self.discover_new_stocks()
-            if opportunities:
-                self.execute_discovery_trades(opportunities)
+        def on_bar(event):
+            self.quotes.record_trade(event['symbol'], event['close'], event['ts'].timestamp())
+            self.stream.on_bar(event)
         
-        # Portfolio recovery analysis (every cycle)
-        self.analyze_portfolio_recovery()
+        def run():
+            try:
+                self.stream_source.run(on_bar)
+            except Exception as e:
+                print(f"❌ Stream stopped: {e}")
+            stats = self.stream.stats()
+            print(f"📡 Stream ended: {stats['events']} bars, {stats['triggers']} analyses triggered")
         
-        print(f"\n✔ AI Analysis Cycle Complete - Daily trades: {daily_trades}/{self.max_daily_trades}")
-        return daily_trades
-
+        threading.Thread(target=run, name='bar-stream', daemon=True).start()
+        print(f"📡 Streaming {self.stream_source.name} bars for {len(self.stocks_to_monitor)} symbols")
+    
+    def on_trade_update(self, event, order):
+        """Order update from the broker stream; fills replace the snapshot's estimate"""
+        if event in ('fill', 'partial_fill'):
+            self.alpaca_api.on_fill(order)
+    
+    def on_stream_trigger(self, symbol, indicators, reason, ts):
+        """Analyse a symbol whose streamed bars moved meaningfully, and trade if confident"""
+        decision = self.ai_engine.get_ai_decision(symbol, indicators=indicators, as_of=ts)
+        if not decision:
+            return
+        action = decision.get('action', 'hold')
+        confidence = decision.get('confidence', 0)
+        print(f"   🤖 Stream decision for {symbol} ({reason}): {action.upper()} (Confidence: {confidence:.2f})")
+        if confidence >= self.min_confidence and action in ['buy', 'sell']:
+            with self.trade_lock:
+                self.execute_ai_trade(symbol, action, decision)
+    
     def run_bot(self):
         """Main bot loop"""
         print("🚀 Starting AI Portfolio Manager...")
@@ -504,42 +701,43 @@ class AITradingBot:
         
         # Run initial analysis cycle
         self.run_ai_analysis_cycle()
+        self.start_streaming()
         
-        while True:
-            try:
-                # Get market time information safely
-                market_info = self.get_market_time_info()
-                
-                if market_info['is_open']:
-                    print(f"\n🟢 Market is OPEN - Running AI analysis...")
-                    self.run_ai_analysis_cycle()
-                    
-                    # Sleep between cycles (30 minutes)
-                    print("II Sleeping for 30 minutes...")
-                    time.sleep(1800)  # 30 minutes
-                else:
-                    # Use safe market time info
-                    next_open = market_info['next_open']
-                    current_time = market_info['current_time']
-                    hours_until_open = market_info['hours_until_open']
-                    
-                    print(f"\n🔴 Market is CLOSED")
-                    if next_open:
-                        print(f"   Next open: {next_open.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-                    print(f"   Current time: {current_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-                    print(f"   Time until open: {hours_until_open:.1f} hours")
-                    
-                    # Sleep until market opens (check every hour)
-                    sleep_time = min(3600, max(300, int(hours_until_open * 3600 / 2)))
-                    print(f"   Sleeping for {sleep_time//60} minutes...")
-                    time.sleep(sleep_time)
-                    
-            except Exception as e:
-                print(f"❌ Error in main bot loop: {e}")
-                print(f"   Error type: {type(e).__name__}")
-                print(f"   Error details: {str(e)}")
-                print(f"   Stack trace: {e.__traceback__}")
-                time.sleep(300)  # Wait 5 minutes before retrying
+        # Then run jobs right after each hourly bar closes; the scheduler sleeps
+        # through closed hours using the cached trading calendar
+        self.scheduler = self.create_scheduler()
+        market_info = self.get_market_time_info()
+        if not market_info['is_open'] and market_info['next_open']:
+            print(f"\n🔴 Market is CLOSED - Next open: {market_info['next_open'].strftime('%Y-%m-%d %H:%M:%S %Z')}")
+        
+        # Platforms stop containers with SIGTERM; let the scheduler finish its job and exit
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.scheduler.stop())
+        
+        try:
+            while True:
+                try:
+                    self.scheduler.run_forever()
+                    break  # Stopped
+                except Exception as e:
+                    print(f"❌ Error in main bot loop: {e}")
+                    print(f"   Error type: {type(e).__name__}")
+                    print(f"   Error details: {str(e)}")
+                    print(f"   Stack trace: {e.__traceback__}")
+                    if self.scheduler.stop_event.wait(300):  # Wait 5 minutes before retrying
+                        break
+        finally:
+            self.shutdown()
+    
+    def shutdown(self):
+        """Stop the stream and deliver queued notifications before exiting"""
+        print("🛑 Shutting down AI Portfolio Manager...")
+        if self.stream_source is not None:
+            self.stream_source.stop()
+        if self.stream is not None:
+            self.stream.close()
+        if not self.notifier.close(timeout=float(os.getenv("NOTIFY_SHUTDOWN_TIMEOUT", 30))):
+            print("⚠️ Some notifications could not be delivered before shutdown")
 
     def get_market_time_info(self):
         """Safely get market time information with proper timezone handling"""
@@ -549,8 +747,10 @@ class AITradingBot:
             # Get next market open time
             next_open = clock.next_open
             
-            # Get current time in the same timezone as market data
-            if next_open.tzinfo:
+            # Get current time in the same timezone as market data (broker time when reported)
+            if getattr(clock, 'timestamp', None) is not None and next_open.tzinfo:
+                current_time = clock.timestamp.astimezone(next_open.tzinfo)
+            elif next_open.tzinfo:
                 current_time = datetime.now(next_open.tzinfo)
             else:
                 # Fallback to UTC if no timezone info
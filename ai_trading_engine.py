@@ -1,67 +1,126 @@
-import google.generativeai as genai
-import yfinance as yf
-import pandas as pd
-import ta
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime
 import json
 import time
+from market_data import MarketDataFeed
+from bar_store import BarStore
+from indicators import IncrementalIndicators, panel_indicators
+from fundamentals_cache import FundamentalsCache
+from decision_cache import DecisionCache
+from decision_backends import create_backend
+from decision_parser import DecisionParser, validate_decision
+from cycle_memo import CycleMemo
+
+# Ticker.info fields used to build the market context
+CONTEXT_FIELDS = ['sector', 'industry', 'marketCap', 'trailingPE', 'beta', 'dividendYield',
+                  'averageVolume', 'priceToBook', 'debtToEquity', 'currentRatio',
+                  'profitMargins', 'revenueGrowth', 'earningsGrowth']
+
+# Position size multiplier per AI risk level
+RISK_MULTIPLIERS = {
+    'LOW': 1.0,
+    'MEDIUM': 0.8,
+    'HIGH': 0.6
+}
+
+def position_size_fraction(base_size, confidence, risk_multiplier, position_count, max_position_size):
+    """Fraction of the portfolio to allocate; works on scalars and NumPy arrays alike"""
+    # Adjust based on confidence
+    confidence_multiplier = 0.5 + (confidence * 0.5)  # 0.5 to 1.0
+    
+    # Adjust based on portfolio diversification: reduce size if already have many positions
+    diversification_multiplier = np.maximum(0.5, 1.0 - (position_count * 0.1))
+    
+    # Calculate final position size and apply maximum position size limit
+    final_size = base_size * confidence_multiplier * risk_multiplier * diversification_multiplier
+    return np.minimum(final_size, max_position_size)
 
 class AITradingEngine:
-    def __init__(self, gemini_api_key):
-        """Initialize AI Trading Engine with Gemini API"""
-        genai.configure(api_key=gemini_api_key)
-        self.model = genai.GenerativeModel("gemini-1.5-pro")
+    def __init__(self, gemini_api_key=None, backend=None, market_data=None, fundamentals=None):
+        """Initialize AI Trading Engine with a decision backend (Gemini by default)"""
+        self.backend = backend or create_backend(gemini_api_key=gemini_api_key)
         self.risk_tolerance = "moderate"  # conservative, moderate, aggressive
         self.max_position_size = 0.1  # 10% of portfolio per position
+        self.market_data = market_data or MarketDataFeed(BarStore())  # Bars shared across a cycle, cached on disk
+        self.indicator_states = {}  # symbol -> IncrementalIndicators
+        self.fundamentals = fundamentals or FundamentalsCache()  # Shared with the bot for Ticker.info lookups
+        self.decision_cache = DecisionCache()  # Skips Gemini when inputs have barely moved
+        self.batch_size = 5  # Stocks per request in batch mode
+        self.max_batch_prompt_chars = 20000  # Split batches whose prompt would exceed this
+        self.decision_parser = DecisionParser()  # Tolerant JSON extraction and parse-failure stats
+        self.max_repair_attempts = 1  # Cheap follow-up requests allowed per unparseable reply
+        self.cycle_memo = CycleMemo()  # Indicators, context and decisions computed once per cycle
         
+    def begin_cycle(self):
+        """Start a new analysis cycle: fresh bars and nothing memoized"""
+        self.market_data.clear()
+        self.cycle_memo.clear()
+    
     def get_technical_indicators(self, symbol, period='60d'):
         """Get comprehensive technical indicators for a stock"""
         try:
-            df = yf.download(symbol, period=period, interval='1h')
-            df.dropna(inplace=True)
+            # Served from the cycle's batched download when prefetched
+            df = self.market_data.get_bars(symbol, period=period, interval='1h')
             
-            if len(df) < 20:
+            if df is None or len(df) < 20:
                 return None
-                
-            # Ensure we have 1D Series for technical analysis
-            close_prices = df['Close'].squeeze()
-            high_prices = df['High'].squeeze()
-            low_prices = df['Low'].squeeze()
-            volume = df['Volume'].squeeze()
             
-            # Technical Indicators
-            indicators = {
-                'symbol': symbol,
-                'current_price': close_prices.iloc[-1],
-                'price_change_24h': ((close_prices.iloc[-1] - close_prices.iloc[-24]) / close_prices.iloc[-24] * 100) if len(close_prices) > 24 else 0,
-                'volume_avg': volume.rolling(20).mean().iloc[-1],
-                'volume_current': volume.iloc[-1],
-                'rsi': ta.momentum.RSIIndicator(close_prices).rsi().iloc[-1],
-                'macd': ta.trend.MACD(close_prices).macd().iloc[-1],
-                'macd_signal': ta.trend.MACD(close_prices).macd_signal().iloc[-1],
-                'bollinger_upper': ta.volatility.BollingerBands(close_prices).bollinger_hband().iloc[-1],
-                'bollinger_lower': ta.volatility.BollingerBands(close_prices).bollinger_lband().iloc[-1],
-                'sma_20': ta.trend.SMAIndicator(close_prices, window=20).sma_indicator().iloc[-1],
-                'sma_50': ta.trend.SMAIndicator(close_prices, window=50).sma_indicator().iloc[-1],
-                'ema_12': ta.trend.EMAIndicator(close_prices, window=12).ema_indicator().iloc[-1],
-                'ema_26': ta.trend.EMAIndicator(close_prices, window=26).ema_indicator().iloc[-1],
-                'stoch_k': ta.momentum.StochasticOscillator(high_prices, low_prices, close_prices).stoch().iloc[-1],
-                'stoch_d': ta.momentum.StochasticOscillator(high_prices, low_prices, close_prices).stoch_signal().iloc[-1],
-                'atr': ta.volatility.AverageTrueRange(high_prices, low_prices, close_prices).average_true_range().iloc[-1]
-            }
-            
-            return indicators
+            return self.cycle_memo.get_or_compute(('indicators', symbol, df.index[-1]),
+                                                  lambda: self._update_indicator_state(symbol, df))
             
         except Exception as e:
             print(f"❌ Error getting technical indicators for {symbol}: {e}")
             return None
     
+    def _update_indicator_state(self, symbol, df):
+        """Fold only the bars not seen yet into the symbol's running indicators"""
+        state = self.indicator_states.get(symbol)
+        completed = df.iloc[:-1]  # The newest bar may still be forming
+        
+        # Start over when the stored history no longer connects to the new bars
+        if state is None or state.last_ts not in completed.index:
+            state = IncrementalIndicators(symbol)
+            new_bars = completed
+        else:
+            new_bars = completed[completed.index > state.last_ts]
+        
+        for ts, high, low, close, volume in zip(new_bars.index, new_bars['High'], new_bars['Low'],
+                                                new_bars['Close'], new_bars['Volume']):
+            state.update(high, low, close, volume, ts)
+        self.indicator_states[symbol] = state
+        
+        last = df.iloc[-1]
+        return state.preview(last['High'], last['Low'], last['Close'], last['Volume'])
+    
+    def get_technical_indicators_panel(self, symbols, period='60d'):
+        """Get technical indicators for a whole symbol universe in one vectorized pass"""
+        try:
+            bars = self.market_data.get_many(symbols, period=period, interval='1h')
+            bars = {symbol: df for symbol, df in bars.items() if len(df) >= 20}
+            return panel_indicators(bars)
+            
+        except Exception as e:
+            print(f"❌ Error computing panel indicators for {len(symbols)} symbols: {e}")
+            return {}
+    
+    def prefetch_market_data(self, symbols, period='60d'):
+        """Download bars for a whole symbol universe in one request"""
+        return self.market_data.prefetch(symbols, period=period, interval='1h')
+    
     def get_market_context(self, symbol):
-        """Get market context and sentiment for a stock"""
+        """Get market context and sentiment for a stock, once per cycle"""
+        return self.cycle_memo.get_or_compute(('context', symbol), lambda: self._fetch_market_context(symbol))
+    
+    def _last_bar_ts(self, symbol, period='60d'):
+        """Timestamp of the newest bar this cycle has for a symbol"""
+        df = self.market_data.get_bars(symbol, period=period, interval='1h')
+        return df.index[-1] if df is not None and len(df) else None
+    
+    def _fetch_market_context(self, symbol):
+        """Build market context from cached fundamentals"""
         try:
-            # Get basic stock info
-            stock = yf.Ticker(symbol)
-            info = stock.info
+            # Get basic stock info (shared TTL cache over Ticker.info)
+            info = self.fundamentals.get(symbol, CONTEXT_FIELDS)
             
             # Check if we got valid info
             if not info or len(info) == 0:
@@ -119,16 +178,9 @@ class AITradingEngine:
                 'earnings_growth': 0
             }
     
-    def create_ai_prompt(self, indicators, context, portfolio_info=None):
-        """Create comprehensive AI prompt for trading decision"""
-        
-        # Handle portfolio_info safely
-        portfolio_value = portfolio_info.get('total_value', 100000) if portfolio_info else 100000
-        
-        prompt = f"""
-You are an expert AI trading analyst. Analyze the following stock data and provide a trading recommendation.
-
-STOCK: {indicators['symbol']}
+    def format_stock_block(self, indicators, context):
+        """Format one stock's price, indicators and market context for a prompt"""
+        return f"""STOCK: {indicators['symbol']}
 CURRENT PRICE: ${indicators['current_price']:.2f}
 24H CHANGE: {indicators['price_change_24h']:.2f}%
 
@@ -147,7 +199,18 @@ MARKET CONTEXT:
 - P/E Ratio: {context.get('pe_ratio', 0):.2f}
 - Beta: {context.get('beta', 1.0):.2f}
 - Market Cap: ${context.get('market_cap', 0):,.0f}
+"""
+    
+    def create_ai_prompt(self, indicators, context, portfolio_info=None):
+        """Create comprehensive AI prompt for trading decision"""
+        
+        # Handle portfolio_info safely
+        portfolio_value = portfolio_info.get('total_value', 100000) if portfolio_info else 100000
+        
+        prompt = f"""
+You are an expert AI trading analyst. Analyze the following stock data and provide a trading recommendation.
 
+{self.format_stock_block(indicators, context)}
 PORTFOLIO CONTEXT:
 - Risk Tolerance: {self.risk_tolerance}
 - Max Position Size: {self.max_position_size * 100}% of portfolio
@@ -176,55 +239,269 @@ Focus on risk management and provide clear reasoning for your decision.
 """
         return prompt
     
-    def get_ai_decision(self, symbol, portfolio_info=None):
-        """Get AI-powered trading decision for a stock"""
+    def create_batch_ai_prompt(self, items, portfolio_info=None):
+        """Create one AI prompt covering several stocks (items of indicators, context)"""
+        portfolio_value = portfolio_info.get('total_value', 100000) if portfolio_info else 100000
+        blocks = "\n".join(f"=== STOCK {i + 1} of {len(items)} ===\n{self.format_stock_block(indicators, context)}"
+                           for i, (indicators, context) in enumerate(items))
+        
+        prompt = f"""
+You are an expert AI trading analyst. Analyze each of the following {len(items)} stocks independently and provide a trading recommendation for every one of them.
+
+{blocks}
+PORTFOLIO CONTEXT:
+- Risk Tolerance: {self.risk_tolerance}
+- Max Position Size: {self.max_position_size * 100}% of portfolio
+- Current Portfolio Value: ${portfolio_value:,.2f}
+
+ANALYSIS REQUIREMENTS:
+1. Analyze technical indicators for trend direction and momentum
+2. Consider market context and sector performance
+3. Assess risk-reward ratio based on current price levels
+4. Factor in portfolio diversification and risk tolerance
+5. Consider market volatility and ATR for position sizing
+
+PROVIDE YOUR RESPONSE AS A JSON ARRAY WITH EXACTLY ONE OBJECT PER STOCK, IN THIS EXACT FORMAT:
+[
+    {{
+        "symbol": "TICKER",
+        "action": "BUY|SELL|HOLD",
+        "confidence": 0.0-1.0,
+        "reasoning": "Detailed explanation of your decision",
+        "position_size": 0.0-1.0,
+        "stop_loss": price,
+        "take_profit": price,
+        "risk_level": "LOW|MEDIUM|HIGH",
+        "time_horizon": "SHORT|MEDIUM|LONG"
+    }}
+]
+
+Focus on risk management and provide clear reasoning for each decision.
+"""
+        return prompt
+    
+    def get_ai_decision(self, symbol, portfolio_info=None, indicators=None, as_of=None):
+        """Get AI-powered trading decision for a stock, at most once per cycle and bar
+
+        as_of keys the decision to a bar time the caller already knows, e.g.
+        the forming bar of a streamed update.
+        """
         try:
-            print(f"🤖 Analyzing {symbol} with AI...")
-            
-            # Get technical indicators
-            indicators = self.get_technical_indicators(symbol)
+            # Get technical indicators (unless the caller already has them)
+            indicators = indicators or self.get_technical_indicators(symbol)
             if not indicators:
                 return None
             
+            return self.cycle_memo.get_or_compute(
+                ('decision', symbol, as_of if as_of is not None else self._last_bar_ts(symbol)),
+                lambda: self._get_ai_decision(symbol, indicators, portfolio_info))
+                
+        except Exception as e:
+            print(f"❌ Error getting AI decision for {symbol}: {e}")
+            return None
+    
+    def _get_ai_decision(self, symbol, indicators, portfolio_info=None):
+        """Get AI-powered trading decision for a stock"""
+        try:
+            print(f"🤖 Analyzing {symbol} with AI...")
+            
             # Get market context
             context = self.get_market_context(symbol)
             if not context:
                 context = {}  # Use empty dict if context is None
             
-            # Create AI prompt
-            prompt = self.create_ai_prompt(indicators, context, portfolio_info)
+            # Reuse the last decision if nothing material has moved since
+            cache_key = self._decision_cache_key(symbol, indicators, context, portfolio_info)
+            cached = self._get_cached_decision(symbol, cache_key, indicators)
+            if cached:
+                return cached
             
-            # Get AI response
-            try:
-                response = self.model.generate_content(prompt)
-                
-                # Parse AI response
-                try:
-                    decision = json.loads(response.text)
-                    decision['symbol'] = symbol
-                    decision['current_price'] = indicators['current_price']
-                    decision['timestamp'] = datetime.now().isoformat()
-                    
-                    print(f"✅ AI Decision for {symbol}: {decision['action']} (Confidence: {decision['confidence']:.2f})")
-                    return decision
-                    
-                except json.JSONDecodeError:
-                    print(f"❌ Failed to parse AI response for {symbol}")
-                    return None
-                    
-            except Exception as api_error:
-                if "429" in str(api_error) or "quota" in str(api_error).lower():
-                    print(f"⚠️ Rate limit hit for {symbol}. Waiting 60 seconds...")
-                    time.sleep(60)  # Wait 1 minute for rate limit to reset
-                    return None
-                else:
-                    print(f"❌ API Error for {symbol}: {api_error}")
-                    return None
+            return self._request_decision(symbol, indicators, context, cache_key, portfolio_info)
                 
         except Exception as e:
             print(f"❌ Error getting AI decision for {symbol}: {e}")
             return None
     
+    def get_ai_decisions_batch(self, symbols, portfolio_info=None, indicators_by_symbol=None, batch_size=None):
+        """Get AI decisions for several stocks, packing them into as few requests as possible"""
+        batch_size = batch_size or self.batch_size
+        indicators_by_symbol = indicators_by_symbol or {}
+        decisions = {}
+        pending = []  # (symbol, indicators, context, cache_key)
+        
+        for symbol in symbols:
+            try:
+                memo_key = ('decision', symbol, self._last_bar_ts(symbol))
+                memoized = self.cycle_memo.get(memo_key)
+                if memoized:
+                    decisions[symbol] = memoized
+                    continue
+                indicators = indicators_by_symbol.get(symbol) or self.get_technical_indicators(symbol)
+                if not indicators:
+                    continue
+                context = self.get_market_context(symbol) or {}
+                cache_key = self._decision_cache_key(symbol, indicators, context, portfolio_info)
+                cached = self._get_cached_decision(symbol, cache_key, indicators)
+                if cached:
+                    decisions[symbol] = cached
+                else:
+                    pending.append((symbol, indicators, context, cache_key))
+            except Exception as e:
+                print(f"❌ Error preparing {symbol} for batch AI analysis: {e}")
+        
+        if pending:
+            print(f"🤖 Analyzing {len(pending)} stocks with AI in batches of up to {batch_size}...")
+        for batch in self._split_batches(pending, portfolio_info, batch_size):
+            batch_decisions = self._request_decision_batch(batch, portfolio_info)
+            for symbol, decision in batch_decisions.items():
+                self.cycle_memo.put(('decision', symbol, self._last_bar_ts(symbol)), decision)
+            decisions.update(batch_decisions)
+        
+        return decisions
+    
+    def _decision_cache_key(self, symbol, indicators, context, portfolio_info):
+        """Fingerprint of the prompt inputs for the decision cache"""
+        return self.decision_cache.fingerprint(
+            symbol, indicators, context, portfolio_info,
+            extra={'risk_tolerance': self.risk_tolerance, 'max_position_size': self.max_position_size})
+    
+    def _get_cached_decision(self, symbol, cache_key, indicators):
+        """Cached decision refreshed with the current price, or None"""
+        cached = self.decision_cache.get(cache_key)
+        if not cached:
+            return None
+        cached['current_price'] = indicators['current_price']
+        cached['timestamp'] = datetime.now().isoformat()
+        cached['cached'] = True
+        print(f"♻️ Cached AI Decision for {symbol}: {cached['action'].upper()} (Confidence: {cached['confidence']:.2f})")
+        return cached
+    
+    def _finalize_decision(self, decision, symbol, indicators, cache_key):
+        """Stamp a parsed decision and remember it in the decision cache"""
+        decision['symbol'] = symbol
+        decision['current_price'] = indicators['current_price']
+        decision['timestamp'] = datetime.now().isoformat()
+        self.decision_cache.put(cache_key, decision)
+        
+        print(f"✅ AI Decision for {symbol}: {decision['action'].upper()} (Confidence: {decision['confidence']:.2f})")
+        return decision
+    
+    def _request_decision(self, symbol, indicators, context, cache_key, portfolio_info=None):
+        """One prompt, one generate call and one parsed decision for a single stock"""
+        # Create AI prompt
+        prompt = self.create_ai_prompt(indicators, context, portfolio_info)
+        
+        # Get AI response
+        try:
+            response_text = self.backend.generate(prompt, items=[(indicators, context)])
+            
+            # Parse AI response, with a bounded number of cheap repair requests
+            decision, errors = self.decision_parser.parse(response_text)
+            outcome = 'parsed'
+            for attempt in range(self.max_repair_attempts):
+                if decision:
+                    break
+                print(f"⚠️ Unusable AI response for {symbol} ({'; '.join(errors)}) - requesting repair")
+                response_text = self.backend.generate(self.decision_parser.repair_prompt(response_text, errors),
+                                                      items=[(indicators, context)])
+                decision, errors = self.decision_parser.parse(response_text)
+                outcome = 'repaired'
+            self.decision_parser.record(outcome if decision else 'failed')
+            
+            if not decision:
+                print(f"❌ Failed to parse AI response for {symbol}: {'; '.join(errors)}")
+                return None
+            return self._finalize_decision(decision, symbol, indicators, cache_key)
+                
+        except Exception as api_error:
+            if "429" in str(api_error) or "quota" in str(api_error).lower():
+                print(f"⚠️ Rate limit hit for {symbol}. Waiting 60 seconds...")
+                time.sleep(60)  # Wait 1 minute for rate limit to reset
+                return None
+            else:
+                print(f"❌ API Error for {symbol}: {api_error}")
+                return None
+    
+    def _split_batches(self, pending, portfolio_info, batch_size):
+        """Group pending stocks into batches within the size and prompt-length limits"""
+        overhead = len(self.create_batch_ai_prompt([], portfolio_info))
+        batches = []
+        current = []
+        current_chars = overhead
+        for item in pending:
+            block_chars = len(self.format_stock_block(item[1], item[2])) + 40
+            if current and (len(current) >= batch_size or current_chars + block_chars > self.max_batch_prompt_chars):
+                batches.append(current)
+                current = []
+                current_chars = overhead
+            current.append(item)
+            current_chars += block_chars
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _request_decision_batch(self, batch, portfolio_info=None):
+        """One generate call for a batch; failed symbols are isolated and retried in smaller batches"""
+        if len(batch) == 1:
+            symbol, indicators, context, cache_key = batch[0]
+            decision = self._request_decision(symbol, indicators, context, cache_key, portfolio_info)
+            return {symbol: decision} if decision else {}
+        
+        symbols = [item[0] for item in batch]
+        prompt = self.create_batch_ai_prompt([(item[1], item[2]) for item in batch], portfolio_info)
+        
+        try:
+            items = [(item[1], item[2]) for item in batch]
+            response_text = self.backend.generate(prompt, items=items, batch=True)
+            entries = self.decision_parser.parse_batch(response_text)
+            outcome = 'parsed'
+            for attempt in range(self.max_repair_attempts):
+                if entries is not None:
+                    break
+                print(f"⚠️ Unusable batch AI response for {len(batch)} stocks - requesting repair")
+                repair = self.decision_parser.repair_prompt(response_text, ["no JSON array found in reply"], batch=True)
+                response_text = self.backend.generate(repair, items=items, batch=True)
+                entries = self.decision_parser.parse_batch(response_text)
+                outcome = 'repaired'
+            self.decision_parser.record(outcome if entries is not None else 'failed')
+        except Exception as api_error:
+            if "429" in str(api_error) or "quota" in str(api_error).lower():
+                print(f"⚠️ Rate limit hit for batch {', '.join(symbols)}. Waiting 60 seconds...")
+                time.sleep(60)  # Wait 1 minute for rate limit to reset
+                return {}
+            # Oversized requests and truncated replies are retried as two halves
+            print(f"⚠️ Batch request for {len(batch)} stocks failed ({api_error}) - splitting")
+            entries = None
+        
+        if entries is None:
+            middle = len(batch) // 2
+            decisions = self._request_decision_batch(batch[:middle], portfolio_info)
+            decisions.update(self._request_decision_batch(batch[middle:], portfolio_info))
+            return decisions
+        
+        by_symbol = {str(entry.get('symbol', '')).upper(): entry for entry in entries if isinstance(entry, dict)}
+        decisions = {}
+        missing = []
+        for item in batch:
+            symbol, indicators, context, cache_key = item
+            decision, errors = validate_decision(by_symbol.get(symbol.upper()))
+            if decision:
+                decisions[symbol] = self._finalize_decision(decision, symbol, indicators, cache_key)
+            else:
+                missing.append(item)
+        
+        # A bad or missing entry only affects its own symbol
+        if missing:
+            print(f"⚠️ Batch reply had no usable decision for {', '.join(item[0] for item in missing)} - retrying")
+            if len(missing) < len(batch):
+                decisions.update(self._request_decision_batch(missing, portfolio_info))
+            else:
+                middle = len(missing) // 2
+                decisions.update(self._request_decision_batch(missing[:middle], portfolio_info))
+                decisions.update(self._request_decision_batch(missing[middle:], portfolio_info))
+        
+        return decisions
+    
     def optimize_position_size(self, decision, portfolio_value, current_positions):
         """Optimize position size based on AI decision and portfolio context"""
         try:
@@ -232,27 +509,8 @@ Focus on risk management and provide clear reasoning for your decision.
             confidence = decision['confidence']
             risk_level = decision['risk_level']
             
-            # Adjust based on confidence
-            confidence_multiplier = 0.5 + (confidence * 0.5)  # 0.5 to 1.0
-            
-            # Adjust based on risk level
-            risk_multiplier = {
-                'LOW': 1.0,
-                'MEDIUM': 0.8,
-                'HIGH': 0.6
-            }.get(risk_level, 0.8)
-            
-            # Adjust based on portfolio diversification
-            diversification_multiplier = 1.0
-            if len(current_positions) > 0:
-                # Reduce size if already have many positions
-                diversification_multiplier = max(0.5, 1.0 - (len(current_positions) * 0.1))
-            
-            # Calculate final position size
-            final_size = base_size * confidence_multiplier * risk_multiplier * diversification_multiplier
-            
-            # Apply maximum position size limit
-            final_size = min(final_size, self.max_position_size)
+            final_size = position_size_fraction(base_size, confidence, RISK_MULTIPLIERS.get(risk_level, 0.8),
+                                                len(current_positions), self.max_position_size)
             
             # Calculate dollar amount
             position_value = portfolio_value * final_size
@@ -276,7 +534,7 @@ if __name__ == "__main__":
     load_dotenv()
     api_key = os.getenv("GEMINI_API_KEY", "your_gemini_api_key_here")
     
-    if api_key == "your_gemini_api_key_here":
+    if api_key == "your_gemini_api_key_here" and os.getenv("AI_BACKEND", "gemini") == "gemini":
         print("❌ Please set your GEMINI_API_KEY in the .env file")
         print("💡 Get your API key from: https://makersuite.google.com/app/apikey")
         exit(1)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Backtester - Replay stored bars through indicators, decisions and position sizing
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from bar_store import BarStore
+from indicators import build_panel, compute_panel
+from decision_backends import RuleBasedBackend, OfflineBackend
+from decision_parser import validate_decision
+from ai_trading_engine import RISK_MULTIPLIERS, position_size_fraction
+
+ACTION_CODES = {'buy': 1, 'sell': -1, 'hold': 0}
+
+def load_bars(symbols, interval="1h", start=None, end=None, store=None):
+    """Stored bars per symbol from the bar store, optionally clipped to a time range"""
+    store = store or BarStore()
+    bars = {}
+    for symbol in symbols:
+        df = store.load(symbol, interval, start=start)
+        if df is None:
+            print(f"⚠️ No stored {interval} bars for {symbol}")
+            continue
+        if end is not None:
+            end_ts = pd.Timestamp(end)
+            df = df[df.index < (end_ts.tz_localize('UTC') if end_ts.tzinfo is None else end_ts)]
+        if not df.empty:
+            bars[symbol] = df
+    return bars
+
+def prepare_market(bars_by_symbol):
+    """Indicator series for every symbol, scattered onto one wall-clock time grid
+
+    Indicators are computed on each symbol's own bar sequence (so gaps don't
+    distort them) and then placed on the union of all bar timestamps. Cells
+    where a symbol has no bar stay NaN.
+    """
+    symbols, panel = build_panel(bars_by_symbol)
+    series = compute_panel(panel) if symbols else {}
+    timestamps = pd.DatetimeIndex([], tz='UTC')
+    for symbol in symbols:
+        timestamps = timestamps.union(bars_by_symbol[symbol].index)
+
+    rows = {}  # symbol -> (row on time grid, row in right-aligned panel)
+    length = panel['Close'].shape[0] if symbols else 0
+    for symbol in symbols:
+        index = bars_by_symbol[symbol].index
+        rows[symbol] = (timestamps.get_indexer(index), np.arange(length - len(index), length))
+
+    def scatter(values):
+        out = np.full((len(timestamps), len(symbols)), np.nan)
+        for j, symbol in enumerate(symbols):
+            grid_rows, panel_rows = rows[symbol]
+            out[grid_rows, j] = values[panel_rows, j]
+        return out
+
+    return {
+        'symbols': symbols,
+        'timestamps': timestamps,
+        'open': scatter(panel['Open']) if symbols else None,
+        'series': {name: scatter(values) for name, values in series.items()}
+    }
+
+def generate_signals(market, backend=None, risk_tolerance="moderate"):
+    """Decision arrays (action, confidence, position_size, risk multiplier) for every bar"""
+    backend = backend or RuleBasedBackend(risk_tolerance=risk_tolerance)
+    series = market['series']
+
+    if isinstance(backend, RuleBasedBackend):
+        decisions = backend.decide_panel(series)
+    elif isinstance(backend, OfflineBackend):
+        decisions = _decide_each_bar(backend, market)
+    else:
+        raise ValueError(f"Backtesting needs an offline decision backend, not '{backend.name}'")
+
+    risk_multiplier = np.vectorize(lambda level: RISK_MULTIPLIERS.get(level, 0.8), otypes=['f8'])
+    return {
+        'action': decisions['action'],
+        'confidence': decisions['confidence'],
+        'position_size': decisions['position_size'],
+        'risk_multiplier': risk_multiplier(decisions['risk_level'])
+    }
+
+def _decide_each_bar(backend, market):
+    """Fallback for offline backends without a vectorized path: one decide() per bar"""
+    series = market['series']
+    shape = series['current_price'].shape
+    decisions = {
+        'action': np.zeros(shape, dtype=int),
+        'confidence': np.zeros(shape),
+        'position_size': np.zeros(shape),
+        'risk_level': np.full(shape, 'MEDIUM', dtype=object)
+    }
+    for t, j in zip(*np.nonzero(~np.isnan(series['current_price']))):
+        indicators = {name: float(values[t, j]) for name, values in series.items()}
+        indicators['symbol'] = market['symbols'][j]
+        decision, _ = validate_decision(backend.decide(indicators, {}))
+        if decision:
+            decisions['action'][t, j] = ACTION_CODES[decision['action']]
+            decisions['confidence'][t, j] = decision['confidence']
+            decisions['position_size'][t, j] = decision['position_size']
+            decisions['risk_level'][t, j] = decision['risk_level']
+    return decisions
+
+class Backtester:
+    def __init__(self, initial_cash=100000.0, min_confidence=0.5, max_position_size=0.15,
+                 max_daily_trades=15, recovery_min_confidence=0.4, slippage_bps=5.0,
+                 commission=0.0, bars_per_year=252 * 7):
+        """Initialize backtester with the bot's trading configuration"""
+        self.initial_cash = initial_cash
+        self.min_confidence = min_confidence
+        self.max_position_size = max_position_size
+        self.max_daily_trades = max_daily_trades
+        self.recovery_min_confidence = recovery_min_confidence  # Buy more of a losing position
+        self.slippage = slippage_bps / 10000
+        self.commission = commission  # Per order, in dollars
+        self.bars_per_year = bars_per_year  # Used to annualise the Sharpe ratio
+
+    def run(self, market, signals):
+        """Simulate the strategy bar by bar; returns equity curve, drawdown, trades and metrics
+
+        Decisions made on a bar's close are filled at the next bar's open,
+        with slippage. Like the bot, the strategy is long-only: SELL closes
+        a held position and BUY opens one or, for positions down more than
+        5%, adds to it at the lower recovery confidence.
+        """
+        symbols, timestamps = market['symbols'], market['timestamps']
+        close = pd.DataFrame(market['series']['current_price']).ffill().to_numpy()
+        open_ = market['open']
+        action, confidence = signals['action'], signals['confidence']
+        count = len(symbols)
+
+        cash = self.initial_cash
+        shares = np.zeros(count)
+        cost_basis = np.zeros(count)  # Average entry price per held symbol
+        pending = np.zeros(count)  # Signed share orders awaiting the next open
+        pending_confidence = np.zeros(count)
+        equity = np.empty(len(timestamps))
+        trades = []
+        days = timestamps.normalize()
+        trades_today, current_day = 0, None
+
+        for t in range(len(timestamps)):
+            if days[t] != current_day:
+                current_day, trades_today = days[t], 0
+
+            # Fill yesterday's decisions at this bar's open
+            fillable = (pending != 0) & ~np.isnan(open_[t])
+            for j in np.flatnonzero(fillable):
+                cash = self._fill(j, t, pending[j], pending_confidence[j], open_[t, j], cash,
+                                  shares, cost_basis, symbols, timestamps, trades)
+            pending[fillable] = 0
+
+            equity[t] = cash + np.nansum(shares * close[t])
+
+            # New decisions on this bar's close
+            live = ~np.isnan(market['series']['current_price'][t])
+            if not live.any() or trades_today >= self.max_daily_trades:
+                continue
+            held = shares > 0
+            with np.errstate(invalid='ignore', divide='ignore'):
+                losing = held & ((close[t] / cost_basis - 1) < -0.05)
+            sells = live & held & (action[t] == -1) & (confidence[t] >= self.min_confidence)
+            buys = live & (action[t] == 1) & (
+                (~held & (confidence[t] >= self.min_confidence)) |
+                (losing & (confidence[t] >= self.recovery_min_confidence)))
+
+            # Highest-confidence orders first while the daily trade budget lasts
+            candidates = np.flatnonzero(sells | buys)
+            candidates = candidates[np.argsort(-confidence[t, candidates], kind='stable')]
+            candidates = candidates[:self.max_daily_trades - trades_today]
+            trades_today += len(candidates)
+
+            sizes = position_size_fraction(signals['position_size'][t], confidence[t],
+                                           signals['risk_multiplier'][t], held.sum(), self.max_position_size)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                buy_shares = np.floor(equity[t] * sizes / close[t])
+            for j in candidates:
+                pending[j] = -shares[j] if sells[j] else buy_shares[j]
+                pending_confidence[j] = confidence[t, j]
+
+        equity_curve = pd.Series(equity, index=timestamps, name='equity')
+        drawdown = equity_curve / equity_curve.cummax() - 1
+        trades = pd.DataFrame(trades, columns=['timestamp', 'symbol', 'action', 'quantity', 'price',
+                                               'total', 'commission', 'ai_confidence'])
+        return {
+            'equity_curve': equity_curve,
+            'drawdown': drawdown,
+            'trades': trades,
+            'metrics': self._metrics(equity_curve, drawdown, trades)
+        }
+
+    def _fill(self, j, t, quantity, confidence, open_price, cash, shares, cost_basis, symbols, timestamps, trades):
+        """Execute one market order at the open with slippage; returns the new cash balance"""
+        if quantity > 0:
+            price = open_price * (1 + self.slippage)
+            # Never spend more cash than is available
+            quantity = min(quantity, np.floor((cash - self.commission) / price))
+            if quantity < 1:
+                return cash
+            cost_basis[j] = (cost_basis[j] * shares[j] + price * quantity) / (shares[j] + quantity)
+            cash -= price * quantity + self.commission
+            side = 'BUY'
+        else:
+            price = open_price * (1 - self.slippage)
+            quantity = -quantity
+            cash += price * quantity - self.commission
+            side = 'SELL'
+        shares[j] += quantity if side == 'BUY' else -quantity
+        if shares[j] == 0:
+            cost_basis[j] = 0.0
+
+        trades.append((timestamps[t], symbols[j], side, int(quantity), price, price * quantity,
+                       self.commission, confidence))
+        return cash
+
+    def _metrics(self, equity_curve, drawdown, trades):
+        """Summary statistics of a run"""
+        if equity_curve.empty:
+            return {'total_return_pct': 0.0, 'sharpe': 0.0, 'max_drawdown_pct': 0.0, 'trade_count': 0}
+        returns = equity_curve.pct_change().dropna()
+        volatility = returns.std()
+        sharpe = (returns.mean() / volatility * np.sqrt(self.bars_per_year)) if volatility > 0 else 0.0
+        return {
+            'total_return_pct': float((equity_curve.iloc[-1] / self.initial_cash - 1) * 100),
+            'sharpe': float(sharpe),
+            'max_drawdown_pct': float(drawdown.min() * 100),
+            'trade_count': len(trades)
+        }
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    symbols = os.getenv("BACKTEST_SYMBOLS", "AAPL,MSFT,GOOGL,AMZN,TSLA,CRM,PLD,AVGO").split(",")
+    risk_tolerance = os.getenv("RISK_TOLERANCE", "aggressive")
+
+    started = time.time()
+    market = prepare_market(load_bars(symbols, os.getenv("BACKTEST_INTERVAL", "1h"),
+                                      os.getenv("BACKTEST_START"), os.getenv("BACKTEST_END")))
+    if not market['symbols']:
+        print("❌ No stored bars to backtest; run the bot once to fill the bar cache")
+        exit(1)
+
+    backtester = Backtester(
+        min_confidence=float(os.getenv("MIN_CONFIDENCE", 0.5)),
+        max_position_size=float(os.getenv("MAX_POSITION_SIZE", 0.15)),
+        max_daily_trades=int(os.getenv("MAX_DAILY_TRADES", 15)),
+        recovery_min_confidence=float(os.getenv("RECOVERY_MIN_CONFIDENCE", 0.4))
+    )
+    result = backtester.run(market, generate_signals(market, risk_tolerance=risk_tolerance))
+
+    print(f"📊 Backtest: {len(market['symbols'])} symbols, {len(market['timestamps'])} bars "
+          f"in {time.time() - started:.1f}s")
+    for name, value in result['metrics'].items():
+        print(f"   {name}: {value:.2f}" if isinstance(value, float) else f"   {name}: {value}")
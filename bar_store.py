@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Bar Store - Append-only on-disk cache of OHLCV bars keyed by (symbol, interval)
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+# One fixed-width record per bar so files can be appended to and memory-mapped
+BAR_DTYPE = np.dtype([
+    ('ts', '<i8'),  # Bar open time, epoch seconds UTC
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8')
+])
+
+COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+class BarStore:
+    def __init__(self, base_dir=None):
+        """Initialize bar store"""
+        self.base_dir = base_dir or os.getenv("BAR_CACHE_DIR", "bar_cache")
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.locks = {}  # path -> lock; a reader must never map a file another thread is truncating
+        self.locks_lock = threading.Lock()
+
+    def _path(self, symbol, interval):
+        """File holding the bars for one (symbol, interval) pair"""
+        safe_symbol = symbol.replace('/', '_').replace('^', '_')
+        return os.path.join(self.base_dir, f"{safe_symbol}_{interval}.bars")
+
+    def _lock(self, symbol, interval):
+        path = self._path(symbol, interval)
+        with self.locks_lock:
+            return self.locks.setdefault(path, threading.Lock())
+
+    def _records(self, symbol, interval):
+        """Memory-map the stored records, or None if nothing is stored"""
+        path = self._path(symbol, interval)
+        if not os.path.exists(path) or os.path.getsize(path) < BAR_DTYPE.itemsize:
+            return None
+        count = os.path.getsize(path) // BAR_DTYPE.itemsize
+        return np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+
+    def last_timestamp(self, symbol, interval):
+        """Open time of the newest stored bar, or None"""
+        with self._lock(symbol, interval):
+            records = self._records(symbol, interval)
+            if records is None:
+                return None
+            return pd.Timestamp(int(records['ts'][-1]), unit='s', tz='UTC')
+
+    def append(self, symbol, interval, df):
+        """Append bars, replacing any stored bars at or after the first new one"""
+        if df is None or df.empty:
+            return 0
+
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        ts = index.tz_convert('UTC').as_unit('s').asi8
+
+        new = np.empty(len(df), dtype=BAR_DTYPE)
+        new['ts'] = ts
+        for field, column in COLUMNS.items():
+            new[field] = df[column].to_numpy(dtype='f8')
+
+        path = self._path(symbol, interval)
+        with self._lock(symbol, interval):
+            records = self._records(symbol, interval)
+            if records is not None:
+                # The newest stored bar may have still been forming when it was
+                # fetched, so overlapping bars are truncated and rewritten
+                keep = int(np.searchsorted(records['ts'], ts[0], side='left'))
+                del records
+                with open(path, 'r+b') as f:
+                    f.truncate(keep * BAR_DTYPE.itemsize)
+
+            with open(path, 'ab') as f:
+                f.write(new.tobytes())
+
+        return len(new)
+
+    def load(self, symbol, interval, start=None):
+        """Load stored bars as an OHLCV DataFrame, optionally from a start time"""
+        with self._lock(symbol, interval):
+            records = self._records(symbol, interval)
+            if records is None:
+                return None
+
+            if start is not None:
+                start_ts = pd.Timestamp(start)
+                if start_ts.tzinfo is None:
+                    start_ts = start_ts.tz_localize('UTC')
+                first = int(np.searchsorted(records['ts'], start_ts.timestamp(), side='left'))
+                records = records[first:]
+
+            # Copy out of the map before the lock is released
+            df = pd.DataFrame({column: np.array(records[field]) for field, column in COLUMNS.items()},
+                              index=pd.to_datetime(np.array(records['ts']), unit='s', utc=True))
+        return df
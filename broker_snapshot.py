@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Broker Snapshot - Cycle-scoped cache of account and positions over a broker API
+"""
+
+import threading
+from types import SimpleNamespace
+
+ACCOUNT_FIELDS = ('id', 'status', 'currency', 'cash', 'buying_power', 'equity', 'portfolio_value')
+POSITION_FIELDS = ('symbol', 'qty', 'side', 'avg_entry_price', 'current_price', 'market_value',
+                   'cost_basis', 'unrealized_pl', 'unrealized_plpc')
+
+class BrokerSnapshot:
+    def __init__(self, api):
+        """Wrap a broker API (Alpaca REST or the simulator) with a per-cycle snapshot
+
+        Inside a cycle, get_account() and list_positions() are fetched once
+        and then served from memory, with orders applied locally as they are
+        placed. Outside a cycle every call goes straight to the broker.
+        """
+        self.api = api
+        self.name = getattr(api, 'name', 'alpaca')
+        self.active = False
+        self.account = None
+        self.positions = None  # symbol -> position namespace
+        self.estimated = set()  # Order ids applied at their expected price, awaiting a fill report
+        self.fetches = 0
+        self.hits = 0
+        self.lock = threading.RLock()
+
+    def __getattr__(self, attribute):
+        # get_clock, list_orders, get_calendar, ... pass straight through
+        if attribute == 'api':
+            raise AttributeError(attribute)
+        return getattr(self.api, attribute)
+
+    def begin_cycle(self):
+        """Start serving account and positions from a fresh snapshot"""
+        with self.lock:
+            self.invalidate()
+            self.active = True
+
+    def end_cycle(self):
+        """Drop the snapshot; calls go to the broker again until the next cycle"""
+        with self.lock:
+            self.invalidate()
+            self.active = False
+
+    def invalidate(self):
+        """Refetch on next use, e.g. after fills are reported"""
+        with self.lock:
+            self.account = None
+            self.positions = None
+            self.estimated.clear()
+
+    def on_fill(self, order=None):
+        """Fill reported by the broker: an estimated order is replaced by broker state
+
+        Orders already applied at their fill price need no refetch; with no
+        order, any estimate is dropped.
+        """
+        order_id = order.get('id') if isinstance(order, dict) else getattr(order, 'id', None)
+        with self.lock:
+            if order_id is None or order_id in self.estimated:
+                self.invalidate()
+
+    def get_account(self):
+        with self.lock:
+            if not self.active:
+                return self.api.get_account()
+            if self.account is None:
+                self.fetches += 1
+                self.account = _copy(self.api.get_account(), ACCOUNT_FIELDS)
+            else:
+                self.hits += 1
+            return SimpleNamespace(**vars(self.account))
+
+    def list_positions(self):
+        with self.lock:
+            if not self.active:
+                return self.api.list_positions()
+            if self.positions is None:
+                self.fetches += 1
+                self.positions = {p.symbol: _copy(p, POSITION_FIELDS) for p in self.api.list_positions()}
+            else:
+                self.hits += 1
+            return [SimpleNamespace(**vars(p)) for p in self.positions.values()]
+
+    def submit_order(self, symbol, qty, side, type='market', time_in_force='day', expected_price=None, **kwargs):
+        """Place an order and apply it to the snapshot at its fill or expected price"""
+        order = self.api.submit_order(symbol=symbol, qty=qty, side=side, type=type,
+                                      time_in_force=time_in_force, **kwargs)
+        filled_price = _float(getattr(order, 'filled_avg_price', None))
+        price = filled_price or expected_price
+        with self.lock:
+            if self.active:
+                if price:
+                    self._apply(symbol, int(float(qty)), side, float(price))
+                    if not filled_price:
+                        self.estimated.add(getattr(order, 'id', None))
+                else:
+                    self.invalidate()
+        return order
+
+    def _apply(self, symbol, qty, side, price):
+        """Update cached cash and positions for an order of qty shares at price"""
+        signed_qty = qty if side == 'buy' else -qty
+        if self.account is not None:
+            for field in ('cash', 'buying_power'):
+                setattr(self.account, field, str(float(getattr(self.account, field)) - signed_qty * price))
+
+        if self.positions is None:
+            return
+        position = self.positions.get(symbol)
+        held = int(float(position.qty)) if position else 0
+        entry = float(position.avg_entry_price) if position else price
+        new_qty = held + signed_qty
+        if new_qty <= 0:
+            self.positions.pop(symbol, None)
+            return
+        if signed_qty > 0:
+            entry = (held * entry + qty * price) / new_qty
+        market_value = new_qty * price
+        cost_basis = new_qty * entry
+        self.positions[symbol] = SimpleNamespace(
+            symbol=symbol,
+            qty=str(new_qty),
+            side='long',
+            avg_entry_price=str(entry),
+            current_price=str(price),
+            market_value=str(market_value),
+            cost_basis=str(cost_basis),
+            unrealized_pl=str(market_value - cost_basis),
+            unrealized_plpc=str((market_value - cost_basis) / cost_basis)
+        )
+
+    def stats(self):
+        """Broker reads served from the snapshot versus fetched"""
+        return {'fetches': self.fetches, 'hits': self.hits}
+
+def _float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _copy(entity, fields):
+    """Plain copy of a broker entity's fields so it can be updated locally"""
+    return SimpleNamespace(**{field: getattr(entity, field, None) for field in fields})
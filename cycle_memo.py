@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Cycle Memo - Compute-once store for per-symbol analysis results within a cycle
+"""
+
+import threading
+
+class CycleMemo:
+    def __init__(self):
+        """Initialize an empty memo"""
+        self.values = {}  # key -> result (None results are remembered too)
+        self.key_locks = {}  # key -> lock held while the result is being computed
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """Return the result for key, computing it once even if several threads ask at the same time"""
+        with self.lock:
+            if key in self.values:
+                self.hits += 1
+                return self.values[key]
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.lock:
+                if key in self.values:
+                    self.hits += 1
+                    return self.values[key]
+                self.misses += 1
+            value = compute()
+            with self.lock:
+                self.values[key] = value
+                self.key_locks.pop(key, None)
+            return value
+
+    def get(self, key, default=None):
+        """Stored result for key, or default without computing anything"""
+        with self.lock:
+            if key in self.values:
+                self.hits += 1
+                return self.values[key]
+            return default
+
+    def put(self, key, value):
+        """Remember a result computed elsewhere, e.g. by a batch request"""
+        with self.lock:
+            self.values[key] = value
+
+    def clear(self):
+        """Forget everything; called at each cycle boundary"""
+        with self.lock:
+            self.values = {}
+            self.key_locks = {}
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Counters for monitoring; every hit is one repeated analysis avoided"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.values)}
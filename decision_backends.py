@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Decision Backends - Interchangeable sources of AI trading decisions
+"""
+
+import os
+import json
+import time
+import random
+import threading
+import numpy as np
+
+class DecisionBackend:
+    """Turns a prompt into reply text in the decision JSON schema"""
+    name = "base"
+
+    def generate(self, prompt, items=None, batch=False):
+        """Return reply text for a prompt
+
+        items holds the (indicators, context) pairs the prompt was built from,
+        so offline backends can answer without reading the prompt. With
+        batch=True the reply must be a JSON array with one object per item.
+        """
+        raise NotImplementedError
+
+class GeminiBackend(DecisionBackend):
+    name = "gemini"
+
+    def __init__(self, api_key, model_name="gemini-1.5-pro"):
+        """Initialize Gemini backend"""
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt, items=None, batch=False):
+        return self.model.generate_content(prompt).text
+
+class OfflineBackend(DecisionBackend):
+    """Shared plumbing for backends that answer locally with simulated latency"""
+
+    def __init__(self, latency=0.0, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+
+    def generate(self, prompt, items=None, batch=False):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        decisions = []
+        for indicators, context in items or []:
+            decision = self.decide(indicators, context)
+            if batch:
+                decision = dict(decision, symbol=indicators['symbol'])
+            decisions.append(decision)
+
+        if batch:
+            return json.dumps(decisions)
+        return json.dumps(decisions[0] if decisions else {})
+
+    def decide(self, indicators, context):
+        raise NotImplementedError
+
+# Score needed for a BUY/SELL call at each risk tolerance
+RISK_THRESHOLDS = {
+    'conservative': 2.5,
+    'moderate': 2.0,
+    'aggressive': 1.5
+}
+
+class RuleBasedBackend(OfflineBackend):
+    name = "rules"
+
+    def __init__(self, latency=0.0, jitter=0.0, risk_tolerance="moderate"):
+        """Deterministic indicator-scoring backend"""
+        super().__init__(latency, jitter)
+        self.threshold = RISK_THRESHOLDS.get(risk_tolerance, 2.0)  # Score needed for BUY/SELL
+
+    def score(self, indicators):
+        """Signed technical score; positive is bullish"""
+        price = indicators['current_price']
+        score = 0.0
+        reasons = []
+
+        rsi = indicators.get('rsi')
+        if rsi is not None and rsi == rsi:
+            if rsi < 30:
+                score += 1.5
+                reasons.append(f"RSI {rsi:.0f} oversold")
+            elif rsi > 70:
+                score -= 1.5
+                reasons.append(f"RSI {rsi:.0f} overbought")
+
+        macd, macd_signal = indicators.get('macd'), indicators.get('macd_signal')
+        if macd == macd and macd_signal == macd_signal and macd is not None and macd_signal is not None:
+            score += 1.0 if macd > macd_signal else -1.0
+            reasons.append("MACD above signal" if macd > macd_signal else "MACD below signal")
+
+        for field, weight in (('sma_20', 0.5), ('sma_50', 0.5)):
+            level = indicators.get(field)
+            if level is not None and level == level:
+                score += weight if price > level else -weight
+
+        stoch_k = indicators.get('stoch_k')
+        if stoch_k is not None and stoch_k == stoch_k:
+            if stoch_k < 20:
+                score += 0.5
+            elif stoch_k > 80:
+                score -= 0.5
+
+        upper, lower = indicators.get('bollinger_upper'), indicators.get('bollinger_lower')
+        if upper == upper and lower == lower and upper is not None and lower is not None:
+            if price < lower:
+                score += 1.0
+                reasons.append("below lower Bollinger band")
+            elif price > upper:
+                score -= 1.0
+                reasons.append("above upper Bollinger band")
+
+        return score, reasons
+
+    def decide(self, indicators, context):
+        price = indicators['current_price']
+        atr = indicators.get('atr') or price * 0.02
+        score, reasons = self.score(indicators)
+
+        if score >= self.threshold:
+            action = "BUY"
+        elif score <= -self.threshold:
+            action = "SELL"
+        else:
+            action = "HOLD"
+
+        confidence = min(1.0, abs(score) / 5.0)
+        atr_pct = atr / price if price else 0
+        risk_level = "LOW" if atr_pct < 0.01 else "MEDIUM" if atr_pct < 0.025 else "HIGH"
+
+        return {
+            "action": action,
+            "confidence": round(confidence, 2),
+            "reasoning": f"Rule-based score {score:+.1f}: " + (", ".join(reasons) or "no strong signals"),
+            "position_size": round(0.5 * confidence, 2),
+            "stop_loss": round(price - 2 * atr, 2),
+            "take_profit": round(price + 3 * atr, 2),
+            "risk_level": risk_level,
+            "time_horizon": "SHORT"
+        }
+
+    def decide_panel(self, series):
+        """Vectorized decide() over (time x symbol) indicator arrays from compute_panel
+
+        Returns arrays of action (+1 buy, -1 sell, 0 hold), confidence,
+        position_size and risk_level, with the same rules as decide().
+        """
+        price = series['current_price']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi = series['rsi']
+            score = np.where(rsi < 30, 1.5, 0.0) - np.where(rsi > 70, 1.5, 0.0)
+
+            macd, macd_signal = series['macd'], series['macd_signal']
+            macd_valid = ~np.isnan(macd) & ~np.isnan(macd_signal)
+            score += np.where(macd_valid, np.where(macd > macd_signal, 1.0, -1.0), 0.0)
+
+            for field in ('sma_20', 'sma_50'):
+                level = series[field]
+                score += np.where(np.isnan(level), 0.0, np.where(price > level, 0.5, -0.5))
+
+            stoch_k = series['stoch_k']
+            score += np.where(stoch_k < 20, 0.5, 0.0) - np.where(stoch_k > 80, 0.5, 0.0)
+
+            upper, lower = series['bollinger_upper'], series['bollinger_lower']
+            bands_valid = ~np.isnan(upper) & ~np.isnan(lower)
+            score += np.where(bands_valid & (price < lower), 1.0, 0.0) - \
+                np.where(bands_valid & (price > upper), 1.0, 0.0)
+
+            action = np.where(score >= self.threshold, 1, np.where(score <= -self.threshold, -1, 0))
+            action[np.isnan(price)] = 0
+            confidence = np.round(np.minimum(1.0, np.abs(score) / 5.0), 2)
+
+            atr = np.where(series['atr'] == 0, price * 0.02, series['atr'])
+            atr_pct = atr / price
+            risk_level = np.where(atr_pct < 0.01, 'LOW', np.where(atr_pct < 0.025, 'MEDIUM', 'HIGH'))
+            risk_level[np.isnan(price)] = 'MEDIUM'
+
+        return {
+            'action': action,
+            'confidence': confidence,
+            'position_size': np.round(0.5 * confidence, 2),
+            'risk_level': risk_level
+        }
+
+class ReplayBackend(OfflineBackend):
+    name = "replay"
+
+    def __init__(self, replay_file, latency=0.0, jitter=0.0):
+        """Replay recorded decisions (JSON lines with a symbol field) per symbol"""
+        super().__init__(latency, jitter)
+        self.recorded = {}  # symbol -> list of decisions
+        self.positions = {}  # symbol -> next index to replay
+        self.lock = threading.Lock()
+        with open(replay_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    decision = json.loads(line)
+                    self.recorded.setdefault(decision.get('symbol', '*'), []).append(decision)
+
+    def decide(self, indicators, context):
+        symbol = indicators['symbol']
+        with self.lock:
+            decisions = self.recorded.get(symbol) or self.recorded.get('*')
+            if not decisions:
+                return {"action": "HOLD", "confidence": 0.0, "reasoning": "No recorded decision",
+                        "position_size": 0.0, "stop_loss": 0, "take_profit": 0,
+                        "risk_level": "MEDIUM", "time_horizon": "SHORT"}
+            index = self.positions.get(symbol, 0)
+            self.positions[symbol] = index + 1
+        decision = dict(decisions[index % len(decisions)])
+        decision.pop('symbol', None)
+        return decision
+
+def create_backend(name=None, gemini_api_key=None):
+    """Build the backend selected by name or the AI_BACKEND environment variable"""
+    name = (name or os.getenv("AI_BACKEND", "gemini")).lower()
+    latency = float(os.getenv("AI_BACKEND_LATENCY", 0))
+    jitter = float(os.getenv("AI_BACKEND_JITTER", 0))
+
+    if name == "rules":
+        return RuleBasedBackend(latency=latency, jitter=jitter, risk_tolerance=os.getenv("RISK_TOLERANCE", "moderate"))
+    if name == "replay":
+        return ReplayBackend(os.getenv("AI_REPLAY_FILE", "ai_decisions.jsonl"), latency=latency, jitter=jitter)
+    return GeminiBackend(gemini_api_key)
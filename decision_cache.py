@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Decision Cache - Reuse AI decisions while a symbol's inputs have barely moved
+"""
+
+import os
+import math
+import time
+import threading
+
+# Rounding step per input. Price-level fields are compared as a ratio to the
+# current price so one step means the same thing for a $20 and a $2,000 stock.
+DEFAULT_PRECISION = {
+    'current_price': 0.005,  # Relative (log) step: ~0.5% price moves
+    'price_change_24h': 0.5,
+    'rsi': 2.0,
+    'stoch_k': 5.0,
+    'stoch_d': 5.0,
+    'macd': 0.0005,
+    'macd_signal': 0.0005,
+    'sma_20': 0.0025,
+    'sma_50': 0.0025,
+    'ema_12': 0.0025,
+    'ema_26': 0.0025,
+    'bollinger_upper': 0.0025,
+    'bollinger_lower': 0.0025,
+    'atr': 0.001,
+    'volume_ratio': 0.25,
+    'beta': 0.1,
+    'pe_ratio': 1.0,
+    'portfolio_value': 0.05  # Relative (log) step
+}
+
+PRICE_RELATIVE = {'macd', 'macd_signal', 'sma_20', 'sma_50', 'ema_12', 'ema_26',
+                  'bollinger_upper', 'bollinger_lower', 'atr'}
+LOG_SCALED = {'current_price', 'portfolio_value'}
+
+class DecisionCache:
+    def __init__(self, max_age=None, precision=None):
+        """Initialize decision cache"""
+        self.max_age = max_age if max_age is not None else float(os.getenv("DECISION_CACHE_MAX_AGE", 3600))
+        self.precision = dict(DEFAULT_PRECISION, **(precision or {}))
+        self.entries = {}  # fingerprint -> (decision, stored_at)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def fingerprint(self, symbol, indicators, context=None, portfolio_info=None, extra=None):
+        """Quantized, hashable summary of everything that goes into the prompt"""
+        context = context or {}
+        price = indicators.get('current_price') or 0
+        volume_avg = indicators.get('volume_avg') or 0
+
+        features = {
+            'current_price': price,
+            'price_change_24h': indicators.get('price_change_24h'),
+            'rsi': indicators.get('rsi'),
+            'stoch_k': indicators.get('stoch_k'),
+            'stoch_d': indicators.get('stoch_d'),
+            'volume_ratio': (indicators.get('volume_current', 0) / volume_avg) if volume_avg else 0,
+            'beta': context.get('beta'),
+            'pe_ratio': context.get('pe_ratio'),
+            'portfolio_value': portfolio_info.get('total_value', 100000) if portfolio_info else 100000
+        }
+        for field in PRICE_RELATIVE:
+            value = indicators.get(field)
+            features[field] = (value / price) if price and value is not None else value
+
+        key = [symbol, context.get('sector', 'Unknown')]
+        for field in sorted(features):
+            key.append((field, self._quantize(field, features[field])))
+        if extra:
+            key.extend(sorted(extra.items()))
+        return tuple(key)
+
+    def get(self, key):
+        """Cached decision for a fingerprint, or None if missing or too old"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and time.time() - entry[1] < self.max_age:
+                self.hits += 1
+                return dict(entry[0])
+            self.misses += 1
+            return None
+
+    def put(self, key, decision):
+        """Store a decision and drop expired entries"""
+        now = time.time()
+        with self.lock:
+            self.entries = {k: v for k, v in self.entries.items() if now - v[1] < self.max_age}
+            self.entries[key] = (dict(decision), now)
+
+    def stats(self):
+        """Counters for monitoring; every hit is one LLM call saved"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'llm_calls_saved': self.hits,
+            'hit_rate': (self.hits / total) if total else 0,
+            'entries': len(self.entries)
+        }
+
+    def _quantize(self, field, value):
+        if value is None:
+            return None
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return str(value)
+        if math.isnan(value) or math.isinf(value):
+            return None
+        step = self.precision.get(field)
+        if not step:
+            return value
+        if field in LOG_SCALED:
+            return round(math.log(value) / math.log1p(step)) if value > 0 else 0
+        return round(value / step)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Decision Parser - Tolerant extraction and validation of AI decision JSON
+"""
+
+import re
+import json
+import threading
+
+ACTIONS = {'buy', 'sell', 'hold'}
+RISK_LEVELS = {'LOW', 'MEDIUM', 'HIGH'}
+TIME_HORIZONS = {'SHORT', 'MEDIUM', 'LONG'}
+
+DECISION_SCHEMA = """{
+    "action": "BUY|SELL|HOLD",
+    "confidence": 0.0-1.0,
+    "reasoning": "Detailed explanation of your decision",
+    "position_size": 0.0-1.0,
+    "stop_loss": price,
+    "take_profit": price,
+    "risk_level": "LOW|MEDIUM|HIGH",
+    "time_horizon": "SHORT|MEDIUM|LONG"
+}"""
+
+FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+
+def extract_json(text, expect=dict):
+    """Find the first JSON value of the expected type in free-form model output"""
+    if not text:
+        return None
+
+    # Fenced blocks first, then the whole reply, then any embedded value
+    candidates = [match.strip() for match in FENCE.findall(text)] + [text.strip()]
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+            if isinstance(value, expect):
+                return value
+        except json.JSONDecodeError:
+            pass
+
+    decoder = json.JSONDecoder()
+    opener = '{' if expect is dict else '['
+    for start in (i for i, char in enumerate(text) if char == opener):
+        try:
+            value, _ = decoder.raw_decode(text, start)
+            if isinstance(value, expect):
+                return value
+        except json.JSONDecodeError:
+            continue
+    return None
+
+def _to_number(value):
+    """Parse numbers the model writes as strings like '$123.40' or '75%'"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = value.strip().replace('$', '').replace(',', '')
+        percent = cleaned.endswith('%')
+        try:
+            number = float(cleaned.rstrip('%'))
+        except ValueError:
+            return None
+        return number / 100 if percent else number
+    return None
+
+def _to_fraction(value):
+    """Confidence and position size as 0-1, or None if out of range
+
+    Percentages are only accepted when written explicitly ('85%'); a bare 85
+    is ambiguous and is rejected so the reply gets repaired.
+    """
+    number = _to_number(value)
+    if number is None or not 0.0 <= number <= 1.0:
+        return None
+    return number
+
+def validate_decision(raw):
+    """Normalise a raw decision dict; returns (decision, errors)"""
+    if not isinstance(raw, dict):
+        return None, ["decision is not a JSON object"]
+
+    errors = []
+    action = str(raw.get('action', '')).strip().lower()
+    if action not in ACTIONS:
+        errors.append(f"invalid action {raw.get('action')!r}")
+
+    confidence = _to_fraction(raw.get('confidence'))
+    if confidence is None:
+        errors.append(f"invalid confidence {raw.get('confidence')!r} (expected 0.0-1.0)")
+
+    position_size = 0.0
+    if raw.get('position_size') is not None:
+        position_size = _to_fraction(raw.get('position_size'))
+        if position_size is None:
+            errors.append(f"invalid position_size {raw.get('position_size')!r} (expected 0.0-1.0)")
+
+    if errors:
+        return None, errors
+
+    risk_level = str(raw.get('risk_level', '')).strip().upper()
+    time_horizon = str(raw.get('time_horizon', '')).strip().upper()
+
+    decision = dict(raw)
+    decision.update({
+        'action': action,
+        'confidence': confidence,
+        'reasoning': str(raw.get('reasoning') or ''),
+        'position_size': position_size,
+        'stop_loss': _to_number(raw.get('stop_loss')),
+        'take_profit': _to_number(raw.get('take_profit')),
+        'risk_level': risk_level if risk_level in RISK_LEVELS else 'MEDIUM',
+        'time_horizon': time_horizon if time_horizon in TIME_HORIZONS else 'MEDIUM'
+    })
+    return decision, []
+
+class DecisionParser:
+    def __init__(self):
+        """Initialize decision parser with parse outcome counters"""
+        self.replies = 0
+        self.parsed = 0
+        self.repaired = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def parse(self, text):
+        """Parse and validate a single-decision reply; returns (decision, errors)"""
+        raw = extract_json(text, dict)
+        if raw is None:
+            return None, ["no JSON object found in reply"]
+        return validate_decision(raw)
+
+    def parse_batch(self, text):
+        """Extract the array of raw decisions from a batch reply, or None"""
+        entries = extract_json(text, list)
+        if entries is None:
+            # A single object is a valid batch of one
+            single = extract_json(text, dict)
+            entries = [single] if single is not None else None
+        return entries
+
+    def repair_prompt(self, text, errors, batch=False):
+        """Short follow-up prompt asking the model to fix its own reply"""
+        shape = f"a JSON array of objects, each with a \"symbol\" field plus:\n{DECISION_SCHEMA}" if batch \
+            else f"a single JSON object:\n{DECISION_SCHEMA}"
+        return f"""Your previous reply could not be used: {'; '.join(errors)}.
+Reply again with ONLY {shape}
+No markdown, no code fences and no text outside the JSON.
+
+PREVIOUS REPLY:
+{text[:4000]}
+"""
+
+    def record(self, outcome):
+        """Count a reply outcome: 'parsed', 'repaired' or 'failed'"""
+        with self.lock:
+            self.replies += 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        """Parse outcome counters and failure rate"""
+        return {
+            'replies': self.replies,
+            'parsed': self.parsed,
+            'repaired': self.repaired,
+            'failed': self.failed,
+            'failure_rate': (self.failed / self.replies) if self.replies else 0
+        }
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Fundamentals Cache - Per-field TTL cache over yfinance Ticker.info
+"""
+
+import os
+import json
+import time
+import threading
+import yfinance as yf
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# How long each Ticker.info field stays fresh, in seconds
+DEFAULT_TTLS = {
+    'currentPrice': 2 * MINUTE,
+    'regularMarketPrice': 2 * MINUTE,
+    'averageVolume': 6 * HOUR,
+    'marketCap': 6 * HOUR,
+    'trailingPE': 6 * HOUR,
+    'priceToBook': 6 * HOUR,
+    'beta': DAY,
+    'dividendYield': DAY,
+    'debtToEquity': DAY,
+    'currentRatio': DAY,
+    'profitMargins': DAY,
+    'revenueGrowth': DAY,
+    'earningsGrowth': DAY,
+    'sector': 7 * DAY,
+    'industry': 7 * DAY
+}
+
+class FundamentalsCache:
+    def __init__(self, cache_file=None, ttls=None, default_ttl=6 * HOUR):
+        """Initialize fundamentals cache"""
+        self.cache_file = cache_file or os.getenv("FUNDAMENTALS_CACHE_FILE", "fundamentals_cache.json")
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.entries = {}  # symbol -> {field: [value, fetched_at]}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self._load()
+
+    def get(self, symbol, fields):
+        """Get fields for a symbol, refreshing Ticker.info only if any has expired"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(symbol, {})
+            if all(self._is_fresh(entry, field, now) for field in fields):
+                self.hits += 1
+                return self._present(entry, fields)
+            self.misses += 1
+
+        try:
+            info = yf.Ticker(symbol).info
+        except Exception as e:
+            print(f"❌ Error fetching fundamentals for {symbol}: {e}")
+            info = None
+
+        # Throttled or unknown symbols come back empty; don't cache that
+        if not info:
+            return {}
+
+        with self.lock:
+            # Only tracked fields are kept; missing ones are stored as None so
+            # they don't force a refetch on every call
+            entry = {field: [info.get(field), now] for field in set(self.ttls) | set(fields)}
+            self.entries[symbol] = entry
+            self._save()
+            return self._present(entry, fields)
+
+    def get_field(self, symbol, field, default=None):
+        """Get a single field, falling back to a default when missing"""
+        return self.get(symbol, [field]).get(field, default)
+
+    def peek(self, symbol, field):
+        """Cached (value, fetched_at) for a field without ever fetching, or None"""
+        with self.lock:
+            cached = self.entries.get(symbol, {}).get(field)
+        return tuple(cached) if cached and cached[0] is not None else None
+
+    def stats(self):
+        """Hit/miss counters for monitoring"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total) if total else 0,
+            'symbols': len(self.entries)
+        }
+
+    def _present(self, entry, fields):
+        """Requested fields that have a value, shaped like Ticker.info"""
+        return {field: entry[field][0] for field in fields if entry[field][0] is not None}
+
+    def _is_fresh(self, entry, field, now):
+        if field not in entry:
+            return False
+        return now - entry[field][1] < self.ttls.get(field, self.default_ttl)
+
+    def _load(self):
+        """Load cached fundamentals from disk"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    self.entries = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not load fundamentals cache: {e}")
+            self.entries = {}
+
+    def _save(self):
+        """Persist the cache atomically so a crash never leaves a partial file"""
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(self.entries, f, separators=(',', ':'), default=str)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"⚠️ Could not save fundamentals cache: {e}")
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Indicators - Stateful technical indicators updated in constant time per bar
+"""
+
+import copy
+import math
+from collections import deque
+import numpy as np
+
+NAN = float('nan')
+
+class RollingWindow:
+    def __init__(self, window):
+        """Fixed-size window with running sums for mean and population std"""
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.offset = None  # Shift applied before squaring to limit cancellation error
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.pushes = 0
+
+    def push(self, value):
+        """Add a value, evicting the oldest once the window is full"""
+        if self.offset is None:
+            self.offset = value
+        if len(self.values) == self.window:
+            old = self.values[0] - self.offset
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(value)
+        shifted = value - self.offset
+        self.total += shifted
+        self.total_sq += shifted * shifted
+
+        # Re-anchor on the current mean once per window so drift never accumulates
+        self.pushes += 1
+        if self.pushes % self.window == 0:
+            self.offset = sum(self.values) / len(self.values)
+            self.total = sum(v - self.offset for v in self.values)
+            self.total_sq = sum((v - self.offset) ** 2 for v in self.values)
+
+    def full(self):
+        return len(self.values) == self.window
+
+    def mean(self):
+        if not self.full():
+            return NAN
+        return self.offset + self.total / self.window
+
+    def std(self):
+        if not self.full():
+            return NAN
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+class RollingExtreme:
+    def __init__(self, window, mode='max'):
+        """Rolling max or min using a monotonic deque (amortized O(1))"""
+        self.window = window
+        self.mode = mode
+        self.count = 0
+        self.candidates = deque()  # (bar number, value)
+
+    def push(self, value):
+        if self.mode == 'max':
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        self.candidates.append((self.count, value))
+        self.count += 1
+        if self.candidates[0][0] <= self.count - 1 - self.window:
+            self.candidates.popleft()
+
+    def value(self):
+        if self.count < self.window:
+            return NAN
+        return self.candidates[0][1]
+
+class RunningEMA:
+    def __init__(self, alpha, min_periods):
+        """Recursive EMA seeded with the first value (pandas ewm adjust=False)"""
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.count = 0
+        self.ema = NAN
+
+    def push(self, value):
+        if math.isnan(value):
+            return
+        self.ema = value if self.count == 0 else self.alpha * value + (1 - self.alpha) * self.ema
+        self.count += 1
+
+    def value(self):
+        return self.ema if self.count >= self.min_periods else NAN
+
+class IncrementalIndicators:
+    def __init__(self, symbol):
+        """Per-symbol indicator state matching the ta library's default windows"""
+        self.symbol = symbol
+        self.last_ts = None
+        self.bars = 0
+        self.prev_close = NAN
+        self.closes_24h = deque(maxlen=24)
+
+        self.volume_20 = RollingWindow(20)
+        self.close_20 = RollingWindow(20)
+        self.close_50 = RollingWindow(50)
+        self.ema_12 = RunningEMA(2 / 13, 12)
+        self.ema_26 = RunningEMA(2 / 27, 26)
+        self.macd_signal = RunningEMA(2 / 10, 9)
+        self.rsi_up = RunningEMA(1 / 14, 14)
+        self.rsi_down = RunningEMA(1 / 14, 14)
+        self.high_14 = RollingExtreme(14, 'max')
+        self.low_14 = RollingExtreme(14, 'min')
+        self.stoch_k_3 = deque(maxlen=3)
+        self.true_ranges = []  # Only the first 14, to seed ATR
+        self.atr = 0.0
+        self.values = {}
+
+    def update(self, high, low, close, volume, ts=None):
+        """Fold one completed bar into the running state"""
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+
+        # Momentum (RSI): the first bar has no diff and counts as zero movement
+        diff = 0.0 if math.isnan(self.prev_close) else close - self.prev_close
+        self.rsi_up.push(diff if diff > 0 else 0.0)
+        self.rsi_down.push(-diff if diff < 0 else 0.0)
+
+        # Trend
+        self.ema_12.push(close)
+        self.ema_26.push(close)
+        macd = self.ema_12.value() - self.ema_26.value()
+        self.macd_signal.push(macd)
+        self.close_20.push(close)
+        self.close_50.push(close)
+        self.volume_20.push(volume)
+
+        # Stochastic
+        self.high_14.push(high)
+        self.low_14.push(low)
+        highest, lowest = self.high_14.value(), self.low_14.value()
+        stoch_k = 100 * (close - lowest) / (highest - lowest) if highest != lowest else NAN
+        self.stoch_k_3.append(stoch_k)
+
+        # ATR (Wilder): simple mean of the first 14 true ranges, then smoothed
+        if math.isnan(self.prev_close):
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        if self.bars < 14:
+            self.true_ranges.append(true_range)
+            if self.bars == 13:
+                self.atr = sum(self.true_ranges) / 14
+        else:
+            self.atr = (self.atr * 13 + true_range) / 14
+
+        self.bars += 1
+        self.prev_close = close
+        self.closes_24h.append(close)
+        self.last_ts = ts
+
+        # Outputs, named as in AITradingEngine.get_technical_indicators
+        up, down = self.rsi_up.value(), self.rsi_down.value()
+        if math.isnan(down):
+            rsi = NAN
+        elif down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + up / down)
+
+        mavg, mstd = self.close_20.mean(), self.close_20.std()
+        stoch_d = sum(self.stoch_k_3) / 3 if len(self.stoch_k_3) == 3 else NAN
+        change_base = self.closes_24h[0]
+
+        self.values = {
+            'symbol': self.symbol,
+            'current_price': close,
+            'price_change_24h': ((close - change_base) / change_base * 100) if self.bars > 24 else 0,
+            'volume_avg': self.volume_20.mean(),
+            'volume_current': volume,
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': self.macd_signal.value(),
+            'bollinger_upper': mavg + 2 * mstd,
+            'bollinger_lower': mavg - 2 * mstd,
+            'sma_20': mavg,
+            'sma_50': self.close_50.mean(),
+            'ema_12': self.ema_12.value(),
+            'ema_26': self.ema_26.value(),
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'atr': self.atr
+        }
+        return self.values
+
+    def preview(self, high, low, close, volume):
+        """Indicators including a still-forming bar, without committing it"""
+        return copy.deepcopy(self).update(high, low, close, volume)
+
+    def snapshot(self):
+        """Indicators as of the last committed bar"""
+        return dict(self.values)
+
+# ---------------------------------------------------------------------------
+# Panel mode: every indicator for a whole symbol universe in one pass
+# ---------------------------------------------------------------------------
+
+def build_panel(bars_by_symbol):
+    """Right-align each symbol's bars into (time x symbol) arrays
+
+    Symbols are aligned on their newest bar rather than on wall-clock time,
+    so each column holds exactly that symbol's own bar sequence and shorter
+    histories are padded with leading NaNs.
+    """
+    symbols = [s for s, df in bars_by_symbol.items() if df is not None and len(df) > 0]
+    length = max((len(bars_by_symbol[s]) for s in symbols), default=0)
+    panel = {field: np.full((length, len(symbols)), np.nan) for field in ('Open', 'High', 'Low', 'Close', 'Volume')}
+    for j, symbol in enumerate(symbols):
+        df = bars_by_symbol[symbol]
+        for field in panel:
+            panel[field][length - len(df):, j] = df[field].to_numpy(dtype='f8')
+    return symbols, panel
+
+def _shift(values, periods):
+    """Shift rows down by a number of periods, filling the top with NaN"""
+    out = np.full(values.shape, np.nan)
+    if periods < values.shape[0]:
+        out[periods:] = values[:values.shape[0] - periods]
+    return out
+
+def _panel_ema(values, alpha, min_periods):
+    """Recursive EMA down each column, seeded at the column's first valid value"""
+    out = np.full(values.shape, np.nan)
+    ema = np.full(values.shape[1], np.nan)
+    count = np.zeros(values.shape[1])
+    for t in range(values.shape[0]):
+        row = values[t]
+        valid = ~np.isnan(row)
+        ema = np.where(valid, np.where(count == 0, row, alpha * row + (1 - alpha) * ema), ema)
+        count += valid
+        out[t] = np.where(count >= min_periods, ema, np.nan)
+    return out
+
+def _panel_rolling_mean(values, window):
+    """Rolling mean over complete windows only (NaN otherwise)"""
+    filled = np.nan_to_num(values)
+    cumsum = np.cumsum(filled, axis=0)
+    sums = cumsum.copy()
+    sums[window:] -= cumsum[:-window]
+    valid = np.cumsum(~np.isnan(values), axis=0)
+    counts = valid.copy()
+    counts[window:] -= valid[:-window]
+    out = sums / window
+    out[counts < window] = np.nan
+    return out
+
+def _panel_rolling(values, window, reducer):
+    """Apply a reducer over complete trailing windows of each column"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+        out[window - 1:] = reducer(windows, axis=-1)
+    return out
+
+def _panel_atr(true_range, window=14):
+    """Wilder ATR per column, matching ta's zero-filled warm-up"""
+    out = np.full(true_range.shape, np.nan)
+    atr = np.zeros(true_range.shape[1])
+    seed = np.zeros(true_range.shape[1])
+    count = np.zeros(true_range.shape[1])
+    for t in range(true_range.shape[0]):
+        row = true_range[t]
+        valid = ~np.isnan(row)
+        count += valid
+        seed += np.where(valid & (count <= window), row, 0.0)
+        atr = np.where(valid & (count == window), seed / window, atr)
+        atr = np.where(valid & (count > window), (atr * (window - 1) + np.nan_to_num(row)) / window, atr)
+        out[t] = np.where(count > 0, atr, np.nan)
+    return out
+
+def compute_panel(panel):
+    """Full indicator series for every column of a (time x symbol) panel"""
+    high, low, close, volume = panel['High'], panel['Low'], panel['Close'], panel['Volume']
+    listed = ~np.isnan(close)
+    bars_seen = np.cumsum(listed, axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        prev_close = _shift(close, 1)
+        diff = np.where(np.isnan(prev_close), 0.0, close - prev_close)
+        up = np.where(listed, np.where(diff > 0, diff, 0.0), np.nan)
+        down = np.where(listed, np.where(diff < 0, -diff, 0.0), np.nan)
+        ema_up = _panel_ema(up, 1 / 14, 14)
+        ema_down = _panel_ema(down, 1 / 14, 14)
+        rsi = np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+
+        ema_12 = _panel_ema(close, 2 / 13, 12)
+        ema_26 = _panel_ema(close, 2 / 27, 26)
+        macd = ema_12 - ema_26
+        macd_signal = _panel_ema(macd, 2 / 10, 9)
+
+        sma_20 = _panel_rolling_mean(close, 20)
+        std_20 = _panel_rolling(close, 20, np.std)
+
+        highest = _panel_rolling(high, 14, np.max)
+        lowest = _panel_rolling(low, 14, np.min)
+        stoch_k = 100 * (close - lowest) / (highest - lowest)
+
+        true_range = np.where(np.isnan(prev_close), high - low,
+                              np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))))
+        true_range[~listed] = np.nan
+
+        close_24 = _shift(close, 23)
+        change_24h = np.where(bars_seen > 24, (close - close_24) / close_24 * 100, 0.0)
+
+    return {
+        'current_price': close,
+        'price_change_24h': change_24h,
+        'volume_avg': _panel_rolling_mean(volume, 20),
+        'volume_current': volume,
+        'rsi': rsi,
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'bollinger_upper': sma_20 + 2 * std_20,
+        'bollinger_lower': sma_20 - 2 * std_20,
+        'sma_20': sma_20,
+        'sma_50': _panel_rolling_mean(close, 50),
+        'ema_12': ema_12,
+        'ema_26': ema_26,
+        'stoch_k': stoch_k,
+        'stoch_d': _panel_rolling(stoch_k, 3, np.mean),
+        'atr': _panel_atr(true_range)
+    }
+
+def panel_indicators(bars_by_symbol):
+    """Latest indicators per symbol, in the same shape as get_technical_indicators"""
+    symbols, panel = build_panel(bars_by_symbol)
+    if not symbols:
+        return {}
+    series = compute_panel(panel)
+    results = {}
+    for j, symbol in enumerate(symbols):
+        indicators = {'symbol': symbol}
+        for name, values in series.items():
+            indicators[name] = float(values[-1, j])
+        results[symbol] = indicators
+    return results
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Market Data - Batched OHLCV downloads shared across an analysis cycle
+"""
+
+import time
+import threading
+import yfinance as yf
+import pandas as pd
+
+class MarketDataFeed:
+    def __init__(self, store=None):
+        """Initialize market data feed"""
+        self.store = store  # Optional BarStore for warm, incremental fetches
+        self.bars = {}  # (symbol, period, interval) -> DataFrame of OHLCV bars
+        self.fetched_at = {}  # (symbol, period, interval) -> epoch seconds the bars were fetched
+        self.lock = threading.Lock()  # Analysis threads may miss and fetch at the same time
+
+    def clear(self):
+        """Drop cached bars so the next cycle starts from fresh data"""
+        self.bars = {}
+        self.fetched_at = {}
+
+    def prefetch(self, symbols, period='60d', interval='1h'):
+        """Download bars for many symbols in a single request"""
+        with self.lock:
+            return self._prefetch(symbols, period, interval)
+
+    def _prefetch(self, symbols, period, interval):
+        # Skip duplicates and symbols already fetched this cycle
+        pending = [s for s in dict.fromkeys(symbols) if (s, period, interval) not in self.bars]
+        if not pending:
+            return {}
+
+        if self.store is None:
+            data = self._download(pending, period=period, interval=interval)
+            fetched = {}
+            for symbol in pending:
+                df = self._slice_symbol(data, symbol)
+                if df is None or df.empty:
+                    continue
+                self.bars[(symbol, period, interval)] = df
+                self.fetched_at[(symbol, period, interval)] = time.time()
+                fetched[symbol] = df
+            print(f"📥 Prefetched {interval} bars for {len(fetched)}/{len(pending)} symbols")
+            return fetched
+
+        return self._prefetch_incremental(pending, period, interval)
+
+    def _prefetch_incremental(self, symbols, period, interval):
+        """Top up the bar store with only the bars newer than what is on disk"""
+        window_start = pd.Timestamp.now(tz='UTC') - _period_to_timedelta(period)
+
+        # Warm symbols share one top-up request; cold ones share one full request
+        warm = {}
+        cold = []
+        for symbol in symbols:
+            last_ts = self.store.last_timestamp(symbol, interval)
+            if last_ts is not None and last_ts > window_start:
+                warm[symbol] = last_ts
+            else:
+                cold.append(symbol)
+
+        if warm:
+            data = self._download(list(warm), start=min(warm.values()), interval=interval)
+            for symbol, last_ts in warm.items():
+                df = self._slice_symbol(data, symbol)
+                if df is not None and not df.empty:
+                    # Bars from the shared start that predate this symbol's tail are already stored
+                    df = df[df.index >= last_ts]
+                    self.store.append(symbol, interval, df)
+
+        if cold:
+            data = self._download(cold, period=period, interval=interval)
+            for symbol in cold:
+                self.store.append(symbol, interval, self._slice_symbol(data, symbol))
+
+        fetched = {}
+        for symbol in symbols:
+            df = self.store.load(symbol, interval, start=window_start)
+            if df is None or df.empty:
+                continue
+            self.bars[(symbol, period, interval)] = df
+            self.fetched_at[(symbol, period, interval)] = time.time()
+            fetched[symbol] = df
+
+        print(f"📥 Loaded {interval} bars for {len(fetched)}/{len(symbols)} symbols "
+              f"({len(warm)} topped up, {len(cold)} full downloads)")
+        return fetched
+
+    def get_bars(self, symbol, period='60d', interval='1h'):
+        """Get bars for a symbol, downloading only if it was not prefetched"""
+        key = (symbol, period, interval)
+        if key not in self.bars:
+            self.prefetch([symbol], period=period, interval=interval)
+        return self.bars.get(key)
+
+    def get_many(self, symbols, period='60d', interval='1h'):
+        """Get bars for many symbols, fetching any misses in one request"""
+        self.prefetch(symbols, period=period, interval=interval)
+        return {s: self.bars[(s, period, interval)] for s in symbols if (s, period, interval) in self.bars}
+
+    def latest_close(self, symbol):
+        """Freshest close held for a symbol this cycle as (price, as_of epoch seconds), or None
+
+        The newest bar may still be forming; its close is the last trade at
+        download time, so a bar is never older than when it was fetched.
+        """
+        best = None
+        for key, df in list(self.bars.items()):
+            if key[0] != symbol or df is None or df.empty:
+                continue
+            try:
+                bar_end = (df.index[-1] + pd.Timedelta(key[2])).timestamp()
+            except ValueError:
+                bar_end = df.index[-1].timestamp()  # Intervals like '1wk' that pandas can't parse
+            as_of = min(bar_end, self.fetched_at.get(key, bar_end))
+            if best is None or as_of > best[1]:
+                best = (float(df['Close'].iloc[-1]), as_of)
+        return best
+
+    def get_daily_quotes(self, symbols, period='1mo'):
+        """Last close and average daily volume for many symbols in one request"""
+        bars = self.get_many(symbols, period=period, interval='1d')
+        rows = {symbol: {'price': float(df['Close'].iloc[-1]), 'avg_volume': float(df['Volume'].mean())}
+                for symbol, df in bars.items() if len(df) > 0}
+        quotes = pd.DataFrame.from_dict(rows, orient='index', columns=['price', 'avg_volume'])
+        quotes['dollar_volume'] = quotes['price'] * quotes['avg_volume']
+        return quotes
+
+    def _download(self, symbols, period=None, start=None, interval='1h'):
+        """Single yfinance request for a list of symbols"""
+        try:
+            if start is not None:
+                return yf.download(symbols, start=start, interval=interval,
+                                   group_by='ticker', threads=True, progress=False)
+            return yf.download(symbols, period=period, interval=interval,
+                               group_by='ticker', threads=True, progress=False)
+        except Exception as e:
+            print(f"❌ Error downloading bars for {len(symbols)} symbols: {e}")
+            return None
+
+    def _slice_symbol(self, data, symbol):
+        """Extract one symbol's OHLCV frame from a batched download"""
+        if data is None or data.empty:
+            return None
+
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                return None
+            df = data[symbol]
+        else:
+            df = data
+
+        # Rows where only other symbols traded come back as NaN for this one
+        return df.dropna()
+
+def _period_to_timedelta(period):
+    """Convert a yfinance period string such as '60d' or '1y' to a timedelta"""
+    units = {'d': 1, 'wk': 7, 'mo': 30, 'y': 365}
+    for unit, days in units.items():
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return pd.Timedelta(days=int(period[:-len(unit)]) * days)
+    return pd.Timedelta(days=60)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Notification Dispatcher - Background delivery of alerts with rate limits, retries and digests
+"""
+
+import os
+import time
+import queue
+import threading
+
+# Longest message body each provider accepts, in characters
+MAX_MESSAGE_LENGTHS = {'whatsapp': 1600, 'telegram': 4096}
+SEPARATOR = "\n\n────────\n\n"
+
+class ChannelWorker:
+    def __init__(self, name, send, max_queue, min_interval, max_retries, backoff, digest_window, max_length=None):
+        """One delivery thread and bounded queue for a single channel"""
+        self.name = name
+        self.send = send  # send(message) -> True on success; False or an exception is a failure
+        self.max_length = max_length  # Longer digests are split into several messages; None for no limit
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.min_interval = min_interval  # Seconds between messages on this channel
+        self.max_retries = max_retries
+        self.backoff = backoff  # First retry delay; doubles on each attempt
+        self.digest_window = digest_window  # Messages arriving this close together are sent as one
+        self.last_sent = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f'notify-{name}', daemon=True)
+        self.thread.start()
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                messages = [self.queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            # Collect the rest of the burst, and whatever arrives while the rate limit holds us
+            deadline = max(time.time() + self.digest_window, self.last_sent + self.min_interval)
+            while True:
+                remaining = deadline - time.time()
+                try:
+                    messages.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for number, chunk in enumerate(digest(messages, self.max_length)):
+                if number:
+                    self.stop_event.wait(max(self.last_sent + self.min_interval - time.time(), 0))
+                self._deliver(chunk)
+            self.coalesced += len(messages) - 1
+            for _ in messages:
+                self.queue.task_done()
+
+    def _deliver(self, message):
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.send(message):
+                    self.sent += 1
+                    self.last_sent = time.time()
+                    return True
+                error = "provider returned failure"
+            except Exception as e:
+                error = e
+            self.last_sent = time.time()
+            if attempt == self.max_retries:
+                break
+            print(f"⚠️ {self.name} notification failed ({error}) - retry {attempt + 1}/{self.max_retries}")
+            if self.stop_event.wait(self.backoff * 2 ** attempt):
+                break
+        self.failed += 1
+        print(f"❌ {self.name} notification dropped after {attempt + 1} attempts: {error}")
+        return False
+
+class NotificationDispatcher:
+    def __init__(self, channels, max_queue=None, rate_limits=None, max_retries=None, backoff=None, digest_window=None,
+                 max_lengths=None):
+        """Deliver notifications off the trading thread
+
+        channels maps a channel name to a send(message) callable. Each channel
+        gets its own worker, so a slow provider only delays its own messages.
+        rate_limits maps a channel name to the minimum seconds between sends,
+        and max_lengths to the longest message it accepts (MAX_MESSAGE_LENGTHS
+        by default).
+        """
+        max_queue = max_queue or int(os.getenv("NOTIFY_QUEUE_SIZE", 100))
+        max_retries = max_retries if max_retries is not None else int(os.getenv("NOTIFY_MAX_RETRIES", 3))
+        backoff = backoff if backoff is not None else float(os.getenv("NOTIFY_RETRY_BACKOFF", 2.0))
+        digest_window = digest_window if digest_window is not None else float(os.getenv("NOTIFY_DIGEST_WINDOW", 2.0))
+        rate_limits = rate_limits or {}
+        default_interval = float(os.getenv("NOTIFY_MIN_INTERVAL", 1.0))
+        max_lengths = {**MAX_MESSAGE_LENGTHS, **(max_lengths or {})}
+        self.workers = {
+            name: ChannelWorker(name, send, max_queue, rate_limits.get(name, default_interval),
+                                max_retries, backoff, digest_window, max_lengths.get(name))
+            for name, send in channels.items()
+        }
+
+    def notify(self, message, channels=None):
+        """Queue a message for delivery; never blocks. Returns the channels it was queued on"""
+        queued = []
+        for name, worker in self.workers.items():
+            if channels is None or name in channels:
+                if worker.put(message):
+                    queued.append(name)
+                else:
+                    print(f"⚠️ {name} notification queue full - message dropped")
+        return queued
+
+    def flush(self, timeout=30.0):
+        """Wait until every queued message has been delivered or given up on"""
+        deadline = time.time() + timeout
+        for worker in self.workers.values():
+            while worker.queue.unfinished_tasks and time.time() < deadline:
+                time.sleep(0.05)
+        return all(not worker.queue.unfinished_tasks for worker in self.workers.values())
+
+    def close(self, timeout=30.0):
+        """Deliver what is queued, then stop the workers; returns False if messages were left undelivered"""
+        delivered = self.flush(timeout)
+        for worker in self.workers.values():
+            worker.stop_event.set()
+        for worker in self.workers.values():
+            worker.thread.join(timeout=1.0)
+            left = 0
+            while True:
+                try:
+                    worker.queue.get_nowait()
+                except queue.Empty:
+                    break
+                worker.queue.task_done()
+                left += 1
+            if left:
+                worker.dropped += left
+                print(f"⚠️ {worker.name}: {left} notifications undelivered at shutdown")
+        return delivered
+
+    def stats(self):
+        """Per-channel sent, failed, dropped and coalesced counts"""
+        return {name: {'sent': worker.sent, 'failed': worker.failed, 'dropped': worker.dropped,
+                       'coalesced': worker.coalesced, 'queued': worker.queue.qsize()}
+                for name, worker in self.workers.items()}
+
+def digest(messages, max_length=None):
+    """Messages to send for a burst: one digest, split into parts no longer than max_length"""
+    if len(messages) == 1 and (max_length is None or len(messages[0]) <= max_length):
+        return [messages[0]]
+    if max_length is None:
+        return [f"📬 {len(messages)} updates\n\n" + SEPARATOR.join(message.strip() for message in messages)]
+
+    # Leave room for a "📬 N updates (part i/k)" header on every part
+    header_room = 40
+    pieces = []
+    for message in messages:
+        pieces.extend(_split(message.strip(), max_length - header_room))
+    parts = [[]]
+    length = 0
+    for piece in pieces:
+        added = len(piece) + (len(SEPARATOR) if parts[-1] else 0)
+        if parts[-1] and length + added > max_length - header_room:
+            parts.append([])
+            added = len(piece)
+            length = 0
+        parts[-1].append(piece)
+        length += added
+
+    headed = []
+    for number, part in enumerate(parts, 1):
+        header = f"📬 {len(messages)} updates" if len(messages) > 1 else "📬 Update"
+        if len(parts) > 1:
+            header += f" (part {number}/{len(parts)})"
+        headed.append(f"{header}\n\n" + SEPARATOR.join(part))
+    return headed
+
+def _split(message, max_length):
+    """Break one long message at line boundaries, or mid-line when a single line is too long"""
+    if len(message) <= max_length:
+        return [message]
+    pieces = []
+    current = ""
+    for line in message.split("\n"):
+        while len(line) > max_length:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_length])
+            line = line[max_length:]
+        if current and len(current) + 1 + len(line) > max_length:
+            pieces.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep - Walk-forward evaluation of trading parameters on a process pool
+"""
+
+import os
+import random
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from backtester import load_bars, prepare_market, generate_signals, Backtester
+
+# Values tried for each parameter when no grid is given
+DEFAULT_GRID = {
+    'min_confidence': [0.3, 0.4, 0.5, 0.6, 0.7],
+    'max_position_size': [0.05, 0.1, 0.15, 0.2],
+    'max_daily_trades': [5, 10, 15, 25],
+    'risk_tolerance': ['conservative', 'moderate', 'aggressive'],
+    'recovery_min_confidence': [0.3, 0.4, 0.5]
+}
+
+SIGNAL_FIELDS = ('action', 'confidence', 'position_size', 'risk_multiplier')
+
+# Market arrays attached in each worker process
+_shared = {}
+
+def parameter_sets(grid=None, samples=None, seed=0):
+    """Every combination of the grid, or a random sample of them"""
+    grid = grid or DEFAULT_GRID
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    if samples and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    return combos
+
+def walk_forward_splits(length, splits=4, train_fraction=0.75):
+    """Rolling (train, test) row ranges that march forward through the history
+
+    The history is cut into equal windows; each split trains on the first
+    part of its window and tests on the rest, so test periods never overlap
+    and always come after the data the parameters were chosen on.
+    """
+    window = length // splits
+    train = int(window * train_fraction)
+    return [((start, start + train), (start + train, start + window))
+            for start in range(0, window * splits, window)]
+
+class SharedMarket:
+    """Copies market and signal arrays into shared memory once for all workers"""
+
+    def __init__(self, market, signals_by_risk):
+        self.blocks = []
+        self.layout = {}  # key -> (block name, shape, dtype)
+        self._share('open', market['open'])
+        self._share('close', market['series']['current_price'])
+        for risk_tolerance, signals in signals_by_risk.items():
+            for field in SIGNAL_FIELDS:
+                self._share(f"{risk_tolerance}:{field}", signals[field])
+        self.context = {'symbols': market['symbols'], 'timestamps': market['timestamps'], 'layout': self.layout}
+
+    def _share(self, key, values):
+        values = np.ascontiguousarray(values, dtype='f8')
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+        self.blocks.append(block)
+        self.layout[key] = (block.name, values.shape, values.dtype.str)
+
+    def close(self):
+        """Release and remove the shared blocks"""
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+def _attach(context):
+    """Pool initializer: map the parent's shared blocks without copying them"""
+    blocks = []
+    arrays = {}
+    for key, (name, shape, dtype) in context['layout'].items():
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    _shared.update(context, arrays=arrays, blocks=blocks)
+
+def _window(start, stop, risk_tolerance):
+    """Market and signal views for one row range"""
+    arrays = _shared['arrays']
+    market = {
+        'symbols': _shared['symbols'],
+        'timestamps': _shared['timestamps'][start:stop],
+        'open': arrays['open'][start:stop],
+        'series': {'current_price': arrays['close'][start:stop]}
+    }
+    signals = {field: arrays[f"{risk_tolerance}:{field}"][start:stop] for field in SIGNAL_FIELDS}
+    return market, signals
+
+def evaluate(params, splits, backtester_options=None):
+    """Metrics of one parameter set on every train and test window"""
+    options = dict(backtester_options or {}, **{k: v for k, v in params.items() if k != 'risk_tolerance'})
+    backtester = Backtester(**options)
+    rows = []
+    for fold, windows in enumerate(splits):
+        for segment, (start, stop) in zip(('train', 'test'), windows):
+            metrics = backtester.run(*_window(start, stop, params['risk_tolerance']))['metrics']
+            rows.append(dict(params, fold=fold, segment=segment, **metrics))
+    return rows
+
+def run_sweep(market, param_sets, splits=4, train_fraction=0.75, workers=None, backtester_options=None):
+    """Evaluate parameter sets over walk-forward splits on all cores
+
+    Returns one row per (parameter set, fold, segment) with the run metrics.
+    """
+    windows = walk_forward_splits(len(market['timestamps']), splits, train_fraction)
+    risk_tolerances = sorted({params['risk_tolerance'] for params in param_sets})
+    signals_by_risk = {risk: generate_signals(market, risk_tolerance=risk) for risk in risk_tolerances}
+
+    shared = SharedMarket(market, signals_by_risk)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_attach,
+                                 initargs=(shared.context,)) as pool:
+            results = pool.map(evaluate, param_sets, itertools.repeat(windows),
+                               itertools.repeat(backtester_options),
+                               chunksize=max(1, len(param_sets) // ((workers or os.cpu_count()) * 4)))
+            rows = [row for rows in results for row in rows]
+    finally:
+        shared.close()
+    return pd.DataFrame(rows)
+
+def summarize(results, rank_by='sharpe'):
+    """One row per parameter set: mean train/test metrics and worst test drawdown, best first"""
+    params = [column for column in DEFAULT_GRID if column in results.columns]
+    pivot = results.pivot_table(index=params, columns='segment',
+                                values=['sharpe', 'total_return_pct', 'max_drawdown_pct', 'trade_count'],
+                                aggfunc={'sharpe': 'mean', 'total_return_pct': 'mean',
+                                         'max_drawdown_pct': 'min', 'trade_count': 'sum'})
+    pivot.columns = [f"{segment}_{metric}" for metric, segment in pivot.columns]
+    table = pivot.reset_index()
+    # Drawdowns are negative, so the largest value is the shallowest
+    return table.sort_values(f"test_{rank_by}", ascending=False).reset_index(drop=True)
+
+def walk_forward(results, rank_by='sharpe'):
+    """Per fold, the parameters that did best in training and how they did out of sample"""
+    params = [column for column in DEFAULT_GRID if column in results.columns]
+    train = results[results['segment'] == 'train']
+    best = train.loc[train.groupby('fold')[rank_by].idxmax(), params + ['fold', rank_by]]
+    test = results[results['segment'] == 'test'].drop(columns='segment')
+    chosen = best.merge(test, on=params + ['fold'], suffixes=('_train', ''))
+    return chosen.sort_values('fold').reset_index(drop=True)
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    symbols = os.getenv("BACKTEST_SYMBOLS", "AAPL,MSFT,GOOGL,AMZN,TSLA,CRM,PLD,AVGO").split(",")
+    rank_by = os.getenv("SWEEP_RANK_BY", "sharpe")  # sharpe, max_drawdown_pct or total_return_pct
+    output_file = os.getenv("SWEEP_OUTPUT", "sweep_results.csv")
+
+    started = time.time()
+    market = prepare_market(load_bars(symbols, os.getenv("BACKTEST_INTERVAL", "1h"),
+                                      os.getenv("BACKTEST_START"), os.getenv("BACKTEST_END")))
+    if not market['symbols']:
+        print("❌ No stored bars to sweep; run the bot once to fill the bar cache")
+        exit(1)
+
+    samples = int(os.getenv("SWEEP_SAMPLES", 0)) or None
+    param_sets = parameter_sets(samples=samples)
+    print(f"🔬 Sweeping {len(param_sets)} parameter sets over {len(market['timestamps'])} bars "
+          f"on {os.cpu_count()} cores...")
+
+    results = run_sweep(market, param_sets, splits=int(os.getenv("SWEEP_SPLITS", 4)))
+    table = summarize(results, rank_by)
+    table.to_csv(output_file, index=False, float_format='%.4f')
+    walk_forward(results, rank_by).to_csv(output_file.replace('.csv', '_walkforward.csv'),
+                                          index=False, float_format='%.4f')
+
+    print(f"✅ Sweep finished in {time.time() - started:.1f}s - results in {output_file}")
+    print(table.head(10).to_string(index=False))
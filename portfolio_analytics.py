@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Portfolio Analytics - Rolling risk and return metrics updated incrementally per snapshot
+"""
+
+import os
+import math
+import numpy as np
+
+class PortfolioAnalytics:
+    def __init__(self, window=None, periods_per_year=None):
+        """Initialize analytics over the last `window` snapshot-to-snapshot returns
+
+        Running sums are kept over a ring buffer, so each snapshot costs O(1)
+        regardless of how long the bot has been running.
+        """
+        self.window = window or int(os.getenv("ANALYTICS_WINDOW", 60))
+        self.periods_per_year = periods_per_year or float(os.getenv("ANALYTICS_PERIODS_PER_YEAR", 252))  # Daily snapshots
+        self.returns = np.zeros(self.window)
+        self.turnover = np.zeros(self.window)
+        self.count = 0  # Returns pushed so far
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.downside_sq = 0.0
+        self.turnover_sum = 0.0
+        self.last_value = None
+        self.last_quantities = {}  # symbol -> (qty, price); None when not known
+        self.peak = None
+        self.max_drawdown = 0.0
+        self.last_key = None
+        self.last_metrics = None
+        self.updates = 0
+        self.hits = 0
+
+    def update(self, key, total_value, positions=None):
+        """Fold in one portfolio snapshot and return the rolling metrics
+
+        key identifies the snapshot (e.g. its timestamp); repeated calls with
+        the same key return the memoised result without counting it twice.
+        positions is a list of dicts with symbol, qty and current_price.
+        """
+        if key is not None and key == self.last_key:
+            self.hits += 1
+            return dict(self.last_metrics)
+        self.updates += 1
+
+        total_value = float(total_value)
+        if self.last_value and total_value > 0:
+            period_return = total_value / self.last_value - 1
+            traded = 0.0
+            if positions is not None and self.last_quantities is not None:
+                quantities = {p['symbol']: (float(p['qty']), float(p['current_price'])) for p in positions}
+                for symbol in set(quantities) | set(self.last_quantities):
+                    qty, price = quantities.get(symbol, (0.0, self.last_quantities.get(symbol, (0.0, 0.0))[1]))
+                    previous_qty = self.last_quantities.get(symbol, (0.0, 0.0))[0]
+                    traded += abs(qty - previous_qty) * price
+            self._push(period_return, traded / 2 / total_value)
+        if positions is not None:
+            self.last_quantities = {p['symbol']: (float(p['qty']), float(p['current_price'])) for p in positions}
+        if total_value > 0:
+            self.last_value = total_value
+            self.peak = total_value if self.peak is None else max(self.peak, total_value)
+            self.max_drawdown = min(self.max_drawdown, total_value / self.peak - 1)
+
+        self.last_key = key
+        self.last_metrics = self._metrics()
+        return dict(self.last_metrics)
+
+    def seed(self, values, positions=None):
+        """Warm up from stored portfolio values (oldest first); turnover is unknown for these
+
+        positions are the holdings at the last stored value. Without them the
+        next update can't tell trades from the existing book, so it adds no
+        turnover.
+        """
+        for value in values:
+            self.update(None, value)
+        if positions is not None:
+            self.last_quantities = {p['symbol']: (float(p['qty']), float(p['current_price'])) for p in positions}
+        elif self.last_value is not None:
+            self.last_quantities = None
+
+    def _push(self, period_return, turnover):
+        slot = self.count % self.window
+        if self.count >= self.window:
+            old_return = self.returns[slot]
+            self.sum -= old_return
+            self.sum_sq -= old_return ** 2
+            self.downside_sq -= min(old_return, 0.0) ** 2
+            self.turnover_sum -= self.turnover[slot]
+        self.returns[slot] = period_return
+        self.turnover[slot] = turnover
+        self.sum += period_return
+        self.sum_sq += period_return ** 2
+        self.downside_sq += min(period_return, 0.0) ** 2
+        self.turnover_sum += turnover
+        self.count += 1
+
+        if self.count % self.window == 0:
+            # Re-sum exactly once per window so floating point error can't accumulate
+            self.sum = float(self.returns.sum())
+            self.sum_sq = float((self.returns ** 2).sum())
+            self.downside_sq = float((np.minimum(self.returns, 0.0) ** 2).sum())
+            self.turnover_sum = float(self.turnover.sum())
+
+    def _metrics(self):
+        n = min(self.count, self.window)
+        metrics = {
+            'volatility_pct': 0.0,
+            'sharpe': 0.0,
+            'sortino': 0.0,
+            'max_drawdown_pct': self.max_drawdown * 100,
+            'current_drawdown_pct': (self.last_value / self.peak - 1) * 100 if self.peak else 0.0,
+            'turnover_pct': self.turnover_sum * 100,
+            'return_periods': n
+        }
+        if n < 2:
+            return metrics
+
+        mean = self.sum / n
+        variance = max((self.sum_sq - n * mean ** 2) / (n - 1), 0.0)
+        volatility = math.sqrt(variance)
+        downside = math.sqrt(max(self.downside_sq, 0.0) / n)
+        annualise = math.sqrt(self.periods_per_year)
+        metrics['volatility_pct'] = volatility * annualise * 100
+        metrics['sharpe'] = mean / volatility * annualise if volatility > 1e-12 else 0.0
+        metrics['sortino'] = mean / downside * annualise if downside > 1e-12 else 0.0
+        return metrics
+
+    def stats(self):
+        """Snapshots folded in versus served from the memo"""
+        return {'updates': self.updates, 'hits': self.hits}
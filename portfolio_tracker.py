@@ -1,17 +1,37 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import json
 import os
+from timeseries_store import TimeSeriesStore
+from portfolio_analytics import PortfolioAnalytics
+from symbol_metadata import SymbolMetadata
 
 class PortfolioTracker:
-    def __init__(self, alpaca_api):
+    def __init__(self, alpaca_api, symbols=None, risk_engine=None):
         """Initialize Portfolio Tracker"""
         self.api = alpaca_api
-        self.portfolio_file = "portfolio_data.json"
-        self.performance_file = "performance_log.csv"
+        self.risk_engine = risk_engine  # Optional RiskEngine for VaR/CVaR and beta checks
+        self.max_var_pct = float(os.getenv("MAX_VAR_PCT", 5))  # Warn when horizon VaR exceeds this % of value
+        self.symbols = symbols or SymbolMetadata()  # Sector/industry index shared with discovery
+        self.performance_file = "performance_log.csv"  # Legacy CSV log, kept current alongside the store
+        self.history = TimeSeriesStore()  # Append-only, time-partitioned snapshots and performance rows
         self.initial_balance = 100000  # Starting balance
         
+        # Carry an existing CSV log over into the store once
+        if self.history.is_empty('performance') and os.path.exists(self.performance_file):
+            imported = self.history.import_csv('performance', self.performance_file)
+            print(f"📥 Imported {imported} rows from {self.performance_file}")
+        
+        # Rolling risk/return metrics, warmed up from stored history
+        self.analytics = PortfolioAnalytics()
+        self.max_drawdown_warning = float(os.getenv("MAX_DRAWDOWN_WARNING", 10))  # % below the peak
+        self.metrics_memo = (None, None)  # (snapshot timestamp, metrics)
+        self.report_memo = (None, None)  # (session date, report)
+        history = self.history.query('performance', start=datetime.now() - timedelta(days=365))
+        latest = self.history.latest_document('snapshots')
+        positions = latest[1].get('portfolio', {}).get('positions') if latest else None
+        self.analytics.seed(history['total_value'].tail(self.analytics.window + 1), positions)
+        
     def get_current_portfolio(self):
         """Get current portfolio positions and value"""
         try:
@@ -53,11 +73,20 @@ class PortfolioTracker:
             return None
     
     def calculate_portfolio_metrics(self, portfolio):
+        """Calculate portfolio performance metrics, once per snapshot"""
+        if not portfolio:
+            return None
+        key, metrics = self.metrics_memo
+        if key is not None and key == portfolio.get('timestamp'):
+            return dict(metrics)
+        metrics = self._calculate_portfolio_metrics(portfolio)
+        if metrics:
+            self.metrics_memo = (portfolio.get('timestamp'), metrics)
+        return dict(metrics) if metrics else None
+    
+    def _calculate_portfolio_metrics(self, portfolio):
         """Calculate portfolio performance metrics"""
         try:
-            if not portfolio:
-                return None
-                
             # Basic metrics
             total_value = portfolio['total_value']
             cash = portfolio['cash']
@@ -88,10 +117,13 @@ class PortfolioTracker:
                     sectors[sector] += pos['market_value']
                 
                 sector_diversification = len(sectors)
+                sector_exposure = {sector: value / total_value * 100 for sector, value in sectors.items()} \
+                    if total_value > 0 else {}
                 
             else:
                 concentration = 0
                 sector_diversification = 0
+                sector_exposure = {}
             
             metrics = {
                 'total_value': total_value,
@@ -103,10 +135,15 @@ class PortfolioTracker:
                 'position_count': len(positions),
                 'concentration_index': concentration,
                 'sector_diversification': sector_diversification,
+                'sector_exposure': sector_exposure,  # % of portfolio value per sector
                 'cash_ratio': (cash / total_value * 100) if total_value > 0 else 0,
                 'invested_ratio': (invested / total_value * 100) if total_value > 0 else 0
             }
             
+            # Rolling volatility, Sharpe, Sortino, drawdown and turnover; one return per session when known
+            key = portfolio.get('session') or portfolio.get('timestamp')
+            metrics.update(self.analytics.update(key, total_value, positions))
+            
             return metrics
             
         except Exception as e:
@@ -114,45 +151,29 @@ class PortfolioTracker:
             return None
     
     def get_stock_sector(self, symbol):
-        """Get sector for a stock (simplified)"""
-        # You can enhance this with actual sector data
-        sector_map = {
-            'AAPL': 'Technology',
-            'MSFT': 'Technology', 
-            'GOOGL': 'Technology',
-            'AMZN': 'Consumer Discretionary',
-            'TSLA': 'Consumer Discretionary',
-            'CRM': 'Technology',
-            'PLD': 'Real Estate',
-            'AVGO': 'Technology'
-        }
-        return sector_map.get(symbol, 'Unknown')
+        """Get sector for a stock from the symbol metadata index"""
+        return self.symbols.sector(symbol)
     
     def save_portfolio_snapshot(self, portfolio, metrics):
-        """Save portfolio snapshot to file"""
+        """Append portfolio snapshot and performance row to the history store"""
         try:
-            snapshot = {
-                'portfolio': portfolio,
-                'metrics': metrics,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            # Save to JSON file
-            with open(self.portfolio_file, 'w') as f:
-                json.dump(snapshot, f, indent=2)
+            now = datetime.now()
+            self.history.append_document('snapshots', {'portfolio': portfolio, 'metrics': metrics}, now)
             
-            # Save performance metrics to CSV
+            # Save performance metrics
             if metrics:
                 performance_row = {
-                    'timestamp': datetime.now(),
                     'total_value': metrics['total_value'],
                     'total_return_pct': metrics['total_return_pct'],
                     'unrealized_pl': metrics['total_unrealized_pl'],
                     'position_count': metrics['position_count'],
                     'cash_ratio': metrics['cash_ratio']
                 }
+                self.history.append('performance', performance_row, now)
                 
-                df = pd.DataFrame([performance_row])
+                # Mirror the row to the CSV log for tools that still read it; one
+                # append per snapshot, so the whole history is never rewritten
+                df = pd.DataFrame([dict(timestamp=now, **performance_row)])
                 if os.path.exists(self.performance_file):
                     df.to_csv(self.performance_file, mode='a', header=False, index=False)
                 else:
@@ -163,31 +184,53 @@ class PortfolioTracker:
         except Exception as e:
             print(f"❌ Error saving portfolio snapshot: {e}")
     
+    def get_latest_snapshot(self):
+        """Most recent saved snapshot as {'portfolio', 'metrics', 'timestamp'}, or None"""
+        latest = self.history.latest_document('snapshots')
+        if latest is None:
+            return None
+        ts, snapshot = latest
+        return dict(snapshot, timestamp=ts.isoformat())
+    
     def get_portfolio_history(self, days=30):
         """Get portfolio performance history"""
         try:
-            if not os.path.exists(self.performance_file):
-                return None
-                
-            df = pd.read_csv(self.performance_file)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            
-            # Filter for last N days
+            # Only the partitions covering the last N days are read
             cutoff_date = datetime.now() - timedelta(days=days)
-            df_filtered = df[df['timestamp'] >= cutoff_date]
+            df = self.history.query('performance', start=cutoff_date)
+            if df.empty:
+                return None
             
-            return df_filtered
+            df['position_count'] = df['position_count'].fillna(0).astype(int)
+            df.index = df.index.tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None)
+            return df.reset_index()
             
         except Exception as e:
             print(f"❌ Error getting portfolio history: {e}")
             return None
     
-    def generate_portfolio_report(self):
-        """Generate comprehensive portfolio report"""
+    def export_performance_csv(self, path=None, days=None):
+        """Write performance history to CSV in the old performance_log.csv layout, e.g. to rebuild the log"""
+        start = datetime.now() - timedelta(days=days) if days else None
+        return self.history.export_csv('performance', path or self.performance_file, start=start)
+    
+    def generate_portfolio_report(self, session=None):
+        """Generate comprehensive portfolio report
+
+        session is the trading date the report is for. A second report for the
+        same session (the daily and weekly reports at a Friday close) reuses the
+        first instead of saving another snapshot.
+        """
         try:
+            key, report = self.report_memo
+            if session is not None and key == session:
+                return report
+            
             portfolio = self.get_current_portfolio()
             if not portfolio:
                 return None
+            if session is not None:
+                portfolio['session'] = session.isoformat()
                 
             metrics = self.calculate_portfolio_metrics(portfolio)
             if not metrics:
@@ -196,6 +239,9 @@ class PortfolioTracker:
             # Save snapshot
             self.save_portfolio_snapshot(portfolio, metrics)
             
+            # Risk checks reuse the metrics computed above for this snapshot
+            risk = self.check_risk_limits(portfolio)
+            
             # Generate report
             report = {
                 'summary': {
@@ -203,13 +249,21 @@ class PortfolioTracker:
                     'total_return': f"{metrics['total_return_pct']:.2f}%",
                     'unrealized_pl': f"${metrics['total_unrealized_pl']:,.2f} ({metrics['total_unrealized_pl_pct']:.2f}%)",
                     'position_count': metrics['position_count'],
-                    'cash_ratio': f"{metrics['cash_ratio']:.1f}%"
+                    'cash_ratio': f"{metrics['cash_ratio']:.1f}%",
+                    'volatility': f"{metrics['volatility_pct']:.1f}%",
+                    'sharpe': f"{metrics['sharpe']:.2f}",
+                    'sortino': f"{metrics['sortino']:.2f}",
+                    'max_drawdown': f"{metrics['max_drawdown_pct']:.2f}%",
+                    'turnover': f"{metrics['turnover_pct']:.1f}%"
                 },
                 'positions': portfolio['positions'],
                 'metrics': metrics,
+                'risk': risk,
                 'timestamp': datetime.now().isoformat()
             }
             
+            if session is not None:
+                self.report_memo = (session, report)
             return report
             
         except Exception as e:
@@ -244,18 +298,45 @@ class PortfolioTracker:
             if metrics['total_unrealized_pl_pct'] < -10:
                 warnings.append(f"High unrealized losses: {metrics['total_unrealized_pl_pct']:.2f}%")
             
+            # Check drawdown from the portfolio's peak
+            if metrics['current_drawdown_pct'] < -self.max_drawdown_warning:
+                warnings.append(f"Deep drawdown: {metrics['current_drawdown_pct']:.2f}% from peak")
+            
+            # Check covariance-based tail risk of the current book
+            risk = self.assess_portfolio_risk(portfolio)
+            if risk:
+                if risk['var_pct'] > self.max_var_pct:
+                    warnings.append(f"High VaR: {risk['var_pct']:.2f}% of portfolio "
+                                    f"({risk['confidence'] * 100:.0f}%, {risk['horizon_bars']} bars)")
+                top = max(risk['risk_contributions_pct'].items(), key=lambda item: item[1], default=None)
+                if top and top[1] > 50 and len(risk['risk_contributions_pct']) > 1:
+                    warnings.append(f"Risk concentrated in {top[0]}: {top[1]:.0f}% of portfolio risk")
+            
             status = 'warning' if warnings else 'ok'
             
             return {
                 'status': status,
                 'warnings': warnings,
-                'metrics': metrics
+                'metrics': metrics,
+                'risk': risk
             }
             
         except Exception as e:
             print(f"❌ Error checking risk limits: {e}")
             return {'status': 'error', 'message': str(e)}
 
+    def assess_portfolio_risk(self, portfolio):
+        """VaR/CVaR, beta and risk contributions for the portfolio's positions, or None"""
+        if self.risk_engine is None or not portfolio or not portfolio['positions']:
+            return None
+        try:
+            exposures = {pos['symbol']: pos['market_value'] for pos in portfolio['positions']}
+            self.risk_engine.refresh(list(exposures))
+            return self.risk_engine.assess(exposures, portfolio['total_value'])
+        except Exception as e:
+            print(f"❌ Error assessing portfolio risk: {e}")
+            return None
+
 # Example usage
 if __name__ == "__main__":
     # This would be used with your Alpaca API instance
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Pre-Trade Gate - In-memory order limits checked before anything reaches the broker
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from datetime import datetime
+from scheduler import MARKET_TZ
+
+class PreTradeGate:
+    def __init__(self, symbols=None, max_symbol_exposure=None, max_sector_exposure=None, max_daily_notional=None,
+                 max_daily_trades=None, max_orders_per_minute=None, duplicate_window=None, clock=time.time):
+        """Initialize gate with exposure, notional, rate and duplicate limits
+
+        Every check works on local state only: exposures are loaded from the
+        broker once per cycle with sync() and then kept current with record().
+        """
+        self.symbols = symbols  # SymbolMetadata for sector lookups; None disables the sector cap
+        self.max_symbol_exposure = max_symbol_exposure if max_symbol_exposure is not None \
+            else float(os.getenv("MAX_SYMBOL_EXPOSURE", 0.25))  # Fraction of portfolio value per symbol
+        self.max_sector_exposure = max_sector_exposure if max_sector_exposure is not None \
+            else float(os.getenv("MAX_SECTOR_EXPOSURE", 0.50))  # Fraction of portfolio value per sector
+        self.max_daily_notional = max_daily_notional if max_daily_notional is not None \
+            else float(os.getenv("MAX_DAILY_NOTIONAL", 150000))  # $ traded per day, buys and sells
+        self.max_daily_trades = max_daily_trades if max_daily_trades is not None \
+            else int(os.getenv("MAX_DAILY_TRADES", 15))
+        self.max_orders_per_minute = max_orders_per_minute if max_orders_per_minute is not None \
+            else int(os.getenv("MAX_ORDERS_PER_MINUTE", 10))
+        self.duplicate_window = duplicate_window if duplicate_window is not None \
+            else float(os.getenv("DUPLICATE_ORDER_WINDOW", 300))  # Seconds before the same symbol/side may repeat
+        self.clock = clock
+
+        self.portfolio_value = 0.0
+        self.exposures = {}  # symbol -> $ market value
+        self.sector_exposures = {}  # sector -> $ market value
+        self.day = None
+        self.daily_notional = 0.0
+        self.daily_trades = 0
+        self.recent_orders = deque()  # Submit times within the last minute
+        self.last_orders = {}  # (symbol, side) -> submit time
+        self.rejections = {}  # reason kind -> count
+        self.approved = 0
+        self.lock = threading.Lock()
+
+    def sync(self, account, positions):
+        """Load portfolio value and exposures from a broker snapshot"""
+        with self.lock:
+            self.portfolio_value = float(account.portfolio_value)
+            self.exposures = {}
+            self.sector_exposures = {}
+            for position in positions:
+                self._add_exposure(position.symbol, float(position.market_value))
+
+    def check(self, symbol, side, qty, price):
+        """(True, None) if the order passes every limit, else (False, reason)"""
+        now = self.clock()
+        notional = qty * price
+        with self.lock:
+            self._roll_day(now)
+            if qty < 1 or price <= 0:
+                return self._reject('invalid', f"invalid order: {qty} shares at ${price:.2f}")
+
+            last = self.last_orders.get((symbol, side))
+            if last is not None and now - last < self.duplicate_window:
+                return self._reject('duplicate', f"duplicate {side} for {symbol} {now - last:.0f}s after the last one")
+
+            while self.recent_orders and now - self.recent_orders[0] >= 60:
+                self.recent_orders.popleft()
+            if len(self.recent_orders) >= self.max_orders_per_minute:
+                return self._reject('rate', f"order rate limit of {self.max_orders_per_minute}/min reached")
+
+            if self.daily_trades >= self.max_daily_trades:
+                return self._reject('daily_trades', f"daily trade limit of {self.max_daily_trades} reached")
+            if self.daily_notional + notional > self.max_daily_notional:
+                return self._reject('daily_notional', f"${notional:,.0f} would exceed the daily notional cap "
+                                    f"(${self.daily_notional:,.0f} of ${self.max_daily_notional:,.0f} used)")
+
+            # Exposure caps only limit buys; sells always reduce risk
+            if side == 'buy' and self.portfolio_value > 0:
+                symbol_after = self.exposures.get(symbol, 0.0) + notional
+                if symbol_after > self.max_symbol_exposure * self.portfolio_value:
+                    return self._reject('symbol_exposure', f"{symbol} would be {symbol_after / self.portfolio_value:.1%} "
+                                        f"of the portfolio (cap {self.max_symbol_exposure:.0%})")
+                sector = self._sector(symbol)
+                if sector is not None:
+                    sector_after = self.sector_exposures.get(sector, 0.0) + notional
+                    if sector_after > self.max_sector_exposure * self.portfolio_value:
+                        return self._reject('sector_exposure', f"{sector} would be {sector_after / self.portfolio_value:.1%} "
+                                            f"of the portfolio (cap {self.max_sector_exposure:.0%})")
+
+            self.approved += 1
+            return True, None
+
+    def record(self, symbol, side, qty, price):
+        """Account for an order the broker accepted"""
+        now = self.clock()
+        notional = qty * price
+        with self.lock:
+            self._roll_day(now)
+            self.daily_trades += 1
+            self.daily_notional += notional
+            self.recent_orders.append(now)
+            self.last_orders[(symbol, side)] = now
+            self._add_exposure(symbol, notional if side == 'buy' else -notional)
+
+    def _add_exposure(self, symbol, amount):
+        self.exposures[symbol] = max(self.exposures.get(symbol, 0.0) + amount, 0.0)
+        sector = self._sector(symbol)
+        if sector is not None:
+            self.sector_exposures[sector] = max(self.sector_exposures.get(sector, 0.0) + amount, 0.0)
+
+    def _sector(self, symbol):
+        """Sector used for the sector cap; unknown sectors are not pooled together"""
+        return self.symbols.sector(symbol, default=None) if self.symbols is not None else None
+
+    def _roll_day(self, now):
+        """Reset daily counters at the first check of a new market day"""
+        day = datetime.fromtimestamp(now, MARKET_TZ).date()
+        if day != self.day:
+            self.day = day
+            self.daily_notional = 0.0
+            self.daily_trades = 0
+
+    def _reject(self, kind, reason):
+        self.rejections[kind] = self.rejections.get(kind, 0) + 1
+        return False, reason
+
+    def stats(self):
+        """Approved orders, trades and notional today, and rejections by kind"""
+        with self.lock:
+            return {'approved': self.approved, 'daily_trades': self.daily_trades,
+                    'daily_notional': self.daily_notional, 'rejections': dict(self.rejections)}
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Quote Service - Fresh-enough prices for order sizing without full profile lookups
+"""
+
+import os
+import time
+import threading
+import yfinance as yf
+
+class QuoteService:
+    def __init__(self, market_data=None, fundamentals=None, max_staleness=None):
+        """Initialize quote service over the cycle's bars and the fundamentals cache"""
+        self.market_data = market_data  # MarketDataFeed holding this cycle's bars
+        self.fundamentals = fundamentals  # FundamentalsCache; only already-cached prices are used
+        self.max_staleness = max_staleness if max_staleness is not None \
+            else float(os.getenv("QUOTE_MAX_STALENESS", 300))  # Seconds
+        self.last_trades = {}  # symbol -> (price, as_of) recorded from fills or streams
+        self.counts = {}  # source -> quotes served
+        self.lock = threading.Lock()
+
+    def record_trade(self, symbol, price, as_of=None):
+        """Remember a last-trade price, e.g. from an order fill or a streamed bar"""
+        if price:
+            with self.lock:
+                self.last_trades[symbol] = (float(price), as_of or time.time())
+
+    def get_quote(self, symbol, max_staleness=None):
+        """Freshest price within the staleness limit, fetching only when nothing cached is fresh
+
+        Returns a dict with price, source ('bar', 'last_trade', 'fundamentals'
+        or 'fast_info'), age in seconds and as_of epoch time, or None.
+        """
+        max_staleness = self.max_staleness if max_staleness is None else max_staleness
+        now = time.time()
+
+        candidates = []
+        if self.market_data is not None:
+            candidates.append(('bar', self.market_data.latest_close(symbol)))
+        with self.lock:
+            candidates.append(('last_trade', self.last_trades.get(symbol)))
+        if self.fundamentals is not None:
+            candidates.append(('fundamentals', self.fundamentals.peek(symbol, 'currentPrice')))
+
+        fresh = []  # (as_of, source, price)
+        for source, quote in candidates:
+            if quote and quote[0] and now - quote[1] <= max_staleness:
+                fresh.append((quote[1], source, quote[0]))
+        if fresh:
+            as_of, source, price = max(fresh)
+            return self._quote(symbol, float(price), source, as_of, now)
+
+        price = self._fetch_last_price(symbol)
+        if not price:
+            return None
+        self.record_trade(symbol, price, now)
+        return self._quote(symbol, price, 'fast_info', now, now)
+
+    def _quote(self, symbol, price, source, as_of, now):
+        with self.lock:
+            self.counts[source] = self.counts.get(source, 0) + 1
+        return {'symbol': symbol, 'price': price, 'source': source, 'age': max(0.0, now - as_of), 'as_of': as_of}
+
+    def _fetch_last_price(self, symbol):
+        """One lightweight last-price request (no full Ticker.info profile)"""
+        try:
+            price = yf.Ticker(symbol).fast_info['last_price']
+            return float(price) if price and price == price else None
+        except Exception as e:
+            print(f"❌ Error fetching last price for {symbol}: {e}")
+            return None
+
+    def stats(self):
+        """Quotes served per source"""
+        with self.lock:
+            return dict(self.counts)
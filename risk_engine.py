@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Risk Engine - Rolling shrinkage covariance with VaR/CVaR, beta and risk contributions
+"""
+
+import os
+import math
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+class RollingCovariance:
+    def __init__(self, symbols, window):
+        """Running moments of the last `window` return rows, updated in O(p^2) per row
+
+        Keeps the sums the Ledoit-Wolf estimator needs (sum of r, r r^T,
+        |r|^2 r and |r|^4), so the shrunk covariance never needs a pass over
+        the whole window.
+        """
+        self.symbols = list(symbols)
+        self.window = window
+        p = len(self.symbols)
+        self.rows = np.zeros((window, p))
+        self.count = 0
+        self.sum = np.zeros(p)  # Σ r
+        self.outer = np.zeros((p, p))  # Σ r rᵀ
+        self.norm_weighted = np.zeros(p)  # Σ |r|² r
+        self.norm_fourth = 0.0  # Σ |r|⁴
+
+    def push(self, row):
+        slot = self.count % self.window
+        if self.count >= self.window:
+            self._accumulate(self.rows[slot], -1.0)
+        self.rows[slot] = row
+        self._accumulate(row, 1.0)
+        self.count += 1
+        if self.count % self.window == 0:
+            self._resum()
+
+    def _accumulate(self, row, sign):
+        norm = row @ row
+        self.sum += sign * row
+        self.outer += sign * np.outer(row, row)
+        self.norm_weighted += sign * norm * row
+        self.norm_fourth += sign * norm * norm
+
+    def _resum(self):
+        """Exact sums once per window so floating point error can't build up"""
+        rows = self.window_rows()
+        norms = (rows ** 2).sum(axis=1)
+        self.sum = rows.sum(axis=0)
+        self.outer = rows.T @ rows
+        self.norm_weighted = norms @ rows
+        self.norm_fourth = float(norms @ norms)
+
+    @property
+    def n(self):
+        return min(self.count, self.window)
+
+    def window_rows(self):
+        """Return rows currently in the window, oldest first"""
+        if self.count <= self.window:
+            return self.rows[:self.count]
+        slot = self.count % self.window
+        return np.concatenate([self.rows[slot:], self.rows[:slot]])
+
+    def mean(self):
+        return self.sum / self.n
+
+    def covariance(self):
+        """Ledoit-Wolf shrinkage toward a scaled identity, and the shrinkage intensity
+
+        Matches sklearn.covariance.ledoit_wolf on the centred window.
+        """
+        n, p = self.n, len(self.symbols)
+        mu = self.mean()
+        emp_cov = self.outer / n - np.outer(mu, mu)  # Biased, as Ledoit-Wolf uses
+        target = np.trace(emp_cov) / p
+
+        # Σ_t |x_t|⁴ for centred rows x_t = r_t - mu, from the running sums
+        c = mu @ mu
+        centred_fourth = (self.norm_fourth - 4 * mu @ self.norm_weighted + 4 * mu @ self.outer @ mu
+                          + 2 * c * np.trace(self.outer) - 3 * n * c * c)
+        delta_sq = (emp_cov ** 2).sum()
+        beta = (centred_fourth / n - delta_sq) / (p * n)
+        delta = (delta_sq - 2 * target * np.trace(emp_cov) + p * target ** 2) / p
+        beta = min(beta, delta)
+        shrinkage = 0.0 if beta <= 0 else beta / delta
+        return (1 - shrinkage) * emp_cov + shrinkage * target * np.eye(p), shrinkage
+
+class RiskEngine:
+    def __init__(self, market_data=None, benchmark=None, window=None, confidence=None, horizon_bars=None,
+                 period='60d', interval='1h'):
+        """Initialize risk engine over hourly closes from the market data feed"""
+        self.market_data = market_data  # MarketDataFeed; bars come from the current cycle
+        self.benchmark = benchmark or os.getenv("RISK_BENCHMARK", "SPY")
+        self.window = window or int(os.getenv("RISK_WINDOW", 250))  # Return rows kept
+        self.confidence = confidence or float(os.getenv("RISK_CONFIDENCE", 0.95))
+        self.horizon_bars = horizon_bars or int(os.getenv("RISK_HORIZON_BARS", 7))  # ~one session of hourly bars
+        self.period = period
+        self.interval = interval
+        self.candidates = set()  # Symbols tracked even when not held
+        self.moments = None
+        self.last_ts = None
+        self.cache = {}  # (last_ts, weights) -> assessment; cleared on each new bar
+        self.rebuilds = 0
+        self.hits = 0
+
+    def track(self, symbols):
+        """Keep returns for candidate symbols so adding them to the book needs no rebuild"""
+        self.candidates.update(symbols)
+
+    def update(self, closes):
+        """Fold in new bars from a DataFrame of closes (index: time, columns: symbols)
+
+        The newest row is the bar still forming and is left out until it has
+        closed, so a partial return never enters the window. Rows newer than
+        the last completed bar are pushed incrementally; a change in the
+        symbol universe or a gap in history rebuilds the window.
+        """
+        closes = closes.sort_index().ffill().dropna().iloc[:-1]
+        returns = closes.pct_change().iloc[1:]
+        symbols = list(closes.columns)
+        if (self.moments is None or self.moments.symbols != symbols or self.last_ts is None
+                or self.last_ts not in closes.index):
+            self.moments = RollingCovariance(symbols, self.window)
+            self.rebuilds += 1
+            new_rows = returns.iloc[-self.window:]
+        else:
+            new_rows = returns[returns.index > self.last_ts]
+        for row in new_rows.to_numpy():
+            self.moments.push(row)
+        if len(closes.index):
+            if len(new_rows) or self.last_ts != closes.index[-1]:
+                self.cache.clear()
+            self.last_ts = closes.index[-1]
+
+    def refresh(self, symbols):
+        """Pull this cycle's bars for the book, candidates and benchmark and update the window"""
+        universe = sorted(set(symbols) | self.candidates | {self.benchmark})
+        bars = self.market_data.get_many(universe, period=self.period, interval=self.interval)
+        closes = pd.DataFrame({symbol: df['Close'] for symbol, df in bars.items() if df is not None and len(df)})
+        if not closes.empty:
+            self.update(closes[sorted(closes.columns)])
+
+    def assess(self, exposures, portfolio_value):
+        """Risk of a book of dollar exposures ({symbol: market value}) over the horizon
+
+        Returns VaR/CVaR (parametric and historical) in dollars and percent of
+        portfolio value, volatility, beta to the benchmark and each position's
+        share of total risk. Cached until the next bar.
+        """
+        if self.moments is None or self.moments.n < 2 or portfolio_value <= 0:
+            return None
+        key = (self.last_ts, tuple(sorted((symbol, round(value, 2)) for symbol, value in exposures.items())),
+               round(portfolio_value, 2))
+        if key in self.cache:
+            self.hits += 1
+            return self.cache[key]
+
+        index = {symbol: i for i, symbol in enumerate(self.moments.symbols)}
+        covered = {symbol: value for symbol, value in exposures.items() if symbol in index}
+        weights = np.zeros(len(index))
+        for symbol, value in covered.items():
+            weights[index[symbol]] = value / portfolio_value
+
+        covariance, shrinkage = self.moments.covariance()
+        mean = self.moments.mean()
+        h = self.horizon_bars
+        z = NormalDist().inv_cdf(self.confidence)
+        tail = 1 - self.confidence
+
+        variance = float(weights @ covariance @ weights)
+        sigma = math.sqrt(max(variance, 0.0))
+        expected = float(weights @ mean)
+        parametric_var = z * sigma * math.sqrt(h) - expected * h
+        parametric_cvar = sigma * math.sqrt(h) * NormalDist().pdf(z) / tail - expected * h
+
+        # Historical: the book's returns over the window, scaled to the horizon
+        book_returns = self.moments.window_rows() @ weights
+        cutoff = np.quantile(book_returns, tail)
+        historical_var = -cutoff * math.sqrt(h)
+        historical_cvar = -book_returns[book_returns <= cutoff].mean() * math.sqrt(h)
+
+        beta = None
+        if self.benchmark in index:
+            b = index[self.benchmark]
+            if covariance[b, b] > 0:
+                beta = float(weights @ covariance[:, b] / covariance[b, b])
+
+        contributions = {}
+        if sigma > 0:
+            marginal = covariance @ weights / sigma
+            contributions = {symbol: float(weights[index[symbol]] * marginal[index[symbol]] / sigma * 100)
+                             for symbol in covered}
+
+        result = {
+            'confidence': self.confidence,
+            'horizon_bars': h,
+            'volatility_pct': sigma * math.sqrt(h) * 100,
+            'parametric_var': parametric_var * portfolio_value,
+            'parametric_cvar': parametric_cvar * portfolio_value,
+            'historical_var': historical_var * portfolio_value,
+            'historical_cvar': historical_cvar * portfolio_value,
+            'var_pct': max(parametric_var, historical_var) * 100,
+            'cvar_pct': max(parametric_cvar, historical_cvar) * 100,
+            'beta': beta,
+            'risk_contributions_pct': contributions,  # Sums to 100 over the covered positions
+            'uncovered': sorted(set(exposures) - set(covered)),
+            'shrinkage': shrinkage,
+            'observations': self.moments.n
+        }
+        self.cache[key] = result
+        return result
+
+    def stats(self):
+        return {'rebuilds': self.rebuilds, 'hits': self.hits}
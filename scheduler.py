@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Scheduler - Trading calendar and bar-close event scheduling for the bot's jobs
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta, time as dtime
+import pandas as pd
+import pytz
+
+MARKET_TZ = pytz.timezone('America/New_York')
+REGULAR_OPEN = dtime(9, 30)
+REGULAR_CLOSE = dtime(16, 0)
+
+# Boundary kinds a job can be triggered by
+BAR_CLOSE = 'bar_close'  # Bar closes while the market is still open, so orders can fill
+MARKET_CLOSE = 'market_close'  # The session close, once per session
+WEEKLY_CLOSE = 'weekly_close'  # Last session of the week
+
+class TradingCalendar:
+    def __init__(self, api=None, cache_file=None, days_ahead=30):
+        """Initialize trading calendar backed by the broker's calendar and a local cache"""
+        self.api = api  # Anything with Alpaca's get_calendar(start, end)
+        self.cache_file = cache_file or os.getenv("TRADING_CALENDAR_FILE", "trading_calendar.json")
+        self.days_ahead = days_ahead
+        self.sessions = {}  # 'YYYY-MM-DD' -> ('HH:MM' open, 'HH:MM' close), market local time
+        self.fetched_on = None
+        self.lock = threading.Lock()
+        self._load()
+
+    def session(self, day):
+        """(open, close) UTC timestamps for a date, or None when the market is closed"""
+        self._ensure_fresh(day)
+        key = day.isoformat()
+        if self.sessions and key in self.sessions:
+            open_time, close_time = self.sessions[key]
+            return self._localize(day, open_time), self._localize(day, close_time)
+        if self.sessions and self._covers(day):
+            return None  # Holiday in the broker's calendar
+        # NYSE regular hours on weekdays; holidays are unknown without the broker calendar
+        if day.weekday() >= 5:
+            return None
+        return self._localize(day, REGULAR_OPEN.strftime('%H:%M')), self._localize(day, REGULAR_CLOSE.strftime('%H:%M'))
+
+    def is_open(self, now):
+        session = self.session(now.tz_convert(MARKET_TZ).date())
+        return session is not None and session[0] <= now < session[1]
+
+    def next_open(self, now):
+        """Open of the current or next session after now"""
+        day = now.tz_convert(MARKET_TZ).date()
+        for offset in range(15):
+            session = self.session(day + timedelta(days=offset))
+            if session and session[0] > now:
+                return session[0]
+        return None
+
+    def bar_closes(self, day, interval='1h'):
+        """Bar-close times of a session: every interval after the open, plus the close itself"""
+        session = self.session(day)
+        if session is None:
+            return []
+        open_ts, close_ts = session
+        step = pd.Timedelta(interval)
+        closes = []
+        boundary = open_ts + step
+        while boundary < close_ts:
+            closes.append(boundary)
+            boundary += step
+        closes.append(close_ts)
+        return closes
+
+    def is_last_session_of_week(self, day):
+        """True if no later session falls in the same ISO week"""
+        week = day.isocalendar()[1]
+        following = day + timedelta(days=1)
+        while following.isocalendar()[1] == week:
+            if self.session(following):
+                return False
+            following += timedelta(days=1)
+        return True
+
+    def _localize(self, day, hhmm):
+        hour, minute = (int(part) for part in hhmm.split(':'))
+        local = MARKET_TZ.localize(datetime(day.year, day.month, day.day, hour, minute))
+        return pd.Timestamp(local).tz_convert('UTC')
+
+    def _covers(self, day):
+        return min(self.sessions) <= day.isoformat() <= max(self.sessions)
+
+    def _ensure_fresh(self, day):
+        """Refetch the broker calendar once a day, or when asked about dates outside the cache"""
+        today = datetime.now(MARKET_TZ).date()
+        with self.lock:
+            if self.api is None or not hasattr(self.api, 'get_calendar'):
+                return
+            if self.fetched_on == today.isoformat() and self.sessions and self._covers(day):
+                return
+            if self.fetched_on == today.isoformat() and not self.sessions:
+                return  # Already failed today; use the fallback
+            start = min(today, day) - timedelta(days=7)
+            end = max(today, day) + timedelta(days=self.days_ahead)
+            try:
+                calendar = self.api.get_calendar(start=start.isoformat(), end=end.isoformat())
+                self.sessions = {pd.Timestamp(entry.date).date().isoformat():
+                                 (_hhmm(entry.open), _hhmm(entry.close)) for entry in calendar}
+                self._save()
+            except Exception as e:
+                print(f"⚠️ Could not fetch trading calendar, using regular NYSE hours: {e}")
+            self.fetched_on = today.isoformat()
+
+    def _load(self):
+        """Load the cached calendar from disk"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r') as f:
+                    data = json.load(f)
+                self.sessions = {day: tuple(times) for day, times in data.get('sessions', {}).items()}
+                self.fetched_on = data.get('fetched_on')
+        except Exception as e:
+            print(f"⚠️ Could not load trading calendar cache: {e}")
+
+    def _save(self):
+        """Persist the calendar atomically"""
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'fetched_on': datetime.now(MARKET_TZ).date().isoformat(), 'sessions': self.sessions}, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"⚠️ Could not save trading calendar cache: {e}")
+
+def _hhmm(value):
+    """'HH:MM' from Alpaca's open/close field (datetime.time or string)"""
+    return value.strftime('%H:%M') if hasattr(value, 'strftime') else str(value)[:5]
+
+class Job:
+    def __init__(self, name, func, trigger=BAR_CLOSE, every=1, priority=0, cycle=True):
+        """A callable fired on every Nth boundary of a kind; lower priority runs first
+
+        Only cycle jobs run between the scheduler's before/after hooks; reports
+        and other housekeeping run outside a trading cycle.
+        """
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.every = every
+        self.priority = priority
+        self.cycle = cycle
+        self.seen = 0  # Boundaries of this job's kind passed so far
+        self.last_run = None
+
+class Scheduler:
+    def __init__(self, calendar, interval='1h', delay=None, before_jobs=None, after_jobs=None, now=None):
+        """Initialize scheduler firing jobs shortly after bar closes from the trading calendar"""
+        self.calendar = calendar
+        self.interval = interval
+        self.delay = pd.Timedelta(seconds=delay if delay is not None else float(os.getenv("SCHEDULER_BAR_DELAY", 60)))
+        self.before_jobs = before_jobs  # Called once before each group of due cycle jobs
+        self.after_jobs = after_jobs  # Called once after, even if a job failed
+        self.now = now or (lambda: pd.Timestamp.now(tz='UTC'))
+        self.jobs = []
+        self.stop_event = threading.Event()
+
+    def add_job(self, name, func, trigger=BAR_CLOSE, every=1, priority=0, cycle=True):
+        job = Job(name, func, trigger, every, priority, cycle)
+        self.jobs.append(job)
+        return job
+
+    def next_boundary(self, after):
+        """Next (time, kinds) boundary strictly after a time"""
+        day = after.tz_convert(MARKET_TZ).date()
+        for offset in range(15):
+            session_day = day + timedelta(days=offset)
+            closes = self.calendar.bar_closes(session_day, self.interval)
+            for boundary in closes:
+                if boundary > after:
+                    if boundary < closes[-1]:
+                        return boundary, {BAR_CLOSE}
+                    kinds = {MARKET_CLOSE}
+                    if self.calendar.is_last_session_of_week(session_day):
+                        kinds.add(WEEKLY_CLOSE)
+                    return boundary, kinds
+        return None, set()
+
+    def due_jobs(self, kinds):
+        """Jobs that fire on a boundary of these kinds, in priority order"""
+        due = []
+        for job in self.jobs:
+            if job.trigger in kinds:
+                job.seen += 1
+                if job.seen % job.every == 0:
+                    due.append(job)
+        return sorted(due, key=lambda job: job.priority)
+
+    def run_jobs(self, jobs):
+        """Run cycle jobs between the before/after hooks, then the rest; one failure doesn't stop the others"""
+        cycle_jobs = [job for job in jobs if job.cycle]
+        if cycle_jobs:
+            if self.before_jobs:
+                self.before_jobs()
+            try:
+                self._run_each(cycle_jobs)
+            finally:
+                if self.after_jobs:
+                    self.after_jobs()
+        self._run_each([job for job in jobs if not job.cycle])
+
+    def _run_each(self, jobs):
+        for job in jobs:
+            if self.stop_event.is_set():
+                break
+            try:
+                print(f"⏰ Running job: {job.name}")
+                job.func()
+                job.last_run = self.now()
+            except Exception as e:
+                print(f"❌ Job {job.name} failed: {e}")
+
+    def run_forever(self):
+        """Sleep until each boundary (plus the settle delay) and run the jobs due; stop() interrupts"""
+        last_boundary = self.now()
+        while not self.stop_event.is_set():
+            # Boundaries missed while jobs overran are skipped, not replayed
+            boundary, kinds = self.next_boundary(max(last_boundary, self.now() - self.delay))
+            if boundary is None:
+                print("⚠️ No trading sessions in the calendar for the next two weeks - retrying in an hour")
+                self.stop_event.wait(3600)
+                last_boundary = self.now()
+                continue
+
+            fire_at = boundary + self.delay
+            print(f"⏳ Next run at {fire_at.tz_convert(MARKET_TZ).strftime('%Y-%m-%d %H:%M:%S %Z')} "
+                  f"({', '.join(sorted(kinds))})")
+            # Wait in slices so clock changes and long closures are re-checked
+            while not self.stop_event.is_set():
+                remaining = (fire_at - self.now()).total_seconds()
+                if remaining <= 0:
+                    break
+                self.stop_event.wait(min(remaining, 900))
+            if self.stop_event.is_set():
+                break
+
+            self.run_jobs(self.due_jobs(kinds))
+            last_boundary = boundary
+
+    def stop(self):
+        """Wake the scheduler and let it exit after the current job"""
+        self.stop_event.set()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Simulated Broker - In-process stand-in for the Alpaca REST API used by the bot
+"""
+
+import os
+import time
+import uuid
+import random
+import threading
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+import pandas as pd
+from bar_store import BarStore
+from scheduler import MARKET_TZ
+
+MARKET_OPEN = (9, 30)
+MARKET_CLOSE = (16, 0)
+
+class SimulatedBrokerError(Exception):
+    """Raised for rejected orders and injected failures, like Alpaca's APIError"""
+
+class SimulatedClock:
+    def __init__(self, start=None, speed=1.0):
+        """Market clock that starts at a given time and runs at a multiple of real time"""
+        start = pd.Timestamp(start) if start else pd.Timestamp.now(tz='UTC')
+        self.start = start.tz_localize('UTC') if start.tzinfo is None else start.tz_convert('UTC')
+        self.speed = speed  # 0 freezes the clock; advance() moves it by hand
+        self.offset = timedelta(0)
+        self.started_at = time.time()
+
+    def now(self):
+        """Current simulated time (UTC)"""
+        elapsed = timedelta(seconds=(time.time() - self.started_at) * self.speed)
+        return self.start + elapsed + self.offset
+
+    def advance(self, delta):
+        """Move the clock forward, e.g. timedelta(hours=1)"""
+        self.offset += delta
+
+    def is_open(self, now=None):
+        """Regular NYSE session on weekdays; holidays are not modelled"""
+        local = (now or self.now()).tz_convert(MARKET_TZ)
+        minutes = local.hour * 60 + local.minute
+        return local.weekday() < 5 and MARKET_OPEN[0] * 60 + MARKET_OPEN[1] <= minutes < MARKET_CLOSE[0] * 60 + MARKET_CLOSE[1]
+
+    def next_session_edge(self, now, hour_minute):
+        """Next weekday time at the given market-local (hour, minute) after now"""
+        local = now.tz_convert(MARKET_TZ)
+        day = local.date()
+        while True:
+            candidate = pd.Timestamp(datetime(day.year, day.month, day.day, *hour_minute)).tz_localize(MARKET_TZ)
+            if candidate > local and candidate.weekday() < 5:
+                return candidate
+            day += timedelta(days=1)
+
+class SimulatedBroker:
+    name = "simulated"
+
+    def __init__(self, store=None, initial_cash=100000.0, interval="1h", clock=None,
+                 latency=0.0, jitter=0.0, error_rate=0.0, slippage_bps=0.0, seed=None):
+        """Initialize simulated broker with cash, a clock and fault injection settings
+
+        Pass the engine's BarStore as store: its locks are per instance, so a
+        second store on the same directory could read a file mid-rewrite.
+        """
+        self.store = store or BarStore()
+        self.interval = interval  # Bars used to price fills and positions
+        try:
+            self.bar_length = pd.Timedelta(interval)
+        except ValueError:
+            self.bar_length = pd.Timedelta(0)  # Intervals like '1wk' that pandas can't parse
+        self.clock = clock or SimulatedClock()
+        self.cash = initial_cash
+        self.positions = {}  # symbol -> [qty, avg_entry_price]
+        self.orders = []
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate  # Fraction of calls that fail
+        self.slippage = slippage_bps / 10000
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def _call(self, method):
+        """Simulate network latency and transient API failures"""
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise SimulatedBrokerError(f"simulated {method} failure")
+
+    def _price(self, symbol):
+        """Close of the newest cached bar that had closed by the simulated time"""
+        now = self.clock.now()
+        bars = self.store.load(symbol, self.interval, start=now - timedelta(days=7))
+        if bars is not None:
+            # A bar still open at `now` holds a close from the future
+            bars = bars[bars.index + self.bar_length <= now]
+        if bars is None or bars.empty:
+            return None
+        return float(bars['Close'].iloc[-1])
+
+    def get_account(self):
+        self._call('get_account')
+        with self.lock:
+            positions = dict(self.positions)
+            cash = self.cash
+        market_value = sum(qty * (self._price(symbol) or entry) for symbol, (qty, entry) in positions.items())
+        return SimpleNamespace(
+            id='simulated',
+            status='ACTIVE',
+            currency='USD',
+            cash=str(cash),
+            buying_power=str(cash),
+            equity=str(cash + market_value),
+            portfolio_value=str(cash + market_value),
+            long_market_value=str(market_value)
+        )
+
+    def list_positions(self):
+        self._call('list_positions')
+        with self.lock:
+            positions = dict(self.positions)
+        return [self._position(symbol, qty, entry) for symbol, (qty, entry) in sorted(positions.items())]
+
+    def get_position(self, symbol):
+        self._call('get_position')
+        with self.lock:
+            if symbol not in self.positions:
+                raise SimulatedBrokerError("position does not exist")
+            qty, entry = self.positions[symbol]
+        return self._position(symbol, qty, entry)
+
+    def _position(self, symbol, qty, entry):
+        """Position entity with Alpaca's string-valued fields"""
+        price = self._price(symbol) or entry
+        market_value = qty * price
+        cost_basis = qty * entry
+        return SimpleNamespace(
+            symbol=symbol,
+            qty=str(qty),
+            side='long',
+            avg_entry_price=str(entry),
+            current_price=str(price),
+            market_value=str(market_value),
+            cost_basis=str(cost_basis),
+            unrealized_pl=str(market_value - cost_basis),
+            unrealized_plpc=str((market_value - cost_basis) / cost_basis if cost_basis else 0)
+        )
+
+    def submit_order(self, symbol, qty, side, type='market', time_in_force='day', **kwargs):
+        """Fill a market order immediately at the latest cached bar close, plus slippage"""
+        self._call('submit_order')
+        qty = int(float(qty))
+        if type != 'market':
+            raise SimulatedBrokerError(f"order type '{type}' is not supported by the simulator")
+        if qty < 1:
+            raise SimulatedBrokerError("qty must be > 0")
+        if not self.clock.is_open():
+            raise SimulatedBrokerError("market is closed")
+        price = self._price(symbol)
+        if price is None:
+            raise SimulatedBrokerError(f"no cached {self.interval} bars for {symbol}")
+
+        with self.lock:
+            held, entry = self.positions.get(symbol, (0, 0.0))
+            if side == 'buy':
+                price *= 1 + self.slippage
+                if qty * price > self.cash:
+                    raise SimulatedBrokerError("insufficient buying power")
+                self.cash -= qty * price
+                self.positions[symbol] = [held + qty, (held * entry + qty * price) / (held + qty)]
+            elif side == 'sell':
+                price *= 1 - self.slippage
+                if qty > held:
+                    raise SimulatedBrokerError(f"insufficient qty available for order (requested: {qty}, available: {held})")
+                self.cash += qty * price
+                if qty == held:
+                    del self.positions[symbol]
+                else:
+                    self.positions[symbol] = [held - qty, entry]
+            else:
+                raise SimulatedBrokerError(f"invalid side '{side}'")
+
+            now = self.clock.now()
+            order = SimpleNamespace(
+                id=str(uuid.uuid4()),
+                client_order_id=str(uuid.uuid4()),
+                symbol=symbol,
+                qty=str(qty),
+                filled_qty=str(qty),
+                filled_avg_price=str(price),
+                side=side,
+                type=type,
+                time_in_force=time_in_force,
+                status='filled',
+                submitted_at=now,
+                filled_at=now
+            )
+            self.orders.append(order)
+        return order
+
+    def list_orders(self, status='all', limit=50, **kwargs):
+        self._call('list_orders')
+        with self.lock:
+            return list(reversed(self.orders[-limit:]))
+
+    def get_clock(self):
+        self._call('get_clock')
+        now = self.clock.now()
+        return SimpleNamespace(
+            timestamp=now,
+            is_open=self.clock.is_open(now),
+            next_open=self.clock.next_session_edge(now, MARKET_OPEN),
+            next_close=self.clock.next_session_edge(now, MARKET_CLOSE)
+        )
+
+def create_broker(name=None, api_key=None, secret_key=None, base_url='https://paper-api.alpaca.markets', store=None):
+    """Build the broker selected by name or the BROKER environment variable
+
+    store is the BarStore the simulated broker prices fills from; share the
+    engine's so reads and writes of a bar file take the same lock.
+    """
+    name = (name or os.getenv("BROKER", "alpaca")).lower()
+    if name == "simulated":
+        clock = SimulatedClock(os.getenv("SIM_BROKER_START"), float(os.getenv("SIM_BROKER_CLOCK_SPEED", 1.0)))
+        return SimulatedBroker(
+            store=store,
+            initial_cash=float(os.getenv("SIM_BROKER_CASH", 100000)),
+            clock=clock,
+            latency=float(os.getenv("SIM_BROKER_LATENCY", 0)),
+            jitter=float(os.getenv("SIM_BROKER_JITTER", 0)),
+            error_rate=float(os.getenv("SIM_BROKER_ERROR_RATE", 0)),
+            slippage_bps=float(os.getenv("SIM_BROKER_SLIPPAGE_BPS", 0))
+        )
+
+    import alpaca_trade_api as tradeapi
+    return tradeapi.REST(api_key, secret_key, base_url)
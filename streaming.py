@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Streaming - Bar event sources and an ingestor that triggers analysis on real moves
+"""
+
+import os
+import time
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from indicators import IncrementalIndicators
+
+class BarSource:
+    """Delivers bar events to a callback until stopped
+
+    Each event is a dict with symbol, ts (UTC Timestamp of the bar open),
+    open, high, low, close and volume.
+    """
+    name = "base"
+
+    def __init__(self):
+        self.symbols = set()
+        self.stop_event = threading.Event()
+        self.on_trade_update = None  # on_trade_update(event, order) for sources that report order fills
+
+    def subscribe(self, symbols):
+        self.symbols.update(symbols)
+
+    def subscribe_trade_updates(self, handler):
+        self.on_trade_update = handler
+
+    def run(self, on_bar):
+        """Block, calling on_bar(event) for each bar, until stop() or the source ends"""
+        raise NotImplementedError
+
+    def stop(self):
+        self.stop_event.set()
+
+class AlpacaStreamSource(BarSource):
+    name = "alpaca"
+
+    def __init__(self, api_key, secret_key, feed='iex', base_url='https://paper-api.alpaca.markets'):
+        """Minute bars from Alpaca's market data websocket, and order updates from the trading one"""
+        super().__init__()
+        from alpaca_trade_api.stream import Stream
+        self.stream = Stream(api_key, secret_key, base_url=base_url, data_feed=feed)
+
+    def run(self, on_bar):
+        async def handle(bar):
+            ts = pd.Timestamp(bar.timestamp)
+            on_bar({
+                'symbol': bar.symbol,
+                'ts': ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC'),
+                'open': float(bar.open),
+                'high': float(bar.high),
+                'low': float(bar.low),
+                'close': float(bar.close),
+                'volume': float(bar.volume)
+            })
+
+        async def handle_trade_update(update):
+            self.on_trade_update(update.event, update.order)
+
+        self.stream.subscribe_bars(handle, *sorted(self.symbols))
+        if self.on_trade_update is not None:
+            self.stream.subscribe_trade_updates(handle_trade_update)
+        self.stream.run()  # Reconnects on its own until stopped
+
+    def stop(self):
+        super().stop()
+        self.stream.stop()
+
+class FileReplaySource(BarSource):
+    name = "replay"
+
+    def __init__(self, path, speed=0.0):
+        """Replay bars from a CSV with symbol, timestamp, open, high, low, close, volume columns
+
+        speed=0 replays as fast as possible; speed=60 plays an hour of bars
+        per minute.
+        """
+        super().__init__()
+        self.path = path
+        self.speed = speed
+
+    def run(self, on_bar):
+        events = pd.read_csv(self.path)
+        events.columns = [column.lower() for column in events.columns]
+        events['timestamp'] = pd.to_datetime(events['timestamp'], utc=True)
+        events = events.sort_values('timestamp', kind='stable')
+        if self.symbols:
+            events = events[events['symbol'].isin(self.symbols)]
+
+        previous = None
+        for row in events.itertuples(index=False):
+            if self.stop_event.is_set():
+                break
+            if self.speed and previous is not None:
+                self.stop_event.wait((row.timestamp - previous).total_seconds() / self.speed)
+            previous = row.timestamp
+            on_bar({'symbol': row.symbol, 'ts': row.timestamp, 'open': float(row.open), 'high': float(row.high),
+                    'low': float(row.low), 'close': float(row.close), 'volume': float(row.volume)})
+
+class StreamIngestor:
+    def __init__(self, on_trigger, store=None, interval='1h', move_threshold=None, cooldown=None, series=None):
+        """Fold streamed bars into hourly bars and indicators, triggering analysis on meaningful changes
+
+        on_trigger(symbol, indicators, reason, ts) is called on a single worker
+        thread so a slow analysis never stalls the stream.
+        """
+        self.on_trigger = on_trigger
+        self.store = store  # Optional BarStore: seeds indicators and receives completed bars
+        self.interval = interval
+        # Streamed volume is one venue's (IEX) only, so completed bars go to their
+        # own series and never mix with the consolidated bars the engine reads
+        self.series = series or f"{interval}-stream"
+        self.step = pd.Timedelta(interval)
+        self.move_threshold = move_threshold if move_threshold is not None \
+            else float(os.getenv("STREAM_MOVE_THRESHOLD", 1.0))  # % price move since last analysis
+        self.cooldown = cooldown if cooldown is not None \
+            else float(os.getenv("STREAM_TRIGGER_COOLDOWN", 300))  # Seconds between triggers per symbol
+        self.states = {}  # symbol -> IncrementalIndicators over completed bars
+        self.forming = {}  # symbol -> dict of the bar being built
+        self.last_trigger = {}  # symbol -> (indicators, wall time)
+        self.in_flight = set()
+        self.events = 0
+        self.triggers = 0
+        self.lock = threading.Lock()
+        self.worker = ThreadPoolExecutor(max_workers=1)
+
+    def bucket(self, ts):
+        """Open time of the bar a timestamp falls in; hourly US equity bars start at :30"""
+        offset = pd.Timedelta(minutes=30) if self.step == pd.Timedelta(hours=1) else pd.Timedelta(0)
+        return (ts - offset).floor(self.interval) + offset
+
+    def on_bar(self, event):
+        """Handle one streamed (usually one-minute) bar"""
+        symbol = event['symbol']
+        bucket = self.bucket(event['ts'])
+        with self.lock:
+            self.events += 1
+            state = self.states.get(symbol) or self._seed(symbol, bucket)
+            bar = self.forming.get(symbol)
+
+            if bar is not None and bucket > bar['ts']:
+                self._complete(symbol, state, bar)
+                bar = None
+            if bar is None:
+                bar = dict(event, ts=bucket)
+            elif bucket == bar['ts']:
+                bar['high'] = max(bar['high'], event['high'])
+                bar['low'] = min(bar['low'], event['low'])
+                bar['close'] = event['close']
+                bar['volume'] += event['volume']
+            else:
+                return  # Late event for a bar already completed
+            self.forming[symbol] = bar
+
+            indicators = state.preview(bar['high'], bar['low'], bar['close'], bar['volume'])
+            reason = self._meaningful_change(symbol, indicators)
+            if not reason or symbol in self.in_flight:
+                return
+            self.in_flight.add(symbol)
+            self.last_trigger[symbol] = (indicators, time.time())
+            self.triggers += 1
+        self.worker.submit(self._trigger, symbol, indicators, reason, event['ts'])
+
+    def _seed(self, symbol, bucket):
+        """Start a symbol's indicators from the completed bars already in the store"""
+        state = IncrementalIndicators(symbol)
+        bars = self.store.load(symbol, self.interval, start=bucket - pd.Timedelta(days=60)) if self.store else None
+        if bars is not None:
+            bars = bars[bars.index < bucket]
+            for ts, high, low, close, volume in zip(bars.index, bars['High'], bars['Low'], bars['Close'], bars['Volume']):
+                state.update(high, low, close, volume, ts)
+        self.states[symbol] = state
+        return state
+
+    def _complete(self, symbol, state, bar):
+        """Commit a finished bar to the indicators and the bar store"""
+        state.update(bar['high'], bar['low'], bar['close'], bar['volume'], bar['ts'])
+        if self.store is not None:
+            df = pd.DataFrame({'Open': [bar['open']], 'High': [bar['high']], 'Low': [bar['low']],
+                               'Close': [bar['close']], 'Volume': [bar['volume']]}, index=[bar['ts']])
+            self.store.append(symbol, self.series, df)
+
+    def _meaningful_change(self, symbol, indicators):
+        """Why this update deserves an analysis, or None"""
+        last = self.last_trigger.get(symbol)
+        if last is None:
+            # First sight of a symbol only sets the baseline
+            self.last_trigger[symbol] = (indicators, 0.0)
+            return None
+        previous, triggered_at = last
+        if time.time() - triggered_at < self.cooldown:
+            return None
+
+        price, previous_price = indicators['current_price'], previous['current_price']
+        move = (price - previous_price) / previous_price * 100 if previous_price else 0
+        if abs(move) >= self.move_threshold:
+            return f"price {move:+.2f}% since last analysis"
+
+        rsi, previous_rsi = indicators['rsi'], previous['rsi']
+        if not (math.isnan(rsi) or math.isnan(previous_rsi)):
+            if (rsi < 30) != (previous_rsi < 30):
+                return f"RSI {rsi:.0f} crossed 30"
+            if (rsi > 70) != (previous_rsi > 70):
+                return f"RSI {rsi:.0f} crossed 70"
+
+        histogram = indicators['macd'] - indicators['macd_signal']
+        previous_histogram = previous['macd'] - previous['macd_signal']
+        if histogram * previous_histogram < 0:
+            return "MACD crossed its signal line"
+        return None
+
+    def _trigger(self, symbol, indicators, reason, ts):
+        try:
+            print(f"⚡ {symbol}: {reason} - analysing")
+            self.on_trigger(symbol, indicators, reason, ts)
+        except Exception as e:
+            print(f"❌ Stream-triggered analysis failed for {symbol}: {e}")
+        finally:
+            with self.lock:
+                self.in_flight.discard(symbol)
+
+    def stats(self):
+        return {'events': self.events, 'triggers': self.triggers, 'symbols': len(self.states)}
+
+    def close(self):
+        """Wait for triggered analyses to finish"""
+        self.worker.shutdown(wait=True)
+
+def create_source(name=None, api_key=None, secret_key=None):
+    """Build the bar source selected by name or the STREAM_SOURCE environment variable, or None"""
+    name = (name or os.getenv("STREAM_SOURCE", "off")).lower()
+    if name == "alpaca":
+        return AlpacaStreamSource(api_key, secret_key, feed=os.getenv("STREAM_FEED", "iex"),
+                                  base_url=os.getenv("ALPACA_BASE_URL", "https://paper-api.alpaca.markets"))
+    if name == "replay":
+        return FileReplaySource(os.getenv("STREAM_REPLAY_FILE", "stream_replay.csv"),
+                                speed=float(os.getenv("STREAM_REPLAY_SPEED", 0)))
+    return None
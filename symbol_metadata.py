@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Symbol Metadata - Sector, industry, size and liquidity index with reverse sector lookup
+"""
+
+import os
+import json
+import threading
+
+FIELDS = ('sector', 'industry', 'market_cap_bucket', 'liquidity_tier')
+
+# Lower bounds, largest first
+MARKET_CAP_BUCKETS = (('mega', 200e9), ('large', 10e9), ('mid', 2e9), ('small', 300e6), ('micro', 0))
+LIQUIDITY_TIERS = (('high', 500e6), ('medium', 20e6), ('low', 0))  # Average daily dollar volume
+
+def market_cap_bucket(market_cap):
+    if not market_cap or market_cap != market_cap:
+        return None
+    return next(name for name, floor in MARKET_CAP_BUCKETS if market_cap >= floor)
+
+def liquidity_tier(dollar_volume):
+    if not dollar_volume or dollar_volume != dollar_volume:
+        return None
+    return next(name for name, floor in LIQUIDITY_TIERS if dollar_volume >= floor)
+
+class SymbolMetadata:
+    def __init__(self, seed_file=None, cache_file=None):
+        """Initialize metadata index from the shipped seed file plus locally learned updates
+
+        Sector and industry names follow yfinance's Ticker.info so entries
+        refreshed from fundamentals line up with the seed.
+        """
+        self.seed_file = seed_file or os.getenv("SYMBOL_METADATA_FILE", "symbol_metadata.json")
+        self.cache_file = cache_file or os.getenv("SYMBOL_METADATA_CACHE_FILE", "symbol_metadata_cache.json")
+        self.entries = {}  # symbol -> {field: value}
+        self.by_sector = {}  # sector -> set of symbols
+        self.lock = threading.Lock()
+        for path in (self.seed_file, self.cache_file):
+            for symbol, fields in self._read(path).items():
+                self._set(symbol, fields)
+
+    def get(self, symbol):
+        """All known fields for a symbol, or None"""
+        entry = self.entries.get(symbol)
+        return dict(entry) if entry else None
+
+    def sector(self, symbol, default='Unknown'):
+        return self.entries.get(symbol, {}).get('sector') or default
+
+    def symbols_in_sector(self, sector):
+        """Symbols in a sector, sorted"""
+        return sorted(self.by_sector.get(sector, ()))
+
+    def sectors(self):
+        return sorted(self.by_sector)
+
+    def symbols(self):
+        return sorted(self.entries)
+
+    def update(self, symbol, **fields):
+        """Record known fields for a symbol; returns True if anything changed"""
+        fields = {field: value for field, value in fields.items() if field in FIELDS and value}
+        with self.lock:
+            current = self.entries.get(symbol, {})
+            if all(current.get(field) == value for field, value in fields.items()):
+                return False
+            self._set(symbol, fields)
+            return True
+
+    def refresh_from_fundamentals(self, fundamentals, symbols=None):
+        """Fold in sector, industry, market cap and volume already held in the fundamentals cache
+
+        Uses FundamentalsCache.peek, so nothing is fetched. Returns the number
+        of symbols whose metadata changed, and saves them if any did.
+        """
+        changed = 0
+        for symbol in symbols if symbols is not None else list(fundamentals.entries):
+            values = {field: (fundamentals.peek(symbol, field) or (None,))[0]
+                      for field in ('sector', 'industry', 'marketCap', 'averageVolume', 'currentPrice')}
+            dollar_volume = (values['averageVolume'] or 0) * (values['currentPrice'] or 0)
+            changed += self.update(symbol, sector=values['sector'], industry=values['industry'],
+                                   market_cap_bucket=market_cap_bucket(values['marketCap']),
+                                   liquidity_tier=liquidity_tier(dollar_volume))
+        if changed:
+            self.save()
+        return changed
+
+    def save(self):
+        """Persist entries that differ from the seed file, atomically"""
+        seed = self._read(self.seed_file)
+        with self.lock:
+            learned = {symbol: entry for symbol, entry in self.entries.items() if entry != seed.get(symbol)}
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(learned, f, separators=(',', ':'))
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"⚠️ Could not save symbol metadata: {e}")
+
+    def _set(self, symbol, fields):
+        entry = self.entries.setdefault(symbol, {})
+        previous_sector = entry.get('sector')
+        entry.update({field: value for field, value in fields.items() if field in FIELDS and value})
+        if entry.get('sector') != previous_sector:
+            if previous_sector:
+                self.by_sector[previous_sector].discard(symbol)
+                if not self.by_sector[previous_sector]:
+                    del self.by_sector[previous_sector]
+            self.by_sector.setdefault(entry['sector'], set()).add(symbol)
+
+    def _read(self, path):
+        try:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not load symbol metadata from {path}: {e}")
+        return {}
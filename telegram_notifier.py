@@ -14,6 +14,8 @@ class TelegramNotifier:
         self.bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "8242945520:AAHfsijFpaY2oRK95dQGVmD0VpaiOEGChlA")
         self.chat_id = os.getenv("TELEGRAM_CHAT_ID", "")
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.timeout = float(os.getenv("TELEGRAM_TIMEOUT", 10))  # Seconds
+        self.session = requests.Session()  # Reuses the HTTPS connection between messages
         
     def send_message(self, message):
         """Send a message via Telegram"""
@@ -29,7 +31,7 @@ class TelegramNotifier:
                 "parse_mode": "HTML"
             }
             
-            response = requests.post(url, data=data)
+            response = self.session.post(url, data=data, timeout=self.timeout)
             if response.status_code == 200:
                 print(f"📱 Telegram: Message sent successfully")
                 return True
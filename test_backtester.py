@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test Backtester - Check the vectorized decision path and the fill accounting
+"""
+
+import numpy as np
+from backtester import prepare_market, generate_signals, Backtester
+from decision_backends import OfflineBackend, RuleBasedBackend
+from test_indicators import load_fixture
+
+class PerBarRules(OfflineBackend):
+    """Rule-based decisions through the generic one-decide()-per-bar path"""
+    rules = RuleBasedBackend()
+
+    def decide(self, indicators, context):
+        return self.rules.decide(indicators, context)
+
+def sample_market():
+    df = load_fixture()
+    return prepare_market({'LONG': df, 'SHORT': df.iloc[150:] * 1.5, 'SPARSE': df.iloc[::3]})
+
+def test_vectorized_signals_match_per_bar_decisions():
+    market = sample_market()
+    fast = generate_signals(market)
+    slow = generate_signals(market, PerBarRules())
+    for name in fast:
+        assert np.array_equal(fast[name], slow[name]), name
+
+def test_run_accounting():
+    market = sample_market()
+    backtester = Backtester(min_confidence=0.3, max_daily_trades=2, commission=1.0)
+    result = backtester.run(market, generate_signals(market, risk_tolerance="aggressive"))
+    trades, equity = result['trades'], result['equity_curve']
+
+    assert len(trades) > 0
+    assert trades.groupby(trades['timestamp'].dt.normalize()).size().max() <= 2
+
+    # Every fill happens at a bar open, and the final equity is cash plus marked positions
+    symbols = market['symbols']
+    cash = backtester.initial_cash
+    shares = dict.fromkeys(symbols, 0)
+    for trade in trades.itertuples():
+        t = market['timestamps'].get_loc(trade.timestamp)
+        assert trade.price == market['open'][t, symbols.index(trade.symbol)] * \
+            (1 + backtester.slippage if trade.action == 'BUY' else 1 - backtester.slippage)
+        sign = 1 if trade.action == 'BUY' else -1
+        cash -= sign * trade.total + trade.commission
+        shares[trade.symbol] += sign * trade.quantity
+
+    last_close = [market['series']['current_price'][~np.isnan(market['series']['current_price'][:, j]), j][-1]
+                  for j in range(len(symbols))]
+    assert abs(equity.iloc[-1] - (cash + sum(shares[s] * p for s, p in zip(symbols, last_close)))) < 1e-6
+    assert result['metrics']['trade_count'] == len(trades)
+    assert result['drawdown'].max() <= 0
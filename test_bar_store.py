@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test Bar Store - Check appends, overlap truncation and concurrent access
+"""
+
+import threading
+import pandas as pd
+from bar_store import BarStore
+from test_indicators import load_fixture
+
+def test_overlapping_append_replaces_the_tail(tmp_path):
+    bars = load_fixture()
+    store = BarStore(tmp_path / 'bars')
+    assert store.load('AAPL', '1h') is None and store.last_timestamp('AAPL', '1h') is None
+    assert store.append('AAPL', '1h', bars.iloc[:50]) == 50
+
+    # The stored tail was still forming; the next fetch starts at it and revises it
+    revised = bars.iloc[45:60].copy()
+    revised.iloc[4, revised.columns.get_loc('Close')] += 1.0
+    store.append('AAPL', '1h', revised)
+    stored = store.load('AAPL', '1h')
+    pd.testing.assert_frame_equal(stored, pd.concat([bars.iloc[:45], revised]), check_names=False, check_freq=False,
+                                  check_index_type=False)
+    assert store.last_timestamp('AAPL', '1h') == bars.index[59]
+
+    # Range loads; naive start times are UTC
+    tail = store.load('AAPL', '1h', start=bars.index[50].tz_localize(None))
+    assert len(tail) == 10 and tail.index[0] == bars.index[50]
+    assert store.load('AAPL', '1d') is None and store.load('MSFT', '1h') is None
+
+def test_concurrent_appends_and_loads_stay_consistent(tmp_path):
+    bars = load_fixture()
+    store = BarStore(tmp_path / 'bars')
+    store.append('AAPL', '1h', bars.iloc[:50])
+    errors = []
+
+    def writer():
+        # Rewrites the tail over and over, truncating the file each time
+        for end in range(51, len(bars)):
+            store.append('AAPL', '1h', bars.iloc[end - 2:end])
+
+    def reader():
+        try:
+            for _ in range(200):
+                df = store.load('AAPL', '1h')
+                assert df.index.is_monotonic_increasing and not df.index.has_duplicates
+                pd.testing.assert_frame_equal(df, bars.iloc[:len(df)], check_names=False, check_freq=False,
+                                              check_index_type=False)
+        except AssertionError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(store.load('AAPL', '1h')) == len(bars) - 1
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test Batch Decisions - Check batch splitting and that one bad entry only affects its own symbol
+"""
+
+import json
+from decision_backends import RuleBasedBackend
+from test_cycle_memo import make_engine
+
+SYMBOLS = ['AAPL', 'MSFT', 'NVDA', 'TSLA']
+
+class FlakyBatchRules(RuleBasedBackend):
+    """Rule-based replies with a scripted fault for the first batch requests"""
+
+    def __init__(self, faults):
+        super().__init__()
+        self.faults = list(faults)
+        self.requests = []  # Symbols per request, in order
+
+    def generate(self, prompt, items=None, batch=False):
+        symbols = [indicators['symbol'] for indicators, _ in items or []]
+        self.requests.append(symbols)
+        fault = self.faults.pop(0) if self.faults and batch else None
+        if fault == 'too_large':
+            raise ValueError("400 request payload size exceeds the limit")
+        if fault == 'garbled':
+            return "Sorry, I can't help with that."
+        reply = super().generate(prompt, items, batch)
+        if fault == 'bad_entries':
+            # MSFT is left out and NVDA has an out-of-range confidence
+            entries = [entry for entry in json.loads(reply) if entry['symbol'] != 'MSFT']
+            for entry in entries:
+                if entry['symbol'] == 'NVDA':
+                    entry['confidence'] = 85
+            reply = json.dumps(entries)
+        return reply
+
+def run_batch(faults, batch_size=4):
+    engine = make_engine()
+    engine.backend = FlakyBatchRules(faults)
+    engine.begin_cycle()
+    decisions = engine.get_ai_decisions_batch(SYMBOLS, batch_size=batch_size)
+    return engine, decisions
+
+def test_batches_respect_size_and_prompt_length():
+    engine = make_engine()
+    engine.begin_cycle()
+    pending = [(symbol, engine.get_technical_indicators(symbol), {}, None) for symbol in SYMBOLS + ['AMZN']]
+    assert [len(batch) for batch in engine._split_batches(pending, None, 2)] == [2, 2, 1]
+
+    overhead = len(engine.create_batch_ai_prompt([], None))
+    block = len(engine.format_stock_block(pending[0][1], {})) + 40
+    engine.max_batch_prompt_chars = overhead + 3 * block + 10
+    assert [len(batch) for batch in engine._split_batches(pending, None, 5)] == [3, 2]
+
+def test_bad_entries_are_retried_without_the_rest_of_the_batch():
+    engine, decisions = run_batch(['bad_entries'])
+    assert set(decisions) == set(SYMBOLS)
+    assert engine.backend.requests == [SYMBOLS, ['MSFT', 'NVDA']]
+    assert all(0 <= decision['confidence'] <= 1 for decision in decisions.values())
+
+def test_oversized_request_is_split_in_halves():
+    engine, decisions = run_batch(['too_large'])
+    assert set(decisions) == set(SYMBOLS)
+    assert engine.backend.requests == [SYMBOLS, ['AAPL', 'MSFT'], ['NVDA', 'TSLA']]
+
+def test_unparseable_reply_is_repaired_once_then_split():
+    engine, decisions = run_batch(['garbled', 'garbled'])
+    assert set(decisions) == set(SYMBOLS)
+    assert engine.backend.requests == [SYMBOLS, SYMBOLS, ['AAPL', 'MSFT'], ['NVDA', 'TSLA']]
+    assert engine.decision_parser.stats()['failed'] == 1 and engine.decision_parser.stats()['parsed'] == 2
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test Broker Snapshot - Check reads are served once per cycle, orders are applied locally and fills correct estimates
+"""
+
+from types import SimpleNamespace
+import pytest
+from broker_snapshot import BrokerSnapshot
+from test_simulated_broker import make_broker
+
+class CountingBroker:
+    """Counts the reads that reach the wrapped broker"""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.calls = 0
+
+    def __getattr__(self, attribute):
+        if attribute in ('get_account', 'list_positions'):
+            self.calls += 1
+        return getattr(self.broker, attribute)
+
+def test_snapshot_serves_cycle_reads_locally(tmp_path):
+    broker, _ = make_broker(tmp_path)
+    counting = CountingBroker(broker)
+    snapshot = BrokerSnapshot(counting)
+    snapshot.begin_cycle()
+
+    for _ in range(5):
+        snapshot.get_account()
+        snapshot.list_positions()
+    assert counting.calls == 2
+
+    order = snapshot.submit_order(symbol='AAPL', qty=5, side='buy', type='market', time_in_force='day')
+    price = float(order.filled_avg_price)
+    account, positions = snapshot.get_account(), snapshot.list_positions()
+    assert counting.calls == 2
+    assert float(account.cash) == pytest.approx(float(broker.get_account().cash))
+    assert [(p.symbol, p.qty) for p in positions] == [('AAPL', '5')]
+    assert float(positions[0].avg_entry_price) == pytest.approx(price)
+
+    snapshot.submit_order(symbol='AAPL', qty=5, side='sell', type='market', time_in_force='day')
+    assert snapshot.list_positions() == []
+    assert float(snapshot.get_account().cash) == pytest.approx(10000)
+
+    snapshot.end_cycle()
+    snapshot.get_account()
+    snapshot.get_account()
+    assert counting.calls == 4
+    assert snapshot.stats()['fetches'] == 2
+
+class AcceptingBroker(CountingBroker):
+    """Acknowledges market orders without a fill price, as Alpaca does"""
+
+    def submit_order(self, **kwargs):
+        order = self.broker.submit_order(**kwargs)
+        return SimpleNamespace(id=order.id, status='accepted', filled_avg_price=None)
+
+def test_fill_reports_replace_estimates_only(tmp_path):
+    broker, _ = make_broker(tmp_path)
+    counting = AcceptingBroker(broker)
+    snapshot = BrokerSnapshot(counting)
+    snapshot.begin_cycle()
+    snapshot.get_account()
+    snapshot.list_positions()
+
+    order = snapshot.submit_order(symbol='AAPL', qty=5, side='buy', expected_price=100.0)
+    assert snapshot.list_positions()[0].avg_entry_price == '100.0' and counting.calls == 2
+
+    snapshot.on_fill({'id': 'some-other-order'})
+    snapshot.list_positions()
+    assert counting.calls == 2
+    snapshot.on_fill({'id': order.id, 'filled_avg_price': '101.2'})
+    positions = snapshot.list_positions()
+    assert counting.calls == 3
+    assert float(positions[0].avg_entry_price) == pytest.approx(float(broker.get_position('AAPL').avg_entry_price))
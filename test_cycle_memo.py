@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test Cycle Memo - Check each symbol is analysed at most once per cycle
+"""
+
+import threading
+from ai_trading_engine import AITradingEngine
+from cycle_memo import CycleMemo
+from decision_backends import RuleBasedBackend
+from test_indicators import load_fixture
+
+class FixtureFeed:
+    """Market data feed serving the fixture bars for any symbol"""
+
+    def __init__(self):
+        self.bars = load_fixture()
+        self.fetches = 0
+
+    def get_bars(self, symbol, period='60d', interval='1h'):
+        self.fetches += 1
+        return self.bars
+
+    def clear(self):
+        pass
+
+class NoFundamentals:
+    def get(self, symbol, fields):
+        return {}
+
+class CountingRules(RuleBasedBackend):
+    calls = 0
+
+    def generate(self, prompt, items=None, batch=False):
+        self.calls += 1
+        return super().generate(prompt, items, batch)
+
+def make_engine():
+    # Injected so the default bar store and fundamentals cache never touch the working directory
+    engine = AITradingEngine(backend=CountingRules(), market_data=FixtureFeed(), fundamentals=NoFundamentals())
+    engine.decision_cache.max_age = 0  # Only the cycle memo may prevent repeat calls
+    return engine
+
+def test_memo_computes_once_across_threads():
+    memo = CycleMemo()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        memo.get_or_compute('key', lambda: calls.append(1) or len(calls))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1] and memo.stats()['hits'] == 7
+
+def test_decisions_are_reused_within_a_cycle():
+    engine = make_engine()
+    engine.begin_cycle()
+
+    indicators = engine.get_technical_indicators('AAPL')
+    assert engine.get_technical_indicators('AAPL') is indicators
+    first = engine.get_ai_decision('AAPL', indicators=indicators)
+    again = engine.get_ai_decision('AAPL', indicators=engine.get_technical_indicators('AAPL'))
+    assert again is first and engine.backend.calls == 1
+
+    batch = engine.get_ai_decisions_batch(['AAPL', 'MSFT'], batch_size=2)
+    assert batch['AAPL'] is first and engine.backend.calls == 2
+    assert engine.get_ai_decision('MSFT') is batch['MSFT'] and engine.backend.calls == 2
+
+    engine.begin_cycle()
+    engine.get_ai_decision('AAPL')
+    assert engine.backend.calls == 3
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test Decision Backends - Check the backend factory and the offline stand-ins
+"""
+
+import sys
+import json
+from types import ModuleType, SimpleNamespace
+import pytest
+from decision_backends import create_backend, GeminiBackend, RuleBasedBackend, ReplayBackend, RISK_THRESHOLDS
+from decision_parser import validate_decision
+
+INDICATORS = {'symbol': 'AAPL', 'current_price': 100.0, 'rsi': 25.0, 'macd': 0.4, 'macd_signal': 0.1,
+              'sma_20': 98.0, 'sma_50': 95.0, 'stoch_k': 15.0, 'bollinger_upper': 106.0, 'bollinger_lower': 99.0,
+              'atr': 1.5}
+
+def test_factory_selects_backend_from_name_or_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_BACKEND_LATENCY", "0.25")
+    monkeypatch.setenv("RISK_TOLERANCE", "aggressive")
+    rules = create_backend("rules")
+    assert isinstance(rules, RuleBasedBackend) and rules.latency == 0.25
+    assert rules.threshold == RISK_THRESHOLDS['aggressive']
+
+    replay_file = tmp_path / 'decisions.jsonl'
+    replay_file.write_text(json.dumps({'symbol': 'AAPL', 'action': 'SELL', 'confidence': 0.7}) + "\n")
+    monkeypatch.setenv("AI_BACKEND", "Replay")
+    monkeypatch.setenv("AI_REPLAY_FILE", str(replay_file))
+    assert isinstance(create_backend(), ReplayBackend)
+
+    # Gemini is the default; its SDK is only imported when selected
+    genai = ModuleType('google.generativeai')
+    genai.configure = lambda api_key: None
+    genai.GenerativeModel = lambda name: SimpleNamespace(generate_content=lambda prompt: SimpleNamespace(text='{}'))
+    monkeypatch.setitem(sys.modules, 'google.generativeai', genai)
+    monkeypatch.delenv("AI_BACKEND")
+    gemini = create_backend(gemini_api_key='key')
+    assert isinstance(gemini, GeminiBackend) and gemini.generate("prompt") == '{}'
+
+def test_rule_based_replies_are_deterministic_and_valid():
+    backend = RuleBasedBackend()
+    reply = backend.generate("prompt", items=[(INDICATORS, {})])
+    assert reply == backend.generate("ignored", items=[(INDICATORS, {})])
+    decision, errors = validate_decision(json.loads(reply))
+    assert errors == [] and decision['action'] == 'buy' and decision['stop_loss'] == pytest.approx(97.0)
+
+    batch = json.loads(backend.generate("prompt", items=[(INDICATORS, {}), (dict(INDICATORS, symbol='MSFT'), {})],
+                                        batch=True))
+    assert [entry['symbol'] for entry in batch] == ['AAPL', 'MSFT']
+
+def test_replay_cycles_recorded_decisions_per_symbol(tmp_path):
+    path = tmp_path / 'decisions.jsonl'
+    path.write_text("\n".join(json.dumps(entry) for entry in [
+        {'symbol': 'AAPL', 'action': 'BUY', 'confidence': 0.9},
+        {'symbol': 'AAPL', 'action': 'HOLD', 'confidence': 0.4},
+        {'symbol': '*', 'action': 'SELL', 'confidence': 0.6}
+    ]) + "\n")
+    backend = ReplayBackend(str(path))
+    actions = [json.loads(backend.generate("", items=[(INDICATORS, {})]))['action'] for _ in range(3)]
+    assert actions == ['BUY', 'HOLD', 'BUY']
+    assert json.loads(backend.generate("", items=[(dict(INDICATORS, symbol='XOM'), {})]))['action'] == 'SELL'
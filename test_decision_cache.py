@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test Decision Cache - Check fingerprint quantization, expiry and reuse across cycles
+"""
+
+import decision_cache
+from decision_cache import DecisionCache
+from test_cycle_memo import make_engine
+
+INDICATORS = {'current_price': 100.0, 'price_change_24h': 1.2, 'rsi': 55.0, 'stoch_k': 60.0, 'stoch_d': 58.0,
+              'macd': 0.30, 'macd_signal': 0.25, 'sma_20': 99.0, 'sma_50': 97.0, 'ema_12': 99.5, 'ema_26': 98.5,
+              'bollinger_upper': 104.0, 'bollinger_lower': 95.0, 'atr': 1.5, 'volume_current': 1.1e6,
+              'volume_avg': 1e6}
+CONTEXT = {'sector': 'Technology', 'beta': 1.2, 'pe_ratio': 30.0}
+
+def scaled(indicators, factor):
+    """The same chart at a different price level"""
+    levels = {'current_price', 'macd', 'macd_signal', 'sma_20', 'sma_50', 'ema_12', 'ema_26',
+              'bollinger_upper', 'bollinger_lower', 'atr'}
+    return {field: value * factor if field in levels else value for field, value in indicators.items()}
+
+def test_small_moves_share_a_fingerprint_and_real_moves_do_not():
+    cache = DecisionCache()
+    key = cache.fingerprint('AAPL', INDICATORS, CONTEXT)
+    assert cache.fingerprint('AAPL', dict(scaled(INDICATORS, 0.999), rsi=55.4), CONTEXT) == key
+    assert cache.fingerprint('AAPL', scaled(INDICATORS, 1.02), CONTEXT) != key
+    assert cache.fingerprint('AAPL', dict(INDICATORS, rsi=59.0), CONTEXT) != key
+    assert cache.fingerprint('MSFT', INDICATORS, CONTEXT) != key
+    assert cache.fingerprint('AAPL', INDICATORS, CONTEXT, extra={'risk_tolerance': 'aggressive'}) != key
+    assert cache.fingerprint('AAPL', INDICATORS, CONTEXT, {'total_value': 100000}) == key
+
+    # Price-level fields are relative, so a $2,000 stock with the same chart differs only in its price
+    expensive = dict(cache.fingerprint('AAPL', scaled(INDICATORS, 20), CONTEXT)[2:])
+    assert expensive.pop('current_price') != dict(key[2:]).pop('current_price')
+    assert expensive == {field: value for field, value in key[2:] if field != 'current_price'}
+
+    # Missing and NaN inputs quantize to None instead of breaking the key
+    assert dict(cache.fingerprint('AAPL', dict(INDICATORS, rsi=float('nan')), CONTEXT)[2:])['rsi'] is None
+
+def test_entries_expire_and_are_copies(monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(decision_cache.time, 'time', lambda: now[0])
+    cache = DecisionCache(max_age=600)
+    key = cache.fingerprint('AAPL', INDICATORS, CONTEXT)
+    cache.put(key, {'action': 'buy', 'confidence': 0.8})
+
+    hit = cache.get(key)
+    hit['action'] = 'sell'
+    assert cache.get(key)['action'] == 'buy'
+
+    now[0] += 601
+    assert cache.get(key) is None
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'llm_calls_saved': 2, 'hit_rate': 2 / 3, 'entries': 1}
+    cache.put(cache.fingerprint('MSFT', INDICATORS, CONTEXT), {'action': 'hold', 'confidence': 0.5})
+    assert cache.stats()['entries'] == 1  # Expired entries are dropped on put
+
+def test_unchanged_inputs_skip_the_backend_in_the_next_cycle():
+    engine = make_engine()
+    engine.decision_cache.max_age = 3600
+    engine.begin_cycle()
+    first = engine.get_ai_decision('AAPL')
+    engine.begin_cycle()
+    again = engine.get_ai_decision('AAPL')
+    assert engine.backend.calls == 1 and again['cached'] and again['action'] == first['action']
+    assert engine.decision_cache.stats()['llm_calls_saved'] == 1
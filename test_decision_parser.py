@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test Decision Parser - Check JSON extraction, range validation and the repair retry
+"""
+
+import json
+from ai_trading_engine import AITradingEngine
+from decision_backends import DecisionBackend
+from decision_parser import DecisionParser, validate_decision
+from test_cycle_memo import FixtureFeed, NoFundamentals
+
+GOOD = {"action": "BUY", "confidence": 0.8, "reasoning": "Momentum", "position_size": 0.3,
+        "stop_loss": "$95.50", "take_profit": 120, "risk_level": "low", "time_horizon": "SHORT"}
+
+def test_fenced_and_embedded_json_are_extracted():
+    parser = DecisionParser()
+    fenced = f"Here is my analysis.\n```json\n{json.dumps(GOOD, indent=2)}\n```\nGood luck!"
+    decision, errors = parser.parse(fenced)
+    assert errors == [] and decision['action'] == 'buy' and decision['risk_level'] == 'LOW'
+    assert decision['stop_loss'] == 95.5
+
+    decision, _ = parser.parse(f"My decision: {json.dumps(GOOD)} - based on RSI.")
+    assert decision['confidence'] == 0.8
+
+def test_truncated_json_is_reported_not_guessed():
+    text = json.dumps(GOOD)[:40]  # Reply cut off mid-object
+    decision, errors = DecisionParser().parse(f"```json\n{text}")
+    assert decision is None and errors == ["no JSON object found in reply"]
+    assert DecisionParser().parse_batch(json.dumps([dict(GOOD, symbol='AAPL')])[:-5]) is None
+
+def test_fractions_must_be_in_range_or_explicit_percentages():
+    assert validate_decision(dict(GOOD, confidence="85%"))[0]['confidence'] == 0.85
+    assert validate_decision(dict(GOOD, confidence=1))[0]['confidence'] == 1.0
+    for value in (85, 1.5, -0.1, "150%", "high", None):
+        decision, errors = validate_decision(dict(GOOD, confidence=value))
+        assert decision is None and errors[0].startswith("invalid confidence"), value
+
+    decision, errors = validate_decision(dict(GOOD, position_size=20))
+    assert decision is None and errors == ["invalid position_size 20 (expected 0.0-1.0)"]
+    assert validate_decision({k: v for k, v in GOOD.items() if k != 'position_size'})[0]['position_size'] == 0.0
+
+class ScriptedBackend(DecisionBackend):
+    """Returns canned replies in order and records the prompts it was sent"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def generate(self, prompt, items=None, batch=False):
+        self.prompts.append(prompt)
+        return self.replies.pop(0)
+
+def make_engine(backend):
+    return AITradingEngine(backend=backend, market_data=FixtureFeed(), fundamentals=NoFundamentals())
+
+def test_out_of_range_reply_is_repaired():
+    backend = ScriptedBackend(json.dumps(dict(GOOD, confidence=85)), f"```json\n{json.dumps(GOOD)}\n```")
+    engine = make_engine(backend)
+    decision = engine.get_ai_decision('AAPL')
+
+    assert decision['confidence'] == 0.8 and len(backend.prompts) == 2
+    assert "invalid confidence 85" in backend.prompts[1]
+    assert engine.decision_parser.stats()['repaired'] == 1
+
+def test_unrepairable_reply_fails_without_a_decision():
+    backend = ScriptedBackend("I think you should buy.", json.dumps(dict(GOOD, position_size=30)))
+    engine = make_engine(backend)
+    assert engine.get_ai_decision('AAPL') is None
+    assert engine.decision_parser.stats()['failed'] == 1
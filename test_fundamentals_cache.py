@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test Fundamentals Cache - Check per-field TTLs, empty replies and persistence
+"""
+
+from types import SimpleNamespace
+import fundamentals_cache
+from fundamentals_cache import FundamentalsCache, HOUR, MINUTE
+
+INFO = {'sector': 'Technology', 'industry': 'Consumer Electronics', 'marketCap': 3e12, 'trailingPE': 30.5,
+        'currentPrice': 190.0, 'beta': 1.2}
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def patch(monkeypatch, info=INFO):
+    """Serve Ticker.info from a dict (or None for a throttled reply) and count lookups"""
+    calls = []
+    clock = FakeClock()
+    monkeypatch.setattr(fundamentals_cache.time, 'time', clock)
+    monkeypatch.setattr(fundamentals_cache.yf, 'Ticker',
+                        lambda symbol: calls.append(symbol) or SimpleNamespace(info=dict(info) if info else info))
+    return calls, clock
+
+def test_fields_expire_on_their_own_ttl(tmp_path, monkeypatch):
+    calls, clock = patch(monkeypatch)
+    cache = FundamentalsCache(cache_file=str(tmp_path / 'fundamentals.json'))
+    assert cache.get('AAPL', ['sector', 'currentPrice']) == {'sector': 'Technology', 'currentPrice': 190.0}
+
+    clock.now += MINUTE
+    cache.get('AAPL', ['sector', 'currentPrice'])
+    assert calls == ['AAPL']
+
+    # A price is stale after two minutes; the sector alone is still fresh
+    clock.now += 2 * MINUTE
+    assert cache.get_field('AAPL', 'sector') == 'Technology' and calls == ['AAPL']
+    cache.get('AAPL', ['sector', 'currentPrice'])
+    assert calls == ['AAPL', 'AAPL']
+
+    # Fields Ticker.info lacks are remembered as missing rather than refetched
+    assert cache.get('AAPL', ['dividendYield']) == {} and cache.get_field('AAPL', 'dividendYield', 0) == 0
+    assert len(calls) == 2
+    assert cache.peek('AAPL', 'marketCap')[0] == 3e12 and cache.peek('AAPL', 'dividendYield') is None
+    assert cache.stats()['hits'] == 4 and cache.stats()['misses'] == 2
+
+    clock.now += 6 * HOUR
+    cache.get('AAPL', ['marketCap'])
+    assert len(calls) == 3
+
+def test_empty_replies_are_not_cached(tmp_path, monkeypatch):
+    calls, _ = patch(monkeypatch, info=None)
+    cache = FundamentalsCache(cache_file=str(tmp_path / 'fundamentals.json'))
+    assert cache.get('ZZZZ', ['sector']) == {} and cache.get('ZZZZ', ['sector']) == {}
+    assert calls == ['ZZZZ', 'ZZZZ'] and cache.stats()['symbols'] == 0
+
+def test_entries_survive_a_restart(tmp_path, monkeypatch):
+    calls, clock = patch(monkeypatch)
+    path = str(tmp_path / 'fundamentals.json')
+    FundamentalsCache(cache_file=path).get('AAPL', ['sector'])
+
+    clock.now += HOUR
+    reloaded = FundamentalsCache(cache_file=path)
+    assert reloaded.get('AAPL', ['sector', 'trailingPE']) == {'sector': 'Technology', 'trailingPE': 30.5}
+    assert calls == ['AAPL']
+    assert not (tmp_path / 'fundamentals.json.tmp').exists()
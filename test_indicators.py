@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test Indicators - Check incremental and panel indicators against the ta library
+"""
+
+import math
+import os
+import pandas as pd
+import ta
+from indicators import IncrementalIndicators, build_panel, compute_panel, panel_indicators
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sample_bars_1h.csv")
+
+def load_fixture():
+    """Load stored hourly OHLCV bars"""
+    return pd.read_csv(FIXTURE, index_col=0, parse_dates=True)
+
+def ta_reference(df):
+    """Full indicator series computed the way get_technical_indicators used to"""
+    close, high, low, volume = df['Close'], df['High'], df['Low'], df['Volume']
+    macd = ta.trend.MACD(close)
+    bollinger = ta.volatility.BollingerBands(close)
+    stochastic = ta.momentum.StochasticOscillator(high, low, close)
+    return {
+        'volume_avg': volume.rolling(20).mean(),
+        'rsi': ta.momentum.RSIIndicator(close).rsi(),
+        'macd': macd.macd(),
+        'macd_signal': macd.macd_signal(),
+        'bollinger_upper': bollinger.bollinger_hband(),
+        'bollinger_lower': bollinger.bollinger_lband(),
+        'sma_20': ta.trend.SMAIndicator(close, window=20).sma_indicator(),
+        'sma_50': ta.trend.SMAIndicator(close, window=50).sma_indicator(),
+        'ema_12': ta.trend.EMAIndicator(close, window=12).ema_indicator(),
+        'ema_26': ta.trend.EMAIndicator(close, window=26).ema_indicator(),
+        'stoch_k': stochastic.stoch(),
+        'stoch_d': stochastic.stoch_signal(),
+        'atr': ta.volatility.AverageTrueRange(high, low, close).average_true_range()
+    }
+
+def assert_close(name, i, actual, expected):
+    if math.isnan(expected):
+        assert math.isnan(actual), f"{name}[{i}]: expected NaN, got {actual}"
+    else:
+        assert math.isclose(actual, expected, rel_tol=1e-9, abs_tol=1e-9), \
+            f"{name}[{i}]: expected {expected}, got {actual}"
+
+def test_incremental_matches_ta():
+    """Every bar's incremental output equals the ta value at that bar"""
+    df = load_fixture()
+    reference = ta_reference(df)
+    engine = IncrementalIndicators('TEST')
+
+    for i, (ts, bar) in enumerate(df.iterrows()):
+        values = engine.update(bar['High'], bar['Low'], bar['Close'], bar['Volume'], ts)
+        for name, series in reference.items():
+            assert_close(name, i, values[name], float(series.iloc[i]))
+
+    close = df['Close']
+    expected_change = (close.iloc[-1] - close.iloc[-24]) / close.iloc[-24] * 100
+    assert_close('price_change_24h', len(df) - 1, values['price_change_24h'], expected_change)
+
+def test_preview_does_not_commit():
+    """Previewing a forming bar leaves the committed state untouched"""
+    df = load_fixture()
+    engine = IncrementalIndicators('TEST')
+    for ts, bar in df.iloc[:-1].iterrows():
+        engine.update(bar['High'], bar['Low'], bar['Close'], bar['Volume'], ts)
+
+    committed = engine.snapshot()
+    last = df.iloc[-1]
+    preview = engine.preview(last['High'], last['Low'], last['Close'], last['Volume'])
+
+    assert engine.snapshot() == committed
+    assert_close('rsi', len(df) - 1, preview['rsi'], float(ta_reference(df)['rsi'].iloc[-1]))
+
+def test_panel_matches_ta():
+    """Panel mode reproduces ta for symbols with different history lengths"""
+    df = load_fixture()
+    bars = {'LONG': df, 'SHORT': df.iloc[150:], 'TINY': df.iloc[-30:]}
+    symbols, panel = build_panel(bars)
+    series = compute_panel(panel)
+
+    for j, symbol in enumerate(symbols):
+        reference = ta_reference(bars[symbol])
+        offset = len(df) - len(bars[symbol])
+        for name, expected in reference.items():
+            for i in range(len(expected)):
+                actual = series[name][offset + i, j]
+                expected_value = float(expected.iloc[i])
+                if math.isnan(expected_value):
+                    assert math.isnan(actual), f"{symbol} {name}[{i}]: expected NaN, got {actual}"
+                else:
+                    assert math.isclose(actual, expected_value, rel_tol=1e-7, abs_tol=1e-7), \
+                        f"{symbol} {name}[{i}]: expected {expected_value}, got {actual}"
+
+    latest = panel_indicators(bars)
+    assert set(latest) == set(bars)
+    assert latest['TINY']['current_price'] == float(df['Close'].iloc[-1])
+
+if __name__ == "__main__":
+    test_incremental_matches_ta()
+    test_preview_does_not_commit()
+    test_panel_matches_ta()
+    print("✅ Incremental and panel indicators match ta")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test Market Data - Check batched downloads per cycle and incremental top-ups from the bar store
+"""
+
+import pandas as pd
+import market_data
+from bar_store import BarStore
+from market_data import MarketDataFeed
+from test_indicators import load_fixture
+
+class FakeDownload:
+    """Stands in for yf.download: serves the fixture for every known symbol and records each request"""
+
+    def __init__(self, bars, known=('AAPL', 'MSFT', 'NVDA')):
+        self.bars = bars
+        self.known = known
+        self.calls = []
+
+    def __call__(self, symbols, period=None, start=None, interval='1h', **kwargs):
+        self.calls.append({'symbols': list(symbols), 'period': period, 'start': start})
+        bars = self.bars if start is None else self.bars[self.bars.index >= start]
+        return pd.concat({symbol: bars for symbol in symbols if symbol in self.known}, axis=1)
+
+def test_one_download_per_cycle_for_many_symbols(monkeypatch):
+    download = FakeDownload(load_fixture())
+    monkeypatch.setattr(market_data.yf, 'download', download)
+    feed = MarketDataFeed()
+
+    bars = feed.get_many(['AAPL', 'MSFT', 'AAPL', 'ZZZZ'])
+    assert download.calls == [{'symbols': ['AAPL', 'MSFT', 'ZZZZ'], 'period': '60d', 'start': None}]
+    assert set(bars) == {'AAPL', 'MSFT'}  # Symbols missing from the reply are skipped
+    pd.testing.assert_frame_equal(bars['AAPL'], download.bars)
+
+    # Later reads in the cycle are served from memory; only new symbols are fetched
+    assert feed.get_bars('MSFT') is bars['MSFT']
+    feed.get_many(['AAPL', 'NVDA'])
+    assert [call['symbols'] for call in download.calls] == [['AAPL', 'MSFT', 'ZZZZ'], ['NVDA']]
+
+    feed.clear()
+    feed.get_bars('AAPL')
+    assert len(download.calls) == 3
+
+def recent_fixture():
+    """Fixture bars shifted so the newest one opened an hour ago"""
+    bars = load_fixture()
+    bars.index = bars.index + (pd.Timestamp.now(tz='UTC').floor('h') - pd.Timedelta(hours=1) - bars.index[-1])
+    return bars
+
+def test_warm_symbols_fetch_only_new_bars(tmp_path, monkeypatch):
+    bars = recent_fixture()
+    first = bars.iloc[:300].copy()
+    first.iloc[-1, first.columns.get_loc('Close')] += 2.0  # Fetched while the bar was still forming
+    download = FakeDownload(first)
+    monkeypatch.setattr(market_data.yf, 'download', download)
+    store = BarStore(tmp_path / 'bars')
+
+    MarketDataFeed(store).prefetch(['AAPL', 'MSFT'])
+    assert download.calls == [{'symbols': ['AAPL', 'MSFT'], 'period': '60d', 'start': None}]
+
+    # Next cycle: stored symbols share one top-up from their newest bar; new ones get a full download
+    download.bars = bars
+    fetched = MarketDataFeed(store).prefetch(['AAPL', 'MSFT', 'NVDA'])
+    assert download.calls[1:] == [{'symbols': ['AAPL', 'MSFT'], 'period': None, 'start': bars.index[299]},
+                                  {'symbols': ['NVDA'], 'period': '60d', 'start': None}]
+    for symbol in ('AAPL', 'MSFT', 'NVDA'):
+        pd.testing.assert_frame_equal(fetched[symbol], bars, check_names=False, check_freq=False,
+                                      check_index_type=False)
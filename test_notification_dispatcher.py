@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test Notification Dispatcher - Check non-blocking delivery, digests and splitting, retries, queue bounds and shutdown
+"""
+
+import time
+import threading
+from notification_dispatcher import NotificationDispatcher
+
+class RecordingChannel:
+    """Send callable that records messages, optionally slow or failing first"""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self.messages = []
+
+    def __call__(self, message):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("provider unavailable")
+        self.messages.append(message)
+        return True
+
+def test_slow_channel_does_not_block_caller_or_other_channels():
+    slow, fast = RecordingChannel(delay=0.5), RecordingChannel()
+    dispatcher = NotificationDispatcher({'slow': slow, 'fast': fast}, rate_limits={'slow': 0, 'fast': 0},
+                                        digest_window=0)
+    started = time.time()
+    assert dispatcher.notify("trade 1") == ['slow', 'fast']
+    assert time.time() - started < 0.05
+
+    time.sleep(0.2)
+    assert fast.messages == ["trade 1"] and slow.messages == []
+    assert dispatcher.flush(timeout=5)
+    assert slow.messages == ["trade 1"]
+    dispatcher.close()
+
+def test_burst_is_coalesced_into_one_digest():
+    channel = RecordingChannel()
+    dispatcher = NotificationDispatcher({'telegram': channel}, digest_window=0.3, rate_limits={'telegram': 0})
+    for number in range(5):
+        dispatcher.notify(f"trade {number}")
+    assert dispatcher.flush(timeout=5)
+
+    assert len(channel.messages) == 1
+    assert channel.messages[0].startswith("📬 5 updates")
+    assert all(f"trade {number}" in channel.messages[0] for number in range(5))
+    assert dispatcher.stats()['telegram']['coalesced'] == 4
+    dispatcher.close()
+
+def test_failures_are_retried_with_backoff_then_dropped():
+    flaky = RecordingChannel(failures=2)
+    dispatcher = NotificationDispatcher({'whatsapp': flaky}, max_retries=3, backoff=0.01, digest_window=0)
+    dispatcher.notify("trade")
+    assert dispatcher.flush(timeout=5)
+    assert flaky.calls == 3 and flaky.messages == ["trade"]
+
+    broken = RecordingChannel(failures=10)
+    dispatcher = NotificationDispatcher({'whatsapp': broken}, max_retries=2, backoff=0.01, digest_window=0)
+    dispatcher.notify("trade")
+    assert dispatcher.flush(timeout=5)
+    assert broken.calls == 3 and dispatcher.stats()['whatsapp']['failed'] == 1
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+    dispatcher = NotificationDispatcher({'telegram': lambda message: release.wait(5)}, max_queue=2,
+                                        digest_window=0)
+    dispatcher.notify("in flight")
+    time.sleep(0.1)  # Worker picks it up and blocks in send
+    results = [dispatcher.notify(f"queued {number}") for number in range(4)]
+    assert results == [['telegram'], ['telegram'], [], []]
+    assert dispatcher.stats()['telegram']['dropped'] == 2
+    release.set()
+    dispatcher.close()
+
+def test_long_digests_are_split_under_each_channel_limit():
+    whatsapp, telegram = RecordingChannel(), RecordingChannel()
+    dispatcher = NotificationDispatcher({'whatsapp': whatsapp, 'telegram': telegram}, digest_window=0.3,
+                                        rate_limits={'whatsapp': 0, 'telegram': 0})
+    trades = [f"trade {number}\n" + "x" * 300 for number in range(20)]
+    for message in trades:
+        dispatcher.notify(message)
+    dispatcher.notify("report\n" + "\n".join("y" * 120 for _ in range(30)) + "\n" + "z" * 5000)
+    assert dispatcher.flush(timeout=5)
+
+    for channel, limit in ((whatsapp, 1600), (telegram, 4096)):
+        assert len(channel.messages) > 1
+        assert all(len(message) <= limit for message in channel.messages)
+        assert channel.messages[0].startswith(f"📬 21 updates (part 1/{len(channel.messages)})")
+        text = "".join(channel.messages)
+        assert all(message.split("\n")[0] in text for message in trades)
+        assert text.count("z") == 5000
+    assert len(whatsapp.messages) > len(telegram.messages)
+    dispatcher.close()
+
+def test_close_delivers_queued_messages_then_stops():
+    channel = RecordingChannel(delay=0.05)
+    dispatcher = NotificationDispatcher({'telegram': channel}, digest_window=0, rate_limits={'telegram': 0})
+    for number in range(3):
+        dispatcher.notify(f"trade {number}")
+    assert dispatcher.close(timeout=5)
+    assert "".join(channel.messages).count("trade") == 3
+    assert not dispatcher.workers['telegram'].thread.is_alive()
+
+    # Whatever cannot be delivered in time is counted as dropped rather than left behind
+    release = threading.Event()
+    dispatcher = NotificationDispatcher({'telegram': lambda message: release.wait(5)}, digest_window=0)
+    dispatcher.notify("in flight")
+    time.sleep(0.1)  # Worker picks it up and blocks in send
+    dispatcher.notify("queued 1")
+    dispatcher.notify("queued 2")
+    assert not dispatcher.close(timeout=0.1)
+    assert dispatcher.stats()['telegram']['dropped'] == 2 and dispatcher.stats()['telegram']['queued'] == 0
+    release.set()
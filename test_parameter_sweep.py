@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Test Parameter Sweep - Check walk-forward splits and pooled runs against direct backtests
+"""
+
+from backtester import prepare_market, generate_signals, Backtester
+from parameter_sweep import walk_forward_splits, parameter_sets, run_sweep, summarize, walk_forward
+from test_indicators import load_fixture
+
+def test_walk_forward_splits_do_not_overlap():
+    splits = walk_forward_splits(400, splits=4, train_fraction=0.75)
+    assert splits[0] == ((0, 75), (75, 100))
+    for (train, test), (next_train, _) in zip(splits, splits[1:]):
+        assert train[1] == test[0] and test[1] == next_train[0]
+
+def test_sweep_matches_direct_backtests():
+    df = load_fixture()
+    market = prepare_market({'LONG': df, 'SHORT': df.iloc[150:] * 1.5})
+    grid = {'min_confidence': [0.3, 0.5], 'max_position_size': [0.1], 'max_daily_trades': [3],
+            'risk_tolerance': ['moderate', 'aggressive'], 'recovery_min_confidence': [0.4]}
+    results = run_sweep(market, parameter_sets(grid), splits=2, workers=2)
+    assert len(results) == 4 * 2 * 2
+
+    row = results[(results['min_confidence'] == 0.3) & (results['risk_tolerance'] == 'aggressive') &
+                  (results['fold'] == 1) & (results['segment'] == 'test')].iloc[0]
+    (_, _), (start, stop) = walk_forward_splits(len(market['timestamps']), 2)[1]
+    window = {
+        'symbols': market['symbols'],
+        'timestamps': market['timestamps'][start:stop],
+        'open': market['open'][start:stop],
+        'series': {'current_price': market['series']['current_price'][start:stop]}
+    }
+    signals = {name: values[start:stop] for name, values in
+               generate_signals(market, risk_tolerance='aggressive').items()}
+    direct = Backtester(min_confidence=0.3, max_position_size=0.1, max_daily_trades=3,
+                        recovery_min_confidence=0.4).run(window, signals)['metrics']
+    assert row['trade_count'] == direct['trade_count']
+    assert abs(row['total_return_pct'] - direct['total_return_pct']) < 1e-9
+
+    assert len(summarize(results)) == 4
+    assert list(walk_forward(results)['fold']) == [0, 1]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test Portfolio Analytics - Compare incremental rolling metrics with a from-scratch computation, one return per session
+"""
+
+from datetime import date
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+from portfolio_analytics import PortfolioAnalytics
+from portfolio_tracker import PortfolioTracker
+from symbol_metadata import SymbolMetadata
+from test_symbol_metadata import SEED_FILE
+
+def reference(values, window, periods_per_year):
+    returns = np.diff(values) / values[:-1]
+    returns = returns[-window:]
+    volatility = returns.std(ddof=1)
+    downside = np.sqrt((np.minimum(returns, 0) ** 2).mean())
+    drawdown = values / np.maximum.accumulate(values) - 1
+    return {
+        'volatility_pct': volatility * np.sqrt(periods_per_year) * 100,
+        'sharpe': returns.mean() / volatility * np.sqrt(periods_per_year),
+        'sortino': returns.mean() / downside * np.sqrt(periods_per_year),
+        'max_drawdown_pct': drawdown.min() * 100,
+        'current_drawdown_pct': drawdown[-1] * 100
+    }
+
+def test_rolling_metrics_match_full_recomputation():
+    rng = np.random.default_rng(7)
+    values = 100000 * np.cumprod(1 + rng.normal(0.0005, 0.01, 500))
+    analytics = PortfolioAnalytics(window=60, periods_per_year=252)
+    for number, value in enumerate(values):
+        metrics = analytics.update(number, value)
+        if number in (10, 59, 60, 61, 250, 499):
+            expected = reference(values[:number + 1], 60, 252)
+            for name, value_expected in expected.items():
+                assert metrics[name] == pytest.approx(value_expected, rel=1e-9, abs=1e-9), (number, name)
+    assert metrics['return_periods'] == 60
+
+def test_same_snapshot_is_memoised():
+    analytics = PortfolioAnalytics(window=10)
+    analytics.update('t0', 100.0)
+    first = analytics.update('t1', 110.0)
+    assert analytics.update('t1', 110.0) == first
+    assert analytics.stats() == {'updates': 2, 'hits': 1}
+    assert analytics.count == 1
+
+def test_turnover_counts_traded_value_not_price_moves():
+    analytics = PortfolioAnalytics(window=10)
+    analytics.update(0, 10000, [{'symbol': 'AAPL', 'qty': 10, 'current_price': 100.0}])
+    # Price move only: no turnover
+    assert analytics.update(1, 10100, [{'symbol': 'AAPL', 'qty': 10, 'current_price': 110.0}])['turnover_pct'] == 0
+    # Sell all AAPL, buy $1,000 of MSFT: (1,100 + 1,000) / 2 of a $10,100 portfolio
+    metrics = analytics.update(2, 10100, [{'symbol': 'MSFT', 'qty': 5, 'current_price': 200.0}])
+    assert metrics['turnover_pct'] == pytest.approx((1100 + 1000) / 2 / 10100 * 100)
+
+def test_seeded_analytics_do_not_count_the_existing_book_as_traded():
+    book = [{'symbol': 'AAPL', 'qty': 300, 'current_price': 200.0}]
+    unknown = PortfolioAnalytics(window=10)
+    unknown.seed([100000, 100100, 100200])
+    assert unknown.update(0, 100300, book)['turnover_pct'] == 0
+    # Once the previous holdings are known, trades count again
+    assert unknown.update(1, 100300, [])['turnover_pct'] > 0
+
+    known = PortfolioAnalytics(window=10)
+    known.seed([100000, 100100, 100200], book)
+    assert known.update(0, 100300, book)['turnover_pct'] == 0
+
+def test_reports_for_the_same_session_share_one_snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # History store and legacy CSV live under the working directory
+    account = SimpleNamespace(portfolio_value='100000', cash='100000')
+    api = SimpleNamespace(get_account=lambda: account, list_positions=lambda: [])
+    symbols = SymbolMetadata(seed_file=SEED_FILE, cache_file=str(tmp_path / 'symbols.json'))
+    tracker = PortfolioTracker(api, symbols)
+
+    friday = date(2024, 7, 5)
+    daily = tracker.generate_portfolio_report(session=friday)
+    account.portfolio_value = '100050'  # Moves between the two jobs must not add a return
+    assert tracker.generate_portfolio_report(session=friday) is daily
+    assert len(tracker.history.query_documents('snapshots')) == 1
+    assert tracker.analytics.stats()['updates'] == 1
+
+    monday = tracker.generate_portfolio_report(session=date(2024, 7, 8))
+    assert monday is not daily and monday['metrics']['return_periods'] == 1
+    assert len(tracker.history.query_documents('snapshots')) == 2
+
+    # The legacy CSV log gets one row per snapshot and matches the store
+    log = pd.read_csv(tmp_path / 'performance_log.csv')
+    assert list(log['total_value']) == [100000.0, 100050.0]
+    history = tracker.get_portfolio_history()
+    assert list(history['total_value']) == list(log['total_value'])
+    assert list(history.columns) == list(log.columns)
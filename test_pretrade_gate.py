@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test Pre-Trade Gate - Check each limit and the daily rollover
+"""
+
+from types import SimpleNamespace
+from pretrade_gate import PreTradeGate
+from symbol_metadata import SymbolMetadata
+from test_symbol_metadata import SEED_FILE
+
+class FakeClock:
+    def __init__(self, now=1709564400.0):  # 2024-03-04 10:00 New York
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def make_gate(tmp_path, **limits):
+    symbols = SymbolMetadata(seed_file=SEED_FILE, cache_file=str(tmp_path / 'symbols.json'))
+    options = dict(max_symbol_exposure=0.25, max_sector_exposure=0.5, max_daily_notional=100000,
+                   max_daily_trades=5, max_orders_per_minute=3, duplicate_window=300)
+    options.update(limits)
+    clock = FakeClock()
+    gate = PreTradeGate(symbols, clock=clock, **options)
+    account = SimpleNamespace(portfolio_value='100000')
+    positions = [SimpleNamespace(symbol='AAPL', market_value='20000'), SimpleNamespace(symbol='MSFT', market_value='25000')]
+    gate.sync(account, positions)
+    return gate, clock
+
+def test_exposure_caps_apply_to_buys_only(tmp_path):
+    gate, _ = make_gate(tmp_path)
+    allowed, reason = gate.check('AAPL', 'buy', 60, 100.0)  # 20k + 6k > 25%
+    assert not allowed and 'AAPL would be 26.0%' in reason
+    assert gate.check('AAPL', 'buy', 50, 100.0) == (True, None)
+
+    # Technology already holds 45k; NVDA is also Technology
+    allowed, reason = gate.check('NVDA', 'buy', 10, 600.0)
+    assert not allowed and reason.startswith('Technology')
+    assert gate.check('XOM', 'buy', 10, 600.0) == (True, None)
+    assert gate.check('MSFT', 'sell', 100, 250.0) == (True, None)
+    assert gate.stats()['rejections'] == {'symbol_exposure': 1, 'sector_exposure': 1}
+
+def test_recorded_orders_update_exposure_and_duplicates(tmp_path):
+    gate, clock = make_gate(tmp_path)
+    gate.record('AAPL', 'buy', 40, 100.0)
+    allowed, reason = gate.check('AAPL', 'buy', 1, 100.0)
+    assert not allowed and 'duplicate buy for AAPL' in reason
+
+    clock.now += 301
+    allowed, reason = gate.check('AAPL', 'buy', 20, 100.0)  # 24k + 2k > 25%
+    assert not allowed and 'AAPL would be 26.0%' in reason
+    gate.record('AAPL', 'sell', 100, 100.0)
+    assert gate.check('AAPL', 'buy', 20, 100.0) == (True, None)
+
+def test_rate_daily_trade_and_notional_limits_with_rollover(tmp_path):
+    gate, clock = make_gate(tmp_path, max_daily_notional=10000)
+    for symbol in ('XOM', 'CVX', 'COP'):
+        assert gate.check(symbol, 'buy', 10, 100.0)[0]
+        gate.record(symbol, 'buy', 10, 100.0)
+    allowed, reason = gate.check('EOG', 'buy', 10, 100.0)
+    assert not allowed and 'rate limit' in reason
+
+    clock.now += 61
+    for symbol in ('EOG', 'SLB'):
+        gate.record(symbol, 'buy', 10, 100.0)
+    allowed, reason = gate.check('HAL', 'buy', 1, 100.0)
+    assert not allowed and 'daily trade limit of 5' in reason
+
+    clock.now += 24 * 3600  # Next market day
+    allowed, reason = gate.check('HAL', 'buy', 101, 100.0)
+    assert not allowed and 'daily notional cap' in reason
+    assert gate.check('HAL', 'buy', 100, 100.0) == (True, None)
+    assert gate.stats()['daily_trades'] == 0
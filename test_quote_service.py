@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test Quote Service - Check source selection, staleness and the fallback fetch
+"""
+
+import time
+import pandas as pd
+from market_data import MarketDataFeed
+from quote_service import QuoteService
+from test_indicators import load_fixture
+
+class OfflineQuotes(QuoteService):
+    """Quote service whose lightweight fetch is counted instead of sent"""
+    fetches = 0
+
+    def _fetch_last_price(self, symbol):
+        self.fetches += 1
+        return 101.5
+
+def fresh_feed():
+    feed = MarketDataFeed()
+    bars = load_fixture()
+    # Pretend the newest bar is forming right now
+    bars.index = bars.index + (pd.Timestamp.now(tz='UTC') - bars.index[-1])
+    feed.bars[('AAPL', '60d', '1h')] = bars
+    feed.fetched_at[('AAPL', '60d', '1h')] = time.time() - 30
+    return feed, float(bars['Close'].iloc[-1])
+
+def test_cached_bar_is_used_when_fresh():
+    feed, close = fresh_feed()
+    quotes = OfflineQuotes(feed, max_staleness=300)
+    quote = quotes.get_quote('AAPL')
+    assert quote['source'] == 'bar' and quote['price'] == close
+    assert 29 <= quote['age'] < 60 and quotes.fetches == 0
+
+    # A newer last trade wins over the bar
+    quotes.record_trade('AAPL', 99.0)
+    assert quotes.get_quote('AAPL')['source'] == 'last_trade'
+
+def test_stale_or_missing_prices_fall_back_to_one_fetch():
+    feed, _ = fresh_feed()
+    quotes = OfflineQuotes(feed, max_staleness=10)
+    quote = quotes.get_quote('AAPL')
+    assert quote['source'] == 'fast_info' and quote['price'] == 101.5 and quotes.fetches == 1
+
+    # The fetched price is remembered as a last trade
+    assert quotes.get_quote('AAPL')['source'] == 'last_trade' and quotes.fetches == 1
+    assert quotes.get_quote('MSFT')['source'] == 'fast_info' and quotes.fetches == 2
+    assert quotes.stats() == {'fast_info': 2, 'last_trade': 1}
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test Risk Engine - Check incremental shrinkage covariance, VaR/CVaR, beta and caching
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from statistics import NormalDist
+from risk_engine import RiskEngine, RollingCovariance
+
+def make_closes(rows=400, symbols=('AAA', 'BBB', 'CCC', 'SPY'), seed=3):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0002, 0.004, rows)
+    returns = {symbol: market * (0.5 + i * 0.4) + rng.normal(0, 0.003, rows) for i, symbol in enumerate(symbols)}
+    returns['SPY'] = market
+    index = pd.date_range('2024-01-02 14:30', periods=rows, freq='h', tz='UTC')
+    return pd.DataFrame({symbol: 100 * np.cumprod(1 + r) for symbol, r in returns.items()}, index=index)
+
+def ledoit_wolf(X):
+    """Reference implementation, as in sklearn.covariance.ledoit_wolf"""
+    n, p = X.shape
+    X = X - X.mean(axis=0)
+    emp_cov = X.T @ X / n
+    mu = np.trace(emp_cov) / p
+    beta_ = ((X ** 2).T @ (X ** 2)).sum()
+    delta_ = ((X.T @ X) ** 2).sum() / n ** 2
+    beta = (beta_ / n - delta_) / (p * n)
+    delta = (delta_ - 2 * mu * np.trace(emp_cov) + p * mu ** 2) / p
+    shrinkage = 0 if beta == 0 else min(beta, delta) / delta
+    return (1 - shrinkage) * emp_cov + shrinkage * mu * np.eye(p), shrinkage
+
+def test_incremental_covariance_matches_ledoit_wolf_on_window():
+    returns = make_closes().pct_change().dropna().to_numpy()
+    moments = RollingCovariance(['AAA', 'BBB', 'CCC', 'SPY'], window=100)
+    for number, row in enumerate(returns):
+        moments.push(row)
+        if number in (5, 99, 100, 157, 398):
+            window = returns[max(0, number + 1 - 100):number + 1]
+            expected, expected_shrinkage = ledoit_wolf(window)
+            covariance, shrinkage = moments.covariance()
+            np.testing.assert_allclose(covariance, expected, rtol=1e-8, atol=1e-14)
+            assert shrinkage == pytest.approx(expected_shrinkage, rel=1e-6, abs=1e-12)
+
+def test_new_bars_update_incrementally_and_match_a_rebuild():
+    closes = make_closes()
+    engine = RiskEngine(window=120)
+    engine.update(closes.iloc[:300])
+    engine.update(closes)  # 100 new bars pushed, no rebuild
+    fresh = RiskEngine(window=120)
+    fresh.update(closes)
+    assert engine.rebuilds == 1
+    np.testing.assert_allclose(engine.moments.covariance()[0], fresh.moments.covariance()[0], rtol=1e-8)
+
+    # A new symbol in the universe rebuilds the window
+    engine.update(closes.assign(DDD=closes['AAA'] * 2))
+    assert engine.rebuilds == 2 and 'DDD' in engine.moments.symbols
+
+def test_assessment_figures_and_cache():
+    closes = make_closes()
+    engine = RiskEngine(window=250, confidence=0.95, horizon_bars=1)
+    engine.update(closes)
+    exposures = {'AAA': 30000.0, 'CCC': 20000.0, 'ZZZ': 5000.0}
+    risk = engine.assess(exposures, 100000.0)
+
+    weights = np.array([0.3, 0.0, 0.2, 0.0])
+    covariance, _ = engine.moments.covariance()
+    rows = engine.moments.window_rows()
+    sigma = np.sqrt(weights @ covariance @ weights)
+    z = NormalDist().inv_cdf(0.95)
+    assert risk['parametric_var'] == pytest.approx((z * sigma - weights @ rows.mean(axis=0)) * 100000)
+    book = rows @ weights
+    assert risk['historical_var'] == pytest.approx(-np.quantile(book, 0.05) * 100000)
+    assert risk['historical_cvar'] >= risk['historical_var'] and risk['parametric_cvar'] >= risk['parametric_var']
+    assert sum(risk['risk_contributions_pct'].values()) == pytest.approx(100)
+    assert risk['beta'] == pytest.approx(weights @ covariance[:, 3] / covariance[3, 3])
+    assert risk['beta'] > 0 and risk['uncovered'] == ['ZZZ']
+
+    assert engine.assess(exposures, 100000.0) is risk and engine.stats()['hits'] == 1
+    engine.update(pd.concat([closes, closes.iloc[[-1]].set_axis([closes.index[-1] + pd.Timedelta(hours=1)])]))
+    assert engine.assess(exposures, 100000.0) is not risk
+
+def test_forming_bar_is_not_pushed_until_it_closes():
+    closes = make_closes()
+    partial = closes.iloc[:301].copy()
+    partial.iloc[-1] = closes.iloc[299] + (closes.iloc[300] - closes.iloc[299]) * 0.05  # 5% into the bar
+
+    engine = RiskEngine(window=120)
+    engine.update(partial)
+    assert engine.last_ts == closes.index[299]
+    engine.update(closes.iloc[:302])  # Bar 300 is final now; bar 301 is forming
+    fresh = RiskEngine(window=120)
+    fresh.update(closes.iloc[:302])
+
+    assert engine.rebuilds == 1 and engine.last_ts == closes.index[300]
+    np.testing.assert_allclose(engine.moments.window_rows(), fresh.moments.window_rows(), rtol=1e-12)
+    np.testing.assert_allclose(engine.moments.covariance()[0], fresh.moments.covariance()[0], rtol=1e-10)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test Scheduler - Check calendar sessions, bar-close boundaries and job cadence
+"""
+
+from datetime import date, time
+from types import SimpleNamespace
+import pandas as pd
+from scheduler import TradingCalendar, Scheduler, BAR_CLOSE, MARKET_CLOSE, WEEKLY_CLOSE
+
+class CalendarAPI:
+    """Broker calendar with the July 4th holiday and the early close the day before"""
+    calls = 0
+
+    def get_calendar(self, start, end):
+        self.calls += 1
+        days = pd.bdate_range(start, end)
+        sessions = []
+        for day in days:
+            if day.date() == date(2024, 7, 4):
+                continue  # Independence Day
+            close = time(13, 0) if day.date() == date(2024, 7, 3) else time(16, 0)
+            sessions.append(SimpleNamespace(date=day, open=time(9, 30), close=close))
+        return sessions
+
+def new_york(text):
+    return pd.Timestamp(text, tz='America/New_York').tz_convert('UTC')
+
+def test_calendar_uses_broker_sessions_and_caches(tmp_path):
+    api = CalendarAPI()
+    calendar = TradingCalendar(api, cache_file=str(tmp_path / 'calendar.json'))
+    assert calendar.session(date(2024, 7, 4)) is None
+    assert calendar.session(date(2024, 7, 3))[1] == new_york('2024-07-03 13:00')
+    assert [ts.strftime('%H:%M') for ts in calendar.bar_closes(date(2024, 7, 3))] == \
+        ['14:30', '15:30', '16:30', '17:00']  # UTC
+    assert calendar.is_last_session_of_week(date(2024, 7, 5))
+    assert api.calls == 1
+
+    # Without a broker calendar, regular weekday hours are assumed
+    fallback = TradingCalendar(None, cache_file=str(tmp_path / 'missing.json'))
+    assert fallback.session(date(2024, 7, 6)) is None
+    assert fallback.is_open(new_york('2024-07-08 10:00'))
+
+def test_jobs_fire_on_boundaries_with_their_cadence(tmp_path):
+    calendar = TradingCalendar(CalendarAPI(), cache_file=str(tmp_path / 'calendar.json'))
+    runs = []
+    scheduler = Scheduler(calendar, delay=0, before_jobs=lambda: runs.append('begin'),
+                          after_jobs=lambda: runs.append('end'))
+    scheduler.add_job('report', lambda: runs.append('report'), MARKET_CLOSE, priority=3, cycle=False)
+    scheduler.add_job('analysis', lambda: runs.append('analysis'), BAR_CLOSE, priority=0)
+    scheduler.add_job('discovery', lambda: runs.append('discovery'), BAR_CLOSE, every=2, priority=2)
+
+    boundary, kinds = scheduler.next_boundary(new_york('2024-07-03 10:31'))
+    assert boundary == new_york('2024-07-03 11:30') and kinds == {BAR_CLOSE}
+    boundary, kinds = scheduler.next_boundary(new_york('2024-07-03 12:45'))
+    assert boundary == new_york('2024-07-03 13:00') and kinds == {MARKET_CLOSE}
+    boundary, kinds = scheduler.next_boundary(new_york('2024-07-03 13:00'))
+    assert boundary == new_york('2024-07-05 10:30')  # Skips the holiday
+    boundary, kinds = scheduler.next_boundary(new_york('2024-07-05 15:45'))
+    assert kinds == {MARKET_CLOSE, WEEKLY_CLOSE}
+
+    scheduler.run_jobs(scheduler.due_jobs({BAR_CLOSE}))
+    scheduler.run_jobs(scheduler.due_jobs({BAR_CLOSE}))
+    scheduler.run_jobs(scheduler.due_jobs({MARKET_CLOSE}))
+    assert runs == ['begin', 'analysis', 'end',
+                    'begin', 'analysis', 'discovery', 'end',
+                    'report']  # Reports run outside a trading cycle
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test Simulated Broker - Check fills, positions, cash and the market clock
+"""
+
+from datetime import timedelta
+import pandas as pd
+import pytest
+from bar_store import BarStore
+from simulated_broker import SimulatedBroker, SimulatedBrokerError, SimulatedClock, create_broker
+from test_indicators import load_fixture
+
+def make_broker(tmp_path, **options):
+    store = BarStore(str(tmp_path))
+    store.append('AAPL', '1h', load_fixture())
+    clock = SimulatedClock('2024-03-04 15:00', speed=0)  # Monday 10:00 New York time
+    return SimulatedBroker(store=store, initial_cash=10000, clock=clock, **options), store
+
+def test_orders_fill_at_cached_close(tmp_path):
+    broker, store = make_broker(tmp_path)
+    bars = store.load('AAPL', '1h')
+    # 15:00 UTC is inside the 14:30 bar, so fills use the close of the bar before it
+    close = bars.loc[:broker.clock.now() - pd.Timedelta(hours=1), 'Close'].iloc[-1]
+    assert close != bars.loc[:broker.clock.now(), 'Close'].iloc[-1]
+
+    order = broker.submit_order(symbol='AAPL', qty=10, side='buy', type='market', time_in_force='day')
+    assert order.status == 'filled' and float(order.filled_avg_price) == close
+    assert float(broker.get_account().cash) == pytest.approx(10000 - 10 * close)
+
+    broker.clock.advance(timedelta(hours=3))
+    position = broker.list_positions()[0]
+    later_close = bars.loc[:broker.clock.now() - pd.Timedelta(hours=1), 'Close'].iloc[-1]
+    assert position.symbol == 'AAPL' and int(float(position.qty)) == 10
+    assert float(position.unrealized_pl) == pytest.approx(10 * (later_close - close))
+    assert float(broker.get_account().portfolio_value) == pytest.approx(10000 + 10 * (later_close - close))
+
+    broker.submit_order(symbol='AAPL', qty=10, side='sell', type='market', time_in_force='day')
+    assert broker.list_positions() == []
+
+def test_rejections_and_clock(tmp_path):
+    broker, _ = make_broker(tmp_path)
+    with pytest.raises(SimulatedBrokerError):
+        broker.submit_order(symbol='AAPL', qty=1, side='sell')
+    with pytest.raises(SimulatedBrokerError):
+        broker.submit_order(symbol='AAPL', qty=1000, side='buy')
+    with pytest.raises(SimulatedBrokerError):
+        broker.submit_order(symbol='MSFT', qty=1, side='buy')
+
+    clock = broker.get_clock()
+    assert clock.is_open and clock.next_close.hour == 16
+    broker.clock.advance(timedelta(days=4, hours=8))  # Friday evening
+    clock = broker.get_clock()
+    assert not clock.is_open
+    assert clock.next_open.weekday() == 0 and (clock.next_open.hour, clock.next_open.minute) == (9, 30)
+
+def test_injected_errors(tmp_path):
+    broker, _ = make_broker(tmp_path, error_rate=1.0)
+    with pytest.raises(SimulatedBrokerError):
+        broker.get_account()
+
+def test_create_broker_shares_the_engines_store(tmp_path):
+    store = BarStore(str(tmp_path))
+    assert create_broker('simulated', store=store).store is store
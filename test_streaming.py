@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test Streaming - Replay split bars and check aggregation, indicators and triggers
+"""
+
+import pandas as pd
+from bar_store import BarStore
+from indicators import IncrementalIndicators
+from streaming import FileReplaySource, StreamIngestor
+from test_indicators import load_fixture
+
+def write_replay(path, bars, symbol='AAPL'):
+    """Split each hourly bar into two 30-minute events that aggregate back to it"""
+    rows = []
+    for ts, bar in bars.iterrows():
+        half = bar['Volume'] / 2
+        rows.append((symbol, ts, bar['Open'], bar['High'], bar['Close'], bar['Open'], half))
+        rows.append((symbol, ts + pd.Timedelta(minutes=30), bar['Close'], bar['Close'], bar['Low'], bar['Close'], half))
+    events = pd.DataFrame(rows, columns=['symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    events.to_csv(path, index=False)
+    return path
+
+def test_replay_rebuilds_hourly_bars_and_indicators(tmp_path):
+    bars = load_fixture()
+    store = BarStore(tmp_path / 'bars')
+    ingestor = StreamIngestor(lambda *args: None, store=store, move_threshold=1000, cooldown=0)
+    FileReplaySource(write_replay(tmp_path / 'replay.csv', bars)).run(ingestor.on_bar)
+    ingestor.close()
+
+    # Every bar but the last (still forming) is committed to the stream's own series
+    stored = store.load('AAPL', '1h-stream')
+    assert store.load('AAPL', '1h') is None
+    pd.testing.assert_frame_equal(stored, bars.iloc[:-1], check_names=False, check_freq=False, check_index_type=False)
+
+    reference = IncrementalIndicators('AAPL')
+    for ts, bar in bars.iloc[:-1].iterrows():
+        reference.update(bar['High'], bar['Low'], bar['Close'], bar['Volume'], ts)
+    assert ingestor.states['AAPL'].snapshot() == reference.snapshot()
+    assert ingestor.stats()['events'] == 2 * len(bars)
+
+def test_triggers_only_on_meaningful_changes(tmp_path):
+    bars = load_fixture()
+    triggered = []
+    ingestor = StreamIngestor(lambda symbol, indicators, reason, ts: triggered.append((symbol, reason, ts)),
+                              move_threshold=1.0, cooldown=0)
+    FileReplaySource(write_replay(tmp_path / 'replay.csv', bars)).run(ingestor.on_bar)
+    ingestor.close()
+
+    assert 0 < len(triggered) < len(bars)
+    assert all(symbol == 'AAPL' for symbol, _, _ in triggered)
+
+    # A cooldown longer than the replay allows only the first trigger
+    once = []
+    ingestor = StreamIngestor(lambda *args: once.append(args), move_threshold=1.0, cooldown=3600)
+    FileReplaySource(tmp_path / 'replay.csv').run(ingestor.on_bar)
+    ingestor.close()
+    assert len(once) == 1 and once[0][2] == triggered[0][1]
+
+def test_replay_filters_symbols_and_stops(tmp_path):
+    bars = load_fixture().iloc[:10]
+    path = tmp_path / 'replay.csv'
+    write_replay(path, bars)
+    events = pd.read_csv(path)
+    other = events.assign(symbol='MSFT')
+    pd.concat([events, other]).to_csv(path, index=False)
+
+    source = FileReplaySource(path)
+    source.subscribe(['MSFT'])
+    seen = []
+
+    def on_bar(event):
+        seen.append(event)
+        if len(seen) == 5:
+            source.stop()
+
+    source.run(on_bar)
+    assert len(seen) == 5 and {event['symbol'] for event in seen} == {'MSFT'}
+    assert all(a['ts'] <= b['ts'] for a, b in zip(seen, seen[1:]))
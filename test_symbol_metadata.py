@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Test Symbol Metadata - Check the seed file, reverse sector lookup and refresh from fundamentals
+"""
+
+import os
+import time
+from fundamentals_cache import FundamentalsCache
+from symbol_metadata import SymbolMetadata, market_cap_bucket, liquidity_tier
+
+SEED_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbol_metadata.json")
+
+def make_index(tmp_path):
+    return SymbolMetadata(seed_file=SEED_FILE, cache_file=str(tmp_path / 'symbol_metadata_cache.json'))
+
+def test_seed_covers_monitored_and_discovery_symbols(tmp_path):
+    index = make_index(tmp_path)
+    assert index.sector('AAPL') == 'Technology'
+    assert index.sector('AMZN') == 'Consumer Cyclical'
+    assert index.sector('ZZZZ') == 'Unknown'
+    assert 'NVDA' in index.symbols_in_sector('Technology')
+    assert set(index.symbols_in_sector('Energy')) == {'XOM', 'CVX', 'COP', 'EOG', 'SLB', 'HAL'}
+    assert sum(len(index.symbols_in_sector(sector)) for sector in index.sectors()) == len(index.symbols())
+
+def test_buckets():
+    assert market_cap_bucket(3e12) == 'mega' and market_cap_bucket(5e9) == 'mid' and market_cap_bucket(None) is None
+    assert liquidity_tier(1e9) == 'high' and liquidity_tier(5e6) == 'low' and liquidity_tier(float('nan')) is None
+
+def test_refresh_from_fundamentals_moves_sectors_and_persists(tmp_path):
+    fundamentals = FundamentalsCache(cache_file=str(tmp_path / 'fundamentals.json'))
+    now = time.time()
+    fundamentals.entries = {
+        'NEWCO': {'sector': ['Utilities', now], 'industry': ['Utilities - Regulated Electric', now],
+                  'marketCap': [15e9, now], 'averageVolume': [2e6, now], 'currentPrice': [50.0, now]},
+        'GE': {'sector': ['Industrials', now], 'industry': ['Aerospace & Defense', now],
+               'marketCap': [250e9, now], 'averageVolume': [None, now]}
+    }
+    index = make_index(tmp_path)
+    assert index.refresh_from_fundamentals(fundamentals) == 2
+    assert index.get('NEWCO') == {'sector': 'Utilities', 'industry': 'Utilities - Regulated Electric',
+                                  'market_cap_bucket': 'large', 'liquidity_tier': 'medium'}
+    assert index.symbols_in_sector('Utilities') == ['NEWCO']
+    assert index.get('GE')['market_cap_bucket'] == 'mega'
+    assert index.refresh_from_fundamentals(fundamentals) == 0
+
+    # A sector change moves the symbol in the reverse index
+    index.update('NEWCO', sector='Energy')
+    assert 'Utilities' not in index.sectors() and 'NEWCO' in index.symbols_in_sector('Energy')
+
+    reloaded = make_index(tmp_path)
+    assert reloaded.get('NEWCO')['market_cap_bucket'] == 'large'
+    assert reloaded.get('AAPL') == {'sector': 'Technology', 'industry': 'Consumer Electronics'}
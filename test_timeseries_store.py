@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test Time Series Store - Check partitioning, range queries, torn writes and CSV round trips
+"""
+
+import os
+import pandas as pd
+from timeseries_store import TimeSeriesStore
+
+def row(value):
+    return {'total_value': value, 'total_return_pct': value / 1000, 'unrealized_pl': -value / 100,
+            'position_count': 3, 'cash_ratio': 12.5}
+
+def fill(store, start='2024-01-30 14:00', periods=24 * 10, freq='h'):
+    timestamps = pd.date_range(start, periods=periods, freq=freq, tz='UTC')
+    for number, ts in enumerate(timestamps):
+        store.append('performance', row(100000 + number), ts)
+    return timestamps
+
+def test_range_query_reads_only_overlapping_partitions(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    timestamps = fill(store)
+    assert sorted(os.listdir(tmp_path / 'performance')) == ['2024-01.rec', '2024-02.rec']
+
+    df = store.query('performance', start=timestamps[50], end=timestamps[60])
+    assert list(df.index) == list(timestamps[50:60])
+    assert df['total_value'].tolist() == [100000.0 + number for number in range(50, 60)]
+
+    # A February-only range never opens the January partition
+    opened = []
+    original = store._records
+    store._records = lambda path, dtype: opened.append(os.path.basename(path)) or original(path, dtype)
+    assert len(store.query('performance', start='2024-02-03 00:00+00:00')) == len(timestamps[timestamps >= '2024-02-03'])
+    assert opened == ['2024-02.rec']
+
+def test_torn_write_is_ignored_and_repaired(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    timestamps = fill(store, periods=5)
+    with open(tmp_path / 'performance' / '2024-01.rec', 'ab') as f:
+        f.write(b'\x00' * 7)  # Interrupted append
+    assert len(store.query('performance')) == 5
+
+    store.append('performance', row(1), timestamps[-1] + pd.Timedelta(hours=1))
+    df = store.query('performance')
+    assert len(df) == 6 and df['total_value'].iloc[-1] == 1.0
+
+def test_csv_export_and_import_round_trip(tmp_path):
+    store = TimeSeriesStore(tmp_path / 'a')
+    fill(store, periods=30)
+    path = tmp_path / 'performance_log.csv'
+    assert store.export_csv('performance', path) == 30
+    assert pd.read_csv(path).columns.tolist() == ['timestamp', 'total_value', 'total_return_pct',
+                                                  'unrealized_pl', 'position_count', 'cash_ratio']
+
+    copy = TimeSeriesStore(tmp_path / 'b')
+    assert copy.is_empty('performance')
+    assert copy.import_csv('performance', path) == 30
+    pd.testing.assert_frame_equal(copy.query('performance'), store.query('performance'))
+
+def test_documents_by_range_and_latest(tmp_path):
+    store = TimeSeriesStore(tmp_path)
+    timestamps = pd.date_range('2024-03-01 20:00', periods=10, freq='h', tz='UTC')
+    for number, ts in enumerate(timestamps):
+        store.append_document('snapshots', {'number': number, 'positions': [{'symbol': 'AAPL'}] * 50}, ts)
+    with open(tmp_path / 'snapshots' / '2024-03-02.jsonl', 'a') as f:
+        f.write('{"ts": "2024-03-02T06:00:00+00:00", "da')  # Torn final line
+
+    documents = store.query_documents('snapshots', start=timestamps[2], end=timestamps[6])
+    assert [document['number'] for _, document in documents] == [2, 3, 4, 5]
+
+    ts, latest = store.latest_document('snapshots')
+    assert ts == timestamps[-1] and latest['number'] == 9
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Time Series Store - Append-only, time-partitioned history of portfolio metrics and snapshots
+"""
+
+import os
+import json
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Numeric series: fixed-width records in monthly partitions, memory-mapped on read
+SCHEMAS = {
+    'performance': ('total_value', 'total_return_pct', 'unrealized_pl', 'position_count', 'cash_ratio')
+}
+
+class TimeSeriesStore:
+    def __init__(self, base_dir=None):
+        """Initialize time series store
+
+        Numeric rows go to <series>/<YYYY-MM>.rec and JSON documents to
+        <series>/<YYYY-MM-DD>.jsonl (UTC), so a range query only opens the
+        partitions it overlaps and nothing is ever rewritten.
+        """
+        self.base_dir = base_dir or os.getenv("PORTFOLIO_HISTORY_DIR", "portfolio_history")
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.dtypes = {series: np.dtype([('ts', '<i8')] + [(field, '<f8') for field in fields])
+                       for series, fields in SCHEMAS.items()}
+
+    def _dir(self, series):
+        path = os.path.join(self.base_dir, series)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _partitions(self, series, suffix, start_key, end_key):
+        """Partition files whose key falls within [start_key, end_key], oldest first"""
+        names = sorted(name for name in os.listdir(self._dir(series)) if name.endswith(suffix))
+        keys = [name[:-len(suffix)] for name in names]
+        return [os.path.join(self._dir(series), name) for name, key in zip(names, keys)
+                if (start_key is None or key >= start_key) and (end_key is None or key <= end_key)]
+
+    # -- numeric rows ---------------------------------------------------
+
+    def append(self, series, row, ts=None):
+        """Append one row of the series' fields at ts (default now)"""
+        ts = _utc(ts if ts is not None else pd.Timestamp.now(tz='UTC'))
+        record = np.zeros(1, dtype=self.dtypes[series])
+        record['ts'] = ts.value // 1000  # Microseconds
+        for field in SCHEMAS[series]:
+            record[field] = float(row.get(field, np.nan))
+        path = os.path.join(self._dir(series), f"{ts.strftime('%Y-%m')}.rec")
+        if os.path.exists(path) and os.path.getsize(path) % record.itemsize:
+            # Drop a torn record from an interrupted write so later rows stay aligned
+            with open(path, 'r+b') as f:
+                f.truncate(os.path.getsize(path) // record.itemsize * record.itemsize)
+        with open(path, 'ab') as f:
+            f.write(record.tobytes())
+
+    def _records(self, path, dtype):
+        count = os.path.getsize(path) // dtype.itemsize  # A torn trailing write is ignored
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+    def query(self, series, start=None, end=None):
+        """Rows with start <= ts < end as a DataFrame indexed by UTC timestamp"""
+        dtype = self.dtypes[series]
+        start_us = _utc(start).value // 1000 if start is not None else None
+        end_us = _utc(end).value // 1000 if end is not None else None
+        chunks = []
+        for path in self._partitions(series, '.rec', start and _utc(start).strftime('%Y-%m'),
+                                     end and _utc(end).strftime('%Y-%m')):
+            records = self._records(path, dtype)
+            if records is None:
+                continue
+            keep = np.ones(len(records), dtype=bool)
+            if start_us is not None:
+                keep &= records['ts'] >= start_us
+            if end_us is not None:
+                keep &= records['ts'] < end_us
+            chunks.append(np.array(records[keep]))
+
+        records = np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+        return pd.DataFrame({field: records[field] for field in SCHEMAS[series]},
+                            index=pd.to_datetime(records['ts'], unit='us', utc=True).rename('timestamp'))
+
+    def export_csv(self, series, path, start=None, end=None):
+        """Write a range of a series to CSV with local naive timestamps, as the old log had"""
+        df = self.query(series, start, end)
+        df.index = _local_naive(df.index)
+        df.to_csv(path, index_label='timestamp')
+        return len(df)
+
+    def import_csv(self, series, path):
+        """Load a legacy CSV log (local naive timestamps) into an empty series"""
+        df = pd.read_csv(path)
+        timestamps = pd.to_datetime(df['timestamp'])
+        if timestamps.dt.tz is None:
+            timestamps = timestamps.dt.tz_localize(datetime.now().astimezone().tzinfo)
+        for ts, row in zip(timestamps, df.to_dict('records')):
+            self.append(series, row, ts)
+        return len(df)
+
+    def is_empty(self, series):
+        return not self._partitions(series, '.rec', None, None)
+
+    # -- JSON documents -------------------------------------------------
+
+    def append_document(self, series, document, ts=None):
+        """Append one JSON document at ts (default now) as a single line"""
+        ts = _utc(ts if ts is not None else pd.Timestamp.now(tz='UTC'))
+        line = json.dumps({'ts': ts.isoformat(), 'data': document}, separators=(',', ':'), default=str)
+        with open(os.path.join(self._dir(series), f"{ts.strftime('%Y-%m-%d')}.jsonl"), 'a') as f:
+            f.write(line + '\n')
+
+    def query_documents(self, series, start=None, end=None):
+        """(UTC timestamp, document) pairs with start <= ts < end"""
+        start = _utc(start) if start is not None else None
+        end = _utc(end) if end is not None else None
+        documents = []
+        for path in self._partitions(series, '.jsonl', start and start.strftime('%Y-%m-%d'),
+                                     end and end.strftime('%Y-%m-%d')):
+            with open(path, 'r') as f:
+                for line in f:
+                    entry = _parse_line(line)
+                    if entry is None:
+                        continue
+                    ts = pd.Timestamp(entry['ts'])
+                    if (start is None or ts >= start) and (end is None or ts < end):
+                        documents.append((ts, entry['data']))
+        return documents
+
+    def latest_document(self, series):
+        """Newest (UTC timestamp, document), reading only the tail of the newest partition"""
+        for path in reversed(self._partitions(series, '.jsonl', None, None)):
+            with open(path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                block = 4096
+                while True:
+                    f.seek(max(0, size - block))
+                    lines = f.read().splitlines()
+                    complete = lines if block >= size else lines[1:]  # First line may be cut off
+                    for line in reversed(complete):
+                        entry = _parse_line(line.decode('utf-8', errors='replace'))
+                        if entry is not None:
+                            return pd.Timestamp(entry['ts']), entry['data']
+                    if block >= size:
+                        break
+                    block *= 4
+        return None
+
+def _parse_line(line):
+    """A stored entry, or None for blank or torn lines"""
+    try:
+        return json.loads(line) if line.strip() else None
+    except json.JSONDecodeError:
+        return None
+
+def _utc(ts):
+    """UTC timestamp; naive times are taken as local, like datetime.now()"""
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(datetime.now().astimezone().tzinfo)
+    return ts.tz_convert('UTC')
+
+def _local_naive(index):
+    """UTC index as naive local wall-clock times"""
+    return index.tz_convert(datetime.now().astimezone().tzinfo).tz_localize(None)